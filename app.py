@@ -1,21 +1,24 @@
 import os
+import hmac
+import uuid
 import logging
-from flask import Flask, render_template, request, redirect, url_for, send_from_directory
+from flask import Flask, Response, render_template, request, redirect, url_for, send_from_directory, jsonify, abort
 from werkzeug.utils import secure_filename
-from pdf_translator import translate_pdf
+from pdf_translator import translate_pdf, job_key
+from page_classifier import normalize_ocr_mode
+from job_queue import get_job_queue, QueueFullError
+import metrics
+import tracing
+import profiling
 from dotenv import load_dotenv
-import time
-
-# Loglama ayarları
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
 
 # Ortam değişkenlerini yükle
 load_dotenv()
 
+# Loglama ayarları (kayıtlara iş/iz kimliği eklenir; LOG_FORMAT=json ile yapılandırılmış loglar)
+tracing.configure_logging(logging.INFO)
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 
 # Konfigürasyon
@@ -33,6 +36,29 @@ os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def wants_json():
+    """
+    API istemcileri (Accept: application/json) için JSON yanıt döndürülür
+    """
+    best = request.accept_mimetypes.best_match(['application/json', 'text/html'])
+    return best == 'application/json' and request.accept_mimetypes[best] > request.accept_mimetypes['text/html']
+
+def is_admin():
+    """
+    İstek yönetici anahtarını (ADMIN_TOKEN) X-Admin-Token başlığında taşıyor mu?
+    (URL parametresi kabul edilmez; anahtar erişim günlüklerine ve tarayıcı geçmişine düşmesin)
+    """
+    token = os.getenv("ADMIN_TOKEN", "")
+    supplied = request.headers.get("X-Admin-Token", "")
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+def require_admin():
+    # Anahtar tanımlı değilse yönetici uç noktaları kapalıdır
+    if not os.getenv("ADMIN_TOKEN"):
+        abort(404)
+    if not is_admin():
+        abort(403)
+
 @app.route('/', methods=['GET', 'POST'])
 def upload_file():
     if request.method == 'POST':
@@ -53,32 +79,70 @@ def upload_file():
             
             # Dosyayı kaydet
             filename = secure_filename(file.filename)
-            unique_filename = f"{time.time():.0f}_{filename}"
+            # İşler kuyrukta beklerken aynı adla yüklenen dosyalar birbirinin üzerine yazılmasın
+            unique_filename = f"{uuid.uuid4().hex}_{filename}"
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
             file.save(file_path)
             
             # Form parametrelerini al
             source_lang = request.form.get('source_lang', 'TR')
             target_lang = request.form.get('target_lang', 'DE')
-            use_ocr = request.form.get('use_ocr', 'true') == 'true'  # Varsayılan olarak OCR etkin
+            # OCR modu: auto (varsayılan, sayfa başına karar), always veya never; eski use_ocr alanı da kabul edilir
+            try:
+                ocr_mode = normalize_ocr_mode(request.form.get('ocr_mode', request.form.get('use_ocr', 'auto')))
+            except ValueError as e:
+                os.remove(file_path)
+                if wants_json():
+                    return jsonify({"error": str(e)}), 400
+                return render_template('index.html', error=str(e)), 400
+            
+            # İş başına profil: sadece yönetici anahtarıyla istenebilir (PROFILE_ENABLED tüm işleri profiller)
+            profile = request.form.get('profile', '').lower() in ('1', 'true', 'on')
+            if profile and not is_admin():
+                logger.warning("Profil isteği yok sayıldı: yönetici anahtarı gerekli")
+                profile = False
+            
+            logger.info(f"Çeviri kuyruğa ekleniyor: {file_path}")
+            logger.info(f"Kaynak dil: {source_lang}, Hedef dil: {target_lang}, OCR: {ocr_mode}, Profil: {profile}")
             
-            logger.info(f"Çeviri başlatılıyor: {file_path}")
-            logger.info(f"Kaynak dil: {source_lang}, Hedef dil: {target_lang}, OCR: {use_ocr}")
+            # Aynı dosya aynı ayarlarla zaten işleniyorsa yeni iş açılmaz, mevcut işe bağlanılır
+            # (profil istenen iş her zaman ayrı çalışır)
+            dedup_key = None if profile else job_key(file_path, source_lang, target_lang, ocr_mode)
             
-            # PDF'i çevir
-            translated_path = translate_pdf(
-                file_path, 
-                source_lang=source_lang, 
-                target_lang=target_lang,
-                output_dir=app.config['DOWNLOAD_FOLDER'],
-                use_ocr=use_ocr
-            )
+            # PDF çevirisini arka plan işçilerine bırak, hemen iş kimliği döndür
+            try:
+                job = get_job_queue().submit(
+                    translate_pdf,
+                    dedup_key=dedup_key,
+                    input_path=file_path,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    output_dir=app.config['DOWNLOAD_FOLDER'],
+                    ocr_mode=ocr_mode,
+                    profile=True if profile else None
+                )
+            except QueueFullError as e:
+                logger.warning(f"İş reddedildi: {str(e)}")
+                os.remove(file_path)
+                if wants_json():
+                    return jsonify({"error": str(e)}), 503
+                return render_template('index.html', error="Sunucu şu anda yoğun, lütfen birkaç dakika sonra tekrar deneyin"), 503
             
-            # Dosya adını çıkartmak için
-            translated_filename = os.path.basename(translated_path)
-            logger.info(f"Çeviri tamamlandı: {translated_path}")
+            deduplicated = job.params.get('input_path') != file_path
+            if deduplicated:
+                # Yüklenen kopya kullanılmayacak
+                os.remove(file_path)
             
-            return render_template('success.html', filename=translated_filename)
+            if wants_json():
+                return jsonify({
+                    "job_id": job.id,
+                    "status": job.status,
+                    "deduplicated": deduplicated,
+                    "status_url": url_for('job_status', job_id=job.id),
+                    "result_url": url_for('job_result', job_id=job.id)
+                }), 202
+            
+            return redirect(url_for('job_page', job_id=job.id))
             
         except Exception as e:
             logger.error(f"İşlem sırasında hata: {str(e)}")
@@ -88,9 +152,106 @@ def upload_file():
     
     return render_template('index.html')
 
+@app.route('/jobs/<job_id>')
+def job_page(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        abort(404)
+    return render_template('job.html', job_id=job.id)
+
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "İş bulunamadı"}), 404
+    
+    status = job.to_dict()
+    if job.status == "done":
+        status["result_url"] = url_for('job_result', job_id=job.id)
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        abort(404)
+    if job.status != "done":
+        return jsonify({"error": "İş henüz tamamlanmadı", "status": job.status}), 409
+    
+    translated_filename = os.path.basename(job.result)
+    return send_from_directory(app.config['DOWNLOAD_FOLDER'], translated_filename, as_attachment=True)
+
+@app.route('/jobs/<job_id>/retry', methods=['POST'])
+def job_retry(job_id):
+    """
+    Tamamlanmış veya başarısız işi aynı parametrelerle yeniden kuyruğa ekler.
+    Kontrol noktası sayesinde önceki denemede tamamlanan sayfalar ve çeviriler tekrarlanmaz.
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        abort(404)
+    if job.status not in ("done", "failed"):
+        return jsonify({"error": "İş henüz tamamlanmadı", "status": job.status}), 409
+    if not os.path.exists(job.params.get('input_path', '')):
+        error = "Yüklenen dosya artık mevcut değil, lütfen tekrar yükleyin"
+        if wants_json():
+            return jsonify({"error": error}), 410
+        return render_template('index.html', error=error), 410
+    
+    try:
+        new_job = get_job_queue().submit(job.target, dedup_key=job.dedup_key, **job.params)
+    except QueueFullError as e:
+        if wants_json():
+            return jsonify({"error": str(e)}), 503
+        return render_template('index.html', error="Sunucu şu anda yoğun, lütfen birkaç dakika sonra tekrar deneyin"), 503
+    
+    logger.info(f"İş yeniden deneniyor: {job.id} -> {new_job.id}")
+    if wants_json():
+        return jsonify({
+            "job_id": new_job.id,
+            "status": new_job.status,
+            "status_url": url_for('job_status', job_id=new_job.id),
+            "result_url": url_for('job_result', job_id=new_job.id)
+        }), 202
+    return redirect(url_for('job_page', job_id=new_job.id))
+
 @app.route('/download/<filename>')
 def download_file(filename):
     return send_from_directory(app.config['DOWNLOAD_FOLDER'], filename, as_attachment=True)
 
+@app.route('/admin/profiles')
+def admin_profiles():
+    """
+    Kaydedilmiş iş profillerini listeler
+    """
+    require_admin()
+    return jsonify({"profiles": profiling.list_profiles()})
+
+@app.route('/admin/profiles/<profile_id>/<filename>')
+def admin_profile_file(profile_id, filename):
+    """
+    Bir profilin dosyasını (cpu.prof, summary.txt, bellek görüntüleri) indirir
+    """
+    require_admin()
+    directory = os.path.join(os.path.abspath(profiling.profile_dir()), secure_filename(profile_id))
+    return send_from_directory(directory, filename, as_attachment=True)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Prometheus metin biçiminde servis ölçümleri
+    """
+    if os.getenv("METRICS_ENABLED", "true").lower() != "true":
+        abort(404)
+    
+    # Kuyruk durumu sorgu anında okunur
+    stats = get_job_queue().stats()
+    metrics.QUEUE_DEPTH.set(stats["queued"])
+    metrics.QUEUE_CAPACITY.set(stats["max_queue"])
+    metrics.JOBS_IN_FLIGHT.set(stats["running"])
+    metrics.JOB_WORKERS.set(stats["workers"])
+    
+    return Response(metrics.REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,111 @@
+import logging
+
+from translation_cache import normalize_segment
+
+logger = logging.getLogger(__name__)
+
+# DeepL tek istekte en fazla 50 metin ve 128 KiB gövde kabul eder.
+# Karakter sınırı, UTF-8 çok baytlı karakterler için pay bırakacak şekilde seçildi.
+DEFAULT_MAX_SEGMENTS = 50
+DEFAULT_MAX_CHARS = 30000
+
+
+def is_translatable(text):
+    """
+    Metnin çeviriye gönderilmeye değer olup olmadığını kontrol eder
+    """
+    return len(text) > 1 and not text.isdigit()
+
+
+def pack_batches(texts, max_chars=DEFAULT_MAX_CHARS, max_segments=DEFAULT_MAX_SEGMENTS):
+    """
+    Metinleri karakter ve metin sayısı sınırlarına göre en az sayıda isteğe yerleştirir.
+
+    First-fit-decreasing yerleştirme kullanılır: uzun metinler önce yerleştirilir,
+    her metin sığdığı ilk batch'e eklenir. Sınırdan uzun tek bir metin kendi
+    batch'ine konur.
+    """
+    batches = []
+    batch_chars = []
+
+    for text in sorted(texts, key=len, reverse=True):
+        length = len(text)
+        for i, batch in enumerate(batches):
+            if len(batch) < max_segments and batch_chars[i] + length <= max_chars:
+                batch.append(text)
+                batch_chars[i] += length
+                break
+        else:
+            batches.append([text])
+            batch_chars.append(length)
+
+    return batches
+
+
+def plan_windows(items, weight, max_items, max_weight):
+    """
+    Sıralı öğeleri (örn. sayfalar) ardışık pencerelere böler ve her pencereyi
+    dolduğu anda üretir. Pencere max_items öğeye veya öğe ağırlıklarının
+    (örn. çevrilecek karakter sayısı) toplamı max_weight'e ulaşınca kapanır.
+    Girdi bir üreteç olabilir; bellekte en fazla bir pencere tutulur.
+    """
+    window = []
+    total = 0
+
+    for item in items:
+        window.append(item)
+        total += weight(item)
+        if len(window) >= max_items or total >= max_weight:
+            yield window
+            window = []
+            total = 0
+
+    if window:
+        yield window
+
+
+class TranslationPlan:
+    """
+    Bir belgenin tüm sayfalarındaki çevrilecek metinlerin planı.
+
+    segments: tekrarları ayıklanmış (normalleştirilmiş) metinler
+    refs: her sayfa ve grup için segments listesindeki indeks (çevrilmeyecekse None)
+    """
+
+    def __init__(self, pages_blocks):
+        self.segments = []
+        self.refs = []
+        segment_index = {}
+
+        for page_blocks in pages_blocks:
+            page_refs = []
+            for block in page_blocks:
+                text = block.text
+                if is_translatable(text):
+                    text = normalize_segment(text)
+                    if text not in segment_index:
+                        segment_index[text] = len(self.segments)
+                        self.segments.append(text)
+                    page_refs.append(segment_index[text])
+                else:
+                    page_refs.append(None)
+            self.refs.append(page_refs)
+
+    @property
+    def total_references(self):
+        return sum(1 for page_refs in self.refs for ref in page_refs if ref is not None)
+
+    def apply(self, pages_blocks, translations):
+        """
+        {metin: çeviri} sonuçlarını her sayfa ve grubun translated_text alanına yazar.
+        Gruplar kopyalanmaz, aynı sayfa listeleri döndürülür.
+        """
+        for page_blocks, page_refs in zip(pages_blocks, self.refs):
+            for block, ref in zip(page_blocks, page_refs):
+                if ref is None:
+                    # Çevirme, aynen koru
+                    block.translated_text = block.text
+                else:
+                    # Çeviri yoksa (API hatası) orijinal metni kullan
+                    block.translated_text = translations.get(self.segments[ref], block.text)
+        return pages_blocks
@@ -0,0 +1,392 @@
+"""
+Dizinleri ve glob kalıplarını toplu çeviren komut satırı aracı.
+
+Girdi olarak dosyalar, dizinler (alt dizinlerle birlikte) veya glob kalıpları
+verilir; her PDF her dil çifti için ayrı bir iş olarak işçi süreçlerine
+dağıtılır. Çıktılar <çıktı dizini>/<KAYNAK>-<HEDEF>/ altında girdi dizin
+yapısı korunarak yazılır. Çıktısı girdiden yeni olan belgeler atlanır
+(--force ile yeniden çevrilir). Çeviri belleği ve sonuç dizini SQLite (WAL)
+üzerinden tüm işçilerce paylaşılır; çeviri API'sinin hız sınırı işçilere
+bölünür. Sonunda verim özeti yazdırılır ve başarısız belgeleri içeren JSON
+rapor kaydedilir.
+
+    python batch_translate.py arsiv/ --lang TR:DE --lang TR:EN --workers 4
+    python batch_translate.py "arsiv/**/cv_*.pdf" --ocr-mode never -o ceviriler
+"""
+import os
+import sys
+import glob
+import json
+import time
+import uuid
+import shutil
+import logging
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = "translated"
+DEFAULT_LANGS = ("TR:DE",)
+PAGE_STRATEGIES = ("text", "ocr", "empty")
+
+
+def _static_prefix(pattern):
+    """
+    Glob kalıbının joker karakter içermeyen baş kısmı (çıktıda korunacak dizin yapısının kökü)
+    """
+    parts = []
+    for part in pattern.replace("\\", "/").split("/"):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    prefix = "/".join(parts)
+    if pattern.startswith("/") and not prefix:
+        return "/"
+    return prefix or "."
+
+
+def collect_inputs(patterns):
+    """
+    Dosya, dizin ve glob kalıplarından (kök dizin, PDF yolu) çiftlerini döndürür.
+    Dizinler alt dizinleriyle taranır; aynı dosya birden fazla kez eklenmez.
+    """
+    inputs = []
+    seen = set()
+
+    def add(root, path):
+        real = os.path.realpath(path)
+        if real not in seen and path.lower().endswith(".pdf") and os.path.isfile(path):
+            seen.add(real)
+            inputs.append((root, path))
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for directory, _, filenames in os.walk(pattern):
+                for filename in sorted(filenames):
+                    add(pattern, os.path.join(directory, filename))
+        elif os.path.isfile(pattern):
+            add(os.path.dirname(pattern) or ".", pattern)
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                logger.warning(f"Eşleşen dosya yok: {pattern}")
+            root = _static_prefix(pattern)
+            for path in matches:
+                add(root if os.path.isdir(root) else os.path.dirname(path), path)
+    return inputs
+
+
+def parse_lang_pair(value):
+    """
+    "TR:DE" biçimindeki dil çiftini (kaynak, hedef) olarak döndürür
+    """
+    source, separator, target = value.partition(":")
+    if not separator or not source.strip() or not target.strip():
+        raise argparse.ArgumentTypeError(f"Dil çifti KAYNAK:HEDEF biçiminde olmalı: {value}")
+    return source.strip().upper(), target.strip().upper()
+
+
+def output_path_for(output_dir, root, input_path, source_lang, target_lang):
+    relative = os.path.relpath(input_path, root)
+    if relative.startswith(".."):
+        relative = os.path.basename(input_path)
+    return os.path.join(output_dir, f"{source_lang}-{target_lang}", relative)
+
+
+def is_up_to_date(input_path, output_path):
+    """
+    Çıktı var ve girdiden sonra yazılmış mı?
+    """
+    try:
+        return os.path.getsize(output_path) > 0 and os.path.getmtime(output_path) >= os.path.getmtime(input_path)
+    except OSError:
+        return False
+
+
+def _counters():
+    return {
+        "pages": sum(metrics.PAGES.value(strategy=strategy) for strategy in PAGE_STRATEGIES),
+        "characters": metrics.CHARACTERS.value(),
+        "api_characters": metrics.API_CHARACTERS.value(),
+        "api_batches": metrics.API_BATCHES.value(result="success"),
+        "no_text": metrics.DOCUMENTS.value(result="no_text"),
+    }
+
+
+def _init_worker(environment, verbose):
+    """
+    İşçi sürecinin ayarlarını uygular (süreç başına bir kez)
+    """
+    os.environ.update(environment)
+    tracing.configure_logging(logging.INFO if verbose else logging.WARNING)
+
+
+def translate_one(input_path, output_path, source_lang, target_lang, ocr_mode="auto", reuse=True):
+    """
+    Tek bir belgeyi çevirir ve sonucunu sözlük olarak döndürür.
+    status: translated, reused (aynı belgenin önceki çıktısı kopyalandı), no_text
+    (metin yok, orijinal kopyalandı) veya failed. Başarısız çeviride çıktı yazılmaz;
+    belge bir sonraki çalıştırmada tekrar denenir ve kontrol noktasından devam eder.
+    reuse=False: sonuç dizinindeki önceki çıktı kullanılmaz
+    """
+    from pdf_translator import PDFTranslator, TranslationFailedError, job_key
+    from result_store import get_result_store
+    from checkpoint import get_checkpoint
+
+    result = {
+        "input": input_path,
+        "output": output_path,
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "status": "failed",
+        "error": None,
+        "pages": 0,
+        "characters": 0,
+        "api_characters": 0,
+        "api_batches": 0,
+        "seconds": 0.0,
+    }
+    start = time.perf_counter()
+    before = _counters()
+    # Yarım kalan çıktı güncel sanılmasın diye önce geçici dosyaya yazılır
+    temp_path = f"{output_path}.part"
+
+    with tracing.trace(uuid.uuid4().hex, "job", file=os.path.basename(input_path),
+                       source_lang=source_lang, target_lang=target_lang) as job_span:
+        try:
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            translator = PDFTranslator(source_lang=source_lang, target_lang=target_lang)
+            key = job_key(input_path, source_lang, target_lang, ocr_mode, translator.backend.cache_namespace)
+
+            # Aynı içerikli belge daha önce (web arayüzünde veya başka bir dizinde) çevrildiyse kopyalanır
+            result_store = get_result_store()
+            existing_path = result_store.get(key) if result_store is not None and reuse else None
+            if existing_path:
+                shutil.copy(existing_path, temp_path)
+                result["status"] = "reused"
+            else:
+                translator.translate_pdf(input_path, temp_path, ocr_mode, checkpoint=get_checkpoint(key))
+                if translator.fallback_used:
+                    raise TranslationFailedError(translator.last_error or "Çeviri başarısız")
+                after = _counters()
+                result.update({name: after[name] - before[name] for name in ("pages", "characters", "api_characters", "api_batches")})
+                result["status"] = "no_text" if after["no_text"] > before["no_text"] else "translated"
+
+            os.replace(temp_path, output_path)
+            if result["status"] == "translated" and result_store is not None:
+                result_store.put(key, output_path)
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+            job_span.status = "error"
+            job_span.error = result["error"]
+            logger.error(f"Belge çevrilemedi: {input_path} ({source_lang}->{target_lang}): {result['error']}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _worker_environment(workers):
+    """
+    İşçi süreçlerinin ortam ayarları: hız sınırı işçilere bölünür, sayfa havuzu
+    kapatılır ve OCR iş parçacıkları çekirdeklere paylaştırılır
+    """
+    from translation_dispatcher import DEFAULT_RATE_LIMIT
+
+    rate_limit = float(os.getenv("TRANSLATION_RATE_LIMIT", DEFAULT_RATE_LIMIT))
+    environment = {
+        "TRANSLATION_RATE_LIMIT": str(rate_limit / workers),
+        # Belgeler zaten süreçlere dağıtılıyor; iç içe süreç havuzu çekirdekleri aşırı yükler
+        "PAGE_WORKERS": "1",
+    }
+    if not int(os.getenv("OCR_WORKERS", 0)):
+        environment["OCR_WORKERS"] = str(max(1, (os.cpu_count() or 1) // workers))
+    return environment
+
+
+def run_batch(tasks, workers=1, verbose=False):
+    """
+    translate_one argümanları olan (girdi, çıktı, kaynak dil, hedef dil, OCR modu, reuse) görevlerini çalıştırır ve
+    sonuçları tamamlanma sırasıyla üretir. workers > 1 ise görevler "spawn" ile
+    başlatılan işçi süreçlerine dağıtılır.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield translate_one(*task)
+        return
+
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(_worker_environment(workers), verbose)
+    )
+    try:
+        futures = {pool.submit(translate_one, *task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # İşçi süreci çöktü (örn. bellek yetersizliği); belge başarısız sayılır
+                input_path, output_path, source_lang, target_lang = futures[future][:4]
+                yield {
+                    "input": input_path, "output": output_path, "source_lang": source_lang,
+                    "target_lang": target_lang, "status": "failed", "error": f"İşçi süreci hatası: {str(e)}",
+                    "pages": 0, "characters": 0, "api_characters": 0, "api_batches": 0, "seconds": 0.0,
+                }
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def summarize(results, seconds):
+    """
+    Sonuçlardan durum sayıları ve verim ölçümlerini hesaplar
+    """
+    counts = {status: 0 for status in ("translated", "reused", "no_text", "skipped", "failed")}
+    for result in results:
+        counts[result["status"]] += 1
+
+    # Sayfa ve karakterler sadece bu çalıştırmada işlenen belgelerden; kopyalanan çıktılar belge verimine dahil
+    processed = [result for result in results if result["status"] in ("translated", "no_text")]
+    completed = len(processed) + counts["reused"]
+    pages = sum(result["pages"] for result in processed)
+    minutes = seconds / 60
+    return {
+        "documents": len(results),
+        **counts,
+        "seconds": round(seconds, 3),
+        "pages": pages,
+        "characters": sum(result["characters"] for result in processed),
+        "api_characters": sum(result["api_characters"] for result in processed),
+        "api_batches": sum(result["api_batches"] for result in processed),
+        "documents_per_minute": round(completed / minutes, 2) if minutes else None,
+        "pages_per_second": round(pages / seconds, 2) if seconds else None,
+    }
+
+
+def format_summary(summary):
+    lines = [
+        "",
+        f"Belgeler: {summary['documents']} toplam, {summary['translated']} çevrildi, "
+        f"{summary['reused']} önceki çıktıdan kopyalandı, {summary['no_text']} metinsiz, "
+        f"{summary['skipped']} güncel (atlandı), {summary['failed']} başarısız",
+        f"Süre: {summary['seconds']:.1f} sn",
+    ]
+    if summary["documents_per_minute"] is not None:
+        lines.append(f"Verim: {summary['documents_per_minute']:.1f} belge/dk, {summary['pages_per_second']:.2f} sayfa/sn "
+                     f"({summary['pages']} sayfa)")
+    lines.append(f"Karakterler: {summary['characters']} çıkarıldı, {summary['api_characters']} çeviri API'sine gönderildi "
+                 f"({summary['api_batches']} istek)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF dosyalarını ve dizinlerini toplu çevirir")
+    parser.add_argument("inputs", nargs="+", help="PDF dosyaları, dizinler (alt dizinlerle) veya glob kalıpları (örn. \"arsiv/**/*.pdf\")")
+    parser.add_argument("-o", "--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help=f"Çıktı dizini; dil çifti başına alt dizin açılır (varsayılan: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("-l", "--lang", action="append", type=parse_lang_pair, metavar="KAYNAK:HEDEF",
+                        help=f"Dil çifti, tekrarlanabilir (varsayılan: {', '.join(DEFAULT_LANGS)})")
+    parser.add_argument("--ocr-mode", default="auto", choices=["auto", "always", "never"])
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Eşzamanlı işçi süreci sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--force", action="store_true", help="Güncel çıktıları da yeniden çevir (önceki çıktılar kopyalanmaz)")
+    parser.add_argument("--report", help="JSON rapor dosyası (varsayılan: <çıktı dizini>/batch-report-<zaman>-<pid>.json)")
+    parser.add_argument("--verbose", action="store_true", help="Çeviri hattının INFO loglarını göster")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    tracing.configure_logging(logging.INFO if args.verbose else logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    lang_pairs = args.lang or [parse_lang_pair(value) for value in DEFAULT_LANGS]
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        parser.error("Çevrilecek PDF bulunamadı")
+
+    tasks = []
+    results = []
+    outputs = set()
+    for root, input_path in inputs:
+        for source_lang, target_lang in lang_pairs:
+            output_path = output_path_for(args.output_dir, root, input_path, source_lang, target_lang)
+            if output_path in outputs:
+                logger.warning(f"Aynı çıktı yoluna düşen belge atlandı: {input_path} -> {output_path}")
+                continue
+            outputs.add(output_path)
+            if not args.force and is_up_to_date(input_path, output_path):
+                results.append({
+                    "input": input_path, "output": output_path, "source_lang": source_lang,
+                    "target_lang": target_lang, "status": "skipped", "error": None,
+                    "pages": 0, "characters": 0, "api_characters": 0, "api_batches": 0, "seconds": 0.0,
+                })
+                continue
+            tasks.append((input_path, output_path, source_lang, target_lang, args.ocr_mode, not args.force))
+
+    workers = max(1, args.workers)
+    logger.info(f"{len(inputs)} PDF, {len(lang_pairs)} dil çifti: {len(tasks)} belge çevrilecek, "
+                f"{len(results)} güncel çıktı atlandı ({min(workers, max(1, len(tasks)))} işçi)")
+
+    start = time.perf_counter()
+    interrupted = False
+    try:
+        for done, result in enumerate(run_batch(tasks, workers, args.verbose), 1):
+            results.append(result)
+            if result["status"] == "failed":
+                logger.info(f"[{done}/{len(tasks)}] BAŞARISIZ {result['input']} ({result['source_lang']}->{result['target_lang']}): {result['error']}")
+            else:
+                logger.info(f"[{done}/{len(tasks)}] {result['input']} ({result['source_lang']}->{result['target_lang']}): "
+                            f"{result['status']}, {result['pages']} sayfa, {result['seconds']:.1f} sn")
+    except KeyboardInterrupt:
+        # Bekleyen belgeler iptal edilir; tamamlananlar rapora yazılır
+        interrupted = True
+        logger.warning("Kullanıcı tarafından durduruldu, bekleyen belgeler iptal edildi")
+
+    summary = summarize(results, time.perf_counter() - start)
+    summary["interrupted"] = interrupted
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "inputs": args.inputs,
+            "output_dir": args.output_dir,
+            "lang_pairs": [f"{source}:{target}" for source, target in lang_pairs],
+            "ocr_mode": args.ocr_mode,
+            "workers": workers,
+            "force": args.force,
+        },
+        "summary": summary,
+        "failures": [
+            {key: result[key] for key in ("input", "output", "source_lang", "target_lang", "error")}
+            for result in results if result["status"] == "failed"
+        ],
+        "documents": results,
+    }
+
+    # Aynı saniyede başlayan iki çalıştırmanın raporları çakışmasın diye süreç kimliği eklenir
+    report_path = args.report or os.path.join(args.output_dir,
+                                              f"batch-report-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.json")
+    if os.path.dirname(report_path):
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(format_summary(summary))
+    logger.info(f"Rapor kaydedildi: {report_path}")
+
+    if interrupted:
+        sys.exit(130)
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Uçtan uca performans ölçümü.
+
+Sentetik belgeler (benchmark_corpus.py) ve isteğe bağlı gerçek PDF'ler
+çeviri hattının her aşamasından ayrı ayrı geçirilir: metin çıkarma,
+gruplama, çeviri (ağ gerektirmeyen stub arka uç), yerleşim, sayfa oluşturma
+ve kaydetme. Aşama süreleri, bellek tepe değerleri ve çıktı boyutları JSON
+raporu olarak kaydedilir; --compare ile önceki bir raporla karşılaştırılır.
+Ayrıca her kaydetme profilinin (fast, standard, compact) süresi ve çıktı
+boyutu aynı belge üzerinde ölçülür.
+
+    python benchmark.py --repeat 3
+    python benchmark.py --input test.pdf --compare benchmarks/results/onceki.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import tracemalloc
+from datetime import datetime
+
+import fitz  # PyMuPDF
+
+import pdf_translator
+from pdf_translator import PDFTranslator, SAVE_PROFILES
+from batch_planner import TranslationPlan
+from translation_backends import StubBackend
+from benchmark_corpus import DEFAULT_CORPUS_DIR, DOCUMENT_SPECS, generate_corpus
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIR = os.path.join("benchmarks", "results")
+STAGES = ("extract", "group", "translate", "layout", "render", "save")
+
+
+class StageRecorder:
+    """
+    Aşama sürelerini ve (trace_memory ise) aşama içindeki Python bellek tepe değerini kaydeder
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.seconds = {}
+        self.peak_bytes = {}
+        self._stage = None
+        self._start = 0.0
+
+    def start(self, stage):
+        self._stage = stage
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+
+    def stop(self):
+        self.seconds[self._stage] = time.perf_counter() - self._start
+        if self.trace_memory:
+            self.peak_bytes[self._stage] = tracemalloc.get_traced_memory()[1]
+        self._stage = None
+
+
+def measure_save_profiles(data, profiles):
+    """
+    Kaydedilmemiş belge baytlarını her profille yeniden kaydeder: {profil: {seconds, output_bytes}}.
+    Her profil belgenin ayrı bir kopyasında ölçülür (clean gibi ayarlar belgeyi değiştirir).
+    """
+    results = {}
+    for profile in profiles:
+        doc = fitz.open("pdf", data)
+        try:
+            start = time.perf_counter()
+            output = doc.tobytes(**SAVE_PROFILES[profile])
+            results[profile] = {"seconds": time.perf_counter() - start, "output_bytes": len(output)}
+        finally:
+            doc.close()
+    return results
+
+
+def run_document(path, source_lang="TR", target_lang="DE", ocr_mode="auto", latency=0.0,
+                 trace_memory=False, output_path=None, save_profile=None, save_profiles=()):
+    """
+    Belgeyi tüm aşamalardan bir kez geçirir ve ölçümleri döndürür.
+    Çeviri belleği ve OCR önbelleği kapatılır; her çalıştırma soğuk başlar.
+    save_profile: kaydetme aşamasında kullanılacak profil (varsayılan: SAVE_PROFILE ayarı)
+    save_profiles: ayrıca karşılaştırılacak kaydetme profilleri
+    """
+    backend = StubBackend(latency=latency, seed=0)
+    translator = PDFTranslator(source_lang=source_lang, target_lang=target_lang, backend=backend)
+    translator.translation_memory = None
+    translator.ocr_engine.cache = None
+    if save_profile:
+        translator.save_profile = save_profile
+
+    recorder = StageRecorder(trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+
+    doc = None
+    try:
+        recorder.start("extract")
+        pages, doc = translator.extract_text_with_positions(path, ocr_mode)
+        recorder.stop()
+
+        recorder.start("group")
+        grouped_pages = [translator.group_text_blocks(page_blocks) for page_blocks in pages]
+        recorder.stop()
+
+        recorder.start("translate")
+        translated_pages = translator.translate_document(grouped_pages)
+        recorder.stop()
+
+        # Yerleşim, sayfa oluşturma sırasında çağrılır; çeviricinin ölçtüğü süre oluşturmadan düşülür
+        recorder.start("render")
+        new_doc = translator._render_pages(doc, list(enumerate(translated_pages)))
+        recorder.stop()
+        recorder.seconds["layout"] = translator.stage_seconds.get("layout", 0.0)
+        recorder.seconds["render"] -= recorder.seconds["layout"]
+
+        # Profil karşılaştırması için belge sıkıştırılmadan ve temizlenmeden alınır (süreye katılmaz)
+        unsaved = new_doc.tobytes() if save_profiles else None
+        
+        # create_translated_pdf ile aynı kaydetme ayarları; disk yerine belleğe yazılır
+        recorder.start("save")
+        data = new_doc.tobytes(**translator._save_options())
+        recorder.stop()
+        new_doc.close()
+        
+        profile_results = measure_save_profiles(unsaved, save_profiles) if save_profiles else {}
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        if doc is not None:
+            doc.close()
+
+    if output_path:
+        with open(output_path, "wb") as f:
+            f.write(data)
+
+    strategies = {}
+    for strategy in translator.page_strategies.values():
+        strategies[strategy["strategy"]] = strategies.get(strategy["strategy"], 0) + 1
+
+    return {
+        "pages": len(pages),
+        "spans": sum(len(page_blocks) for page_blocks in pages),
+        "groups": sum(len(page_groups) for page_groups in grouped_pages),
+        "segments": len(TranslationPlan(grouped_pages).segments),
+        "requests": backend.requests,
+        "characters": backend.characters,
+        "strategies": strategies,
+        "output_bytes": len(data),
+        "save_profile": translator.save_profile,
+        "save_profiles": profile_results,
+        "seconds": recorder.seconds,
+        "peak_bytes": recorder.peak_bytes,
+    }
+
+
+def benchmark_document(name, path, repeat=1, trace_memory=True, **options):
+    """
+    Belgeyi repeat kez ölçer (süreler için ortanca) ve isteğe bağlı olarak
+    ayrı bir çalıştırmada bellek tepe değerlerini ölçer.
+    tracemalloc süreleri etkilediği için bellek ölçümü süre ölçümüne katılmaz.
+    """
+    runs = [run_document(path, **options) for _ in range(max(1, repeat))]
+    result = {key: value for key, value in runs[-1].items() if key not in ("seconds", "peak_bytes")}
+
+    stages = {}
+    for stage in STAGES:
+        samples = [run["seconds"][stage] for run in runs]
+        stages[stage] = {"seconds": statistics.median(samples), "runs": samples}
+
+    for profile, measurement in result["save_profiles"].items():
+        measurement["seconds"] = statistics.median(run["save_profiles"][profile]["seconds"] for run in runs)
+
+    if trace_memory:
+        # Sadece Python nesneleri izlenir; MuPDF'in kendi bellek kullanımı süreç tepe değerine (max_rss) yansır
+        memory_options = {k: v for k, v in options.items() if k not in ("output_path", "save_profiles")}
+        memory_run = run_document(path, trace_memory=True, **memory_options)
+        for stage in STAGES:
+            if stage in memory_run["peak_bytes"]:
+                stages[stage]["peak_bytes"] = memory_run["peak_bytes"][stage]
+
+    total = sum(stage["seconds"] for stage in stages.values())
+    result.update({
+        "name": name,
+        "path": path,
+        "input_bytes": os.path.getsize(path),
+        "stages": stages,
+        "total_seconds": total,
+        "pages_per_second": result["pages"] / total if total else None,
+    })
+    return result
+
+
+def max_rss_bytes():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KiB, macOS'ta bayt
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def build_report(documents, settings, label=None):
+    totals = {stage: sum(doc["stages"][stage]["seconds"] for doc in documents) for stage in STAGES}
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "label": label,
+        "environment": {
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": settings,
+        "documents": documents,
+        "totals": {
+            "pages": sum(doc["pages"] for doc in documents),
+            "output_bytes": sum(doc["output_bytes"] for doc in documents),
+            "stages": totals,
+            "total_seconds": sum(totals.values()),
+            "max_rss_bytes": max_rss_bytes(),
+        },
+    }
+
+
+def format_report(report):
+    """
+    Belge ve aşama başına sürelerin okunabilir tablosu
+    """
+    header = f"{'belge':<24}{'sayfa':>6}" + "".join(f"{stage:>11}" for stage in STAGES) + f"{'toplam':>10}{'çıktı KB':>10}"
+    lines = [header, "-" * len(header)]
+    for doc in report["documents"]:
+        lines.append(
+            f"{doc['name'][:23]:<24}{doc['pages']:>6}"
+            + "".join(f"{doc['stages'][stage]['seconds'] * 1000:>9.1f}ms" for stage in STAGES)
+            + f"{doc['total_seconds']:>9.2f}s{doc['output_bytes'] / 1024:>10.0f}"
+        )
+    totals = report["totals"]
+    lines.append("-" * len(header))
+    lines.append(
+        f"{'toplam':<24}{totals['pages']:>6}"
+        + "".join(f"{totals['stages'][stage] * 1000:>9.1f}ms" for stage in STAGES)
+        + f"{totals['total_seconds']:>9.2f}s{totals['output_bytes'] / 1024:>10.0f}"
+    )
+
+    # Kaydetme profilleri: süre ve çıktı boyutu
+    profiles = [profile for profile in SAVE_PROFILES if any(profile in doc.get("save_profiles", {}) for doc in report["documents"])]
+    if profiles:
+        header = f"{'kaydetme profili':<24}" + "".join(f"{profile:>22}" for profile in profiles)
+        lines += ["", header, "-" * len(header)]
+        totals = {profile: [0.0, 0] for profile in profiles}
+        for doc in report["documents"]:
+            cells = []
+            for profile in profiles:
+                measurement = doc["save_profiles"].get(profile)
+                if measurement is None:
+                    cells.append(f"{'-':>22}")
+                    continue
+                totals[profile][0] += measurement["seconds"]
+                totals[profile][1] += measurement["output_bytes"]
+                cells.append(f"{measurement['seconds'] * 1000:>9.1f}ms{measurement['output_bytes'] / 1024:>10.0f}KB")
+            lines.append(f"{doc['name'][:23]:<24}" + "".join(cells))
+        lines.append("-" * len(header))
+        lines.append(f"{'toplam':<24}" + "".join(
+            f"{totals[profile][0] * 1000:>9.1f}ms{totals[profile][1] / 1024:>10.0f}KB" for profile in profiles
+        ))
+    return "\n".join(lines)
+
+
+def compare_reports(previous, current):
+    """
+    İki raporda ortak belgelerin aşama sürelerini ve çıktı boyutlarını karşılaştırır
+    """
+    previous_docs = {doc["name"]: doc for doc in previous["documents"]}
+    lines = [f"Karşılaştırma: {previous.get('created')} ({previous.get('label') or '-'}) -> "
+             f"{current.get('created')} ({current.get('label') or '-'})"]
+    for doc in current["documents"]:
+        old = previous_docs.get(doc["name"])
+        if old is None:
+            continue
+        changes = []
+        for stage in STAGES + ("total",):
+            if stage == "total":
+                before, after = old["total_seconds"], doc["total_seconds"]
+            else:
+                if stage not in old["stages"]:
+                    continue
+                before, after = old["stages"][stage]["seconds"], doc["stages"][stage]["seconds"]
+            change = (after - before) / before * 100 if before else 0.0
+            changes.append(f"{stage} {before * 1000:.1f}->{after * 1000:.1f}ms ({change:+.0f}%)")
+        size_change = doc["output_bytes"] - old["output_bytes"]
+        changes.append(f"çıktı {size_change:+d} bayt")
+        lines.append(f"  {doc['name']}: " + ", ".join(changes))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Çeviri hattının aşama bazında performans ölçümü")
+    parser.add_argument("documents", nargs="*", help=f"Ölçülecek sentetik belgeler (varsayılan: hepsi): {', '.join(DOCUMENT_SPECS)}")
+    parser.add_argument("--input", action="append", default=[], help="Ölçüme eklenecek PDF dosyası (tekrarlanabilir)")
+    parser.add_argument("--no-corpus", action="store_true", help="Sentetik belgeleri kullanma (sadece --input)")
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR, help="Sentetik belgelerin üretileceği dizin")
+    parser.add_argument("--source", default="TR", help="Kaynak dil")
+    parser.add_argument("--target", default="DE", help="Hedef dil")
+    parser.add_argument("--ocr-mode", default="auto", choices=["auto", "always", "never"])
+    parser.add_argument("--repeat", type=int, default=1, help="Belge başına ölçüm sayısı (süreler için ortanca alınır)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub arka ucun istek başına gecikmesi (saniye)")
+    parser.add_argument("--rate-limit", type=float,
+                        help="Saniyedeki en fazla çeviri isteği (varsayılan: TRANSLATION_RATE_LIMIT ayarı); "
+                             "sadece hattın kendi süresini ölçmek için yüksek bir değer verin")
+    parser.add_argument("--no-memory", action="store_true", help="Bellek ölçümü çalıştırmasını atla")
+    parser.add_argument("--save-profile", choices=list(SAVE_PROFILES),
+                        help="Kaydetme aşamasında kullanılacak profil (varsayılan: SAVE_PROFILE ayarı)")
+    parser.add_argument("--save-profiles", default=",".join(SAVE_PROFILES),
+                        help="Süre ve boyutu karşılaştırılacak kaydetme profilleri, virgülle ayrılmış (boş: karşılaştırma yapma)")
+    parser.add_argument("--output", help="JSON rapor dosyası (varsayılan: benchmarks/results/benchmark-<zaman>.json)")
+    parser.add_argument("--output-dir", help="Çevrilmiş PDF'lerin yazılacağı dizin (varsayılan: yazılmaz)")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki JSON rapor")
+    parser.add_argument("--label", help="Rapora eklenecek etiket (örn. dal veya değişiklik adı)")
+    parser.add_argument("--verbose", action="store_true", help="Çeviri hattının INFO loglarını göster")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logger.setLevel(logging.INFO)
+    if args.rate_limit:
+        # Paylaşılan hız sınırlayıcı ilk çeviricide bu ayarla oluşturulur
+        os.environ["TRANSLATION_RATE_LIMIT"] = str(args.rate_limit)
+
+    documents = [] if args.no_corpus else generate_corpus(args.corpus_dir, args.documents)
+    documents += [(os.path.splitext(os.path.basename(path))[0], path) for path in args.input]
+    if not documents:
+        parser.error("Ölçülecek belge yok")
+
+    save_profiles = [profile.strip().lower() for profile in args.save_profiles.split(",") if profile.strip()]
+    unknown = [profile for profile in save_profiles if profile not in SAVE_PROFILES]
+    if unknown:
+        parser.error(f"Bilinmeyen kaydetme profili: {', '.join(unknown)} (seçenekler: {', '.join(SAVE_PROFILES)})")
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    results = []
+    for name, path in documents:
+        logger.info(f"Ölçülüyor: {name} ({path})")
+        output_path = os.path.join(args.output_dir, f"translated_{name}.pdf") if args.output_dir else None
+        results.append(benchmark_document(
+            name, path, repeat=args.repeat, trace_memory=not args.no_memory,
+            source_lang=args.source, target_lang=args.target, ocr_mode=args.ocr_mode,
+            latency=args.latency, output_path=output_path,
+            save_profile=args.save_profile, save_profiles=save_profiles
+        ))
+
+    settings = {
+        "source_lang": args.source,
+        "target_lang": args.target,
+        "ocr_mode": args.ocr_mode,
+        "repeat": args.repeat,
+        "stub_latency": args.latency,
+        "rate_limit": float(os.getenv("TRANSLATION_RATE_LIMIT", 0)) or None,
+        "grouping_mode": pdf_translator.GROUPING_MODE,
+        "emit_mode": pdf_translator.TEXT_EMIT_MODE,
+        "color_mode": pdf_translator.RENDER_COLOR_MODE,
+        "render_engine": pdf_translator.RENDER_ENGINE,
+        "page_workers": os.getenv("PAGE_WORKERS", "1"),
+        "save_profile": args.save_profile or pdf_translator.SAVE_PROFILE,
+    }
+    report = build_report(results, settings, args.label)
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(format_report(report))
+    logger.info(f"Rapor kaydedildi: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare_reports(json.load(f), report))
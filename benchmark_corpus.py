@@ -0,0 +1,165 @@
+"""
+Performans ölçümü için sentetik PDF belgeleri üretir.
+
+Belgeler PyMuPDF ile sabit bir tohumdan üretilir; aynı ayarlarla her
+seferinde aynı içerik elde edilir, böylece farklı zamanlardaki ölçümler
+karşılaştırılabilir. Sayfa sayısı, metin yoğunluğu, sütun sayısı, renkli
+arka planlar ve taranmış (sadece görüntü) sayfa oranı belge başına ayarlanır.
+
+    python benchmark_corpus.py --output benchmarks/corpus
+"""
+import os
+import random
+import logging
+import argparse
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS_DIR = os.path.join("benchmarks", "corpus")
+
+WORDS = (
+    "deneyim proje yönetim yazılım geliştirme ekip analiz müşteri süreç sistem veri rapor "
+    "eğitim üniversite mühendislik bölüm sorumluluk başarı kalite planlama bütçe satış "
+    "pazarlama iletişim liderlik çözüm tasarım uygulama altyapı güvenlik performans "
+    "hizmet kurum şirket görev teknik beceri sertifika dil ileri seviye Almanca İngilizce"
+).split()
+
+HEADINGS = (
+    "İş Deneyimi", "Eğitim", "Yetenekler", "Projeler", "Sertifikalar",
+    "Diller", "Referanslar", "Özet", "Sonuç", "Ekler"
+)
+
+# Metin yoğunluğu: (font boyutu, paragraf başına satır, sayfanın doldurulacak oranı)
+DENSITIES = {
+    "sparse": (11, 3, 0.45),
+    "normal": (10, 5, 0.9),
+    "dense": (8, 8, 0.95),
+}
+
+# Ölçümde kullanılan belge çeşitleri
+DOCUMENT_SPECS = {
+    "cv_single_page": {"pages": 1, "density": "normal", "columns": 1, "backgrounds": True},
+    "cv_two_column": {"pages": 3, "density": "normal", "columns": 2, "backgrounds": True},
+    "sparse_letter": {"pages": 5, "density": "sparse", "columns": 1},
+    "dense_report": {"pages": 30, "density": "dense", "columns": 1},
+    "brochure_three_column": {"pages": 8, "density": "normal", "columns": 3, "backgrounds": True},
+    "long_document": {"pages": 100, "density": "normal", "columns": 2},
+    "scanned_document": {"pages": 4, "density": "normal", "columns": 1, "scanned": 1.0},
+    "mixed_scanned": {"pages": 10, "density": "normal", "columns": 2, "scanned": 0.3},
+}
+
+SCAN_DPI = 150
+
+# Standart Helvetica fontunda (WinAnsi) bulunmayan Türkçe harfler
+ASCII_FOLD = str.maketrans("ıİşŞğĞ", "iIsSgG")
+
+
+def _sentence(rng, width, font_size, fontname="helv"):
+    """
+    Verilen genişliğe sığan rastgele kelimelerden bir satır üretir
+    """
+    line = rng.choice(WORDS).translate(ASCII_FOLD).capitalize()
+    while True:
+        candidate = f"{line} {rng.choice(WORDS).translate(ASCII_FOLD)}"
+        if fitz.get_text_length(candidate, fontname=fontname, fontsize=font_size) > width:
+            return line
+        line = candidate
+
+
+def _draw_text_page(page, rng, density, columns, backgrounds):
+    """
+    Sayfaya başlık, sütunlar halinde paragraflar ve isteğe bağlı dolgulu alanlar yazar
+    """
+    font_size, lines_per_paragraph, fill_ratio = DENSITIES[density]
+    margin = 40
+    gap = 18
+    rect = page.rect
+    top = margin
+
+    if backgrounds:
+        # Koyu başlık bandı üzerinde beyaz metin
+        band = fitz.Rect(0, 0, rect.width, 70)
+        page.draw_rect(band, color=(0.15, 0.25, 0.45), fill=(0.15, 0.25, 0.45))
+        page.insert_text((margin, 45), "Ahmet Yilmaz - Yazilim Mühendisi", fontsize=20, color=(1, 1, 1))
+        top = 95
+    else:
+        page.insert_text((margin, top + 16), "Ahmet Yilmaz - Yazilim Mühendisi", fontsize=16)
+        top += 40
+
+    column_width = (rect.width - 2 * margin - (columns - 1) * gap) / columns
+    bottom = top + (rect.height - margin - top) * fill_ratio
+    line_height = font_size * 1.3
+
+    for column in range(columns):
+        x = margin + column * (column_width + gap)
+        y = top
+        while y + line_height * (lines_per_paragraph + 2) < bottom:
+            heading_y = y + font_size + 2
+            if backgrounds and rng.random() < 0.3:
+                # Açık renkli kutu içinde paragraf
+                box_height = line_height * (lines_per_paragraph + 1) + 8
+                page.draw_rect(fitz.Rect(x - 4, y, x + column_width + 4, y + box_height),
+                               color=(0.9, 0.93, 0.97), fill=(0.9, 0.93, 0.97))
+            page.insert_text((x, heading_y), rng.choice(HEADINGS).translate(ASCII_FOLD), fontsize=font_size + 2,
+                             fontname="hebo", color=(0.15, 0.25, 0.45))
+            y = heading_y + 4
+            for _ in range(lines_per_paragraph):
+                y += line_height
+                page.insert_text((x, y), _sentence(rng, column_width, font_size), fontsize=font_size)
+            y += line_height
+
+
+def make_document(path, pages=1, density="normal", columns=1, backgrounds=False, scanned=0.0, seed=0):
+    """
+    Sentetik bir PDF üretir ve yolunu döndürür.
+    scanned: sadece görüntü olarak eklenen (metin katmanı olmayan) sayfaların oranı
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    scanned_pages = set(rng.sample(range(pages), round(pages * scanned)))
+
+    for page_num in range(pages):
+        if page_num in scanned_pages:
+            # Sayfa ayrı bir belgede çizilip gri tonlamalı görüntü olarak eklenir
+            source = fitz.open()
+            source_page = source.new_page()
+            _draw_text_page(source_page, rng, density, columns, False)
+            pix = source_page.get_pixmap(dpi=SCAN_DPI, colorspace=fitz.csGRAY)
+            page = doc.new_page(width=source_page.rect.width, height=source_page.rect.height)
+            page.insert_image(page.rect, pixmap=pix)
+            source.close()
+        else:
+            _draw_text_page(doc.new_page(), rng, density, columns, backgrounds)
+
+    doc.save(path, garbage=4, deflate=True)
+    doc.close()
+    return path
+
+
+def generate_corpus(directory=DEFAULT_CORPUS_DIR, names=None):
+    """
+    Belge çeşitlerini dizine üretir: [(ad, yol), ...]
+    """
+    os.makedirs(directory, exist_ok=True)
+    documents = []
+    for seed, (name, spec) in enumerate(DOCUMENT_SPECS.items()):
+        if names and name not in names:
+            continue
+        path = os.path.join(directory, f"{name}.pdf")
+        make_document(path, seed=seed, **spec)
+        documents.append((name, path))
+    return documents
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Performans ölçümü için sentetik PDF belgeleri üretir")
+    parser.add_argument("--output", default=DEFAULT_CORPUS_DIR, help="Belgelerin yazılacağı dizin")
+    parser.add_argument("documents", nargs="*", help=f"Üretilecek belgeler (varsayılan: hepsi): {', '.join(DOCUMENT_SPECS)}")
+    args = parser.parse_args()
+
+    for name, path in generate_corpus(args.output, args.documents):
+        logger.info(f"{name}: {path} ({os.path.getsize(path)} bytes)")
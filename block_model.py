@@ -0,0 +1,188 @@
+from array import array
+
+# Renk yok (None) değeri; span renkleri PyMuPDF'in paketli sRGB tamsayısı olarak tutulur
+NO_COLOR = -1
+
+
+def srgb_to_pdf(value):
+    """
+    Paketli sRGB tamsayısını (0xRRGGBB) PDF renk üçlüsüne çevirir, NO_COLOR için None
+    """
+    if value == NO_COLOR:
+        return None
+    return ((value >> 16) & 255) / 255, ((value >> 8) & 255) / 255, (value & 255) / 255
+
+
+class PageSpans:
+    """
+    Bir sayfanın metin parçaları (span), sütun dizileri halinde.
+
+    Her span için ayrı sözlük ve bbox listesi yerine koordinatlar, font
+    boyutları, renkler ve bayraklar sayfa başına tek bir array içinde tutulur;
+    metinler string tablosunda, dolgu renkleri ise sayfanın renk paletinde
+    (tekrarlanan renkler bir kez) saklanır. Span'ler indeksleriyle okunur.
+    """
+
+    __slots__ = ("texts", "coords", "sizes", "colors", "flags", "fill_ids", "ambiguous", "palette")
+
+    def __init__(self):
+        self.texts = []
+        self.coords = array("d")  # x0, y0, x1, y1 art arda
+        self.sizes = array("d")
+        self.colors = array("l")  # paketli sRGB, NO_COLOR: bilinmiyor
+        self.flags = array("l")
+        self.fill_ids = array("l")  # palette indeksi, -1: dolgu yok (sayfa zemini)
+        self.ambiguous = array("b")  # arka plan vektör bilgisinden belirlenemiyor
+        self.palette = []
+
+    def __len__(self):
+        return len(self.texts)
+
+    def append(self, text, bbox, font_size=11, color=NO_COLOR, flags=0):
+        """
+        Yeni bir span ekler ve indeksini döndürür. Arka plan başlangıçta belirsiz sayılır.
+        """
+        self.texts.append(text)
+        self.coords.extend(bbox[:4])
+        self.sizes.append(font_size)
+        self.colors.append(NO_COLOR if color is None else color)
+        self.flags.append(flags)
+        self.fill_ids.append(-1)
+        self.ambiguous.append(1)
+        return len(self.texts) - 1
+
+    def bbox(self, i):
+        return tuple(self.coords[4 * i:4 * i + 4])
+
+    def boxes(self):
+        coords = self.coords
+        return [tuple(coords[i:i + 4]) for i in range(0, len(coords), 4)]
+
+    def color(self, i):
+        """
+        Span'in metin rengi (PDF renk üçlüsü) veya None
+        """
+        return srgb_to_pdf(self.colors[i])
+
+    def fill_color(self, i):
+        fill_id = self.fill_ids[i]
+        return self.palette[fill_id] if fill_id >= 0 else None
+
+    def set_background(self, i, fill_color, ambiguous):
+        """
+        Span'in arkasındaki dolgu rengini ve belirsizlik durumunu kaydeder
+        """
+        if fill_color is None:
+            self.fill_ids[i] = -1
+        else:
+            fill_color = tuple(fill_color)
+            if fill_color not in self.palette:
+                self.palette.append(fill_color)
+            self.fill_ids[i] = self.palette.index(fill_color)
+        self.ambiguous[i] = 1 if ambiguous else 0
+
+    def take(self, order):
+        """
+        Verilen indeks sırasıyla yeni bir PageSpans döndürür
+        """
+        spans = PageSpans()
+        spans.palette = list(self.palette)
+        spans.texts = [self.texts[i] for i in order]
+        coords = self.coords
+        spans.coords = array("d", [value for i in order for value in coords[4 * i:4 * i + 4]])
+        spans.sizes = array("d", [self.sizes[i] for i in order])
+        spans.colors = array("l", [self.colors[i] for i in order])
+        spans.flags = array("l", [self.flags[i] for i in order])
+        spans.fill_ids = array("l", [self.fill_ids[i] for i in order])
+        spans.ambiguous = array("b", [self.ambiguous[i] for i in order])
+        return spans
+
+    def to_dict(self):
+        """
+        JSON'a yazılabilir sözlük (kontrol noktası için)
+        """
+        return {
+            "texts": self.texts,
+            "coords": self.coords.tolist(),
+            "sizes": self.sizes.tolist(),
+            "colors": self.colors.tolist(),
+            "flags": self.flags.tolist(),
+            "fill_ids": self.fill_ids.tolist(),
+            "ambiguous": self.ambiguous.tolist(),
+            "palette": [list(color) for color in self.palette],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        spans = cls()
+        spans.texts = list(data["texts"])
+        spans.coords = array("d", data["coords"])
+        spans.sizes = array("d", data["sizes"])
+        spans.colors = array("l", data["colors"])
+        spans.flags = array("l", data["flags"])
+        spans.fill_ids = array("l", data["fill_ids"])
+        spans.ambiguous = array("b", data["ambiguous"])
+        spans.palette = [tuple(color) for color in data["palette"]]
+        return spans
+
+
+class TextGroup:
+    """
+    Paragraf olarak birleştirilmiş span'ler.
+
+    Grup, span'lerin kopyasını tutmaz; sayfanın PageSpans nesnesinde ardışık
+    [start, end) aralığını gösterir. Metin, yazı tipi ve renk bilgileri bu
+    aralıktan okunur; çeviri translated_text alanına yazılır.
+    """
+
+    __slots__ = ("spans", "start", "end", "bbox", "fill_color", "bg_ambiguous", "translated_text")
+
+    def __init__(self, spans, start, end):
+        self.spans = spans
+        self.start = start
+        self.end = end
+        self.translated_text = None
+
+        coords = spans.coords
+        self.bbox = (
+            min(coords[4 * i] for i in range(start, end)),
+            min(coords[4 * i + 1] for i in range(start, end)),
+            max(coords[4 * i + 2] for i in range(start, end)),
+            max(coords[4 * i + 3] for i in range(start, end)),
+        )
+
+        # Dolgu rengi sadece tüm span'lerde aynı ve kesinse kullanılır
+        fill_ids = set(spans.fill_ids[start:end])
+        self.bg_ambiguous = len(fill_ids) > 1 or any(spans.ambiguous[start:end])
+        self.fill_color = None if self.bg_ambiguous else spans.fill_color(start)
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def text(self):
+        return " ".join(self.spans.texts[self.start:self.end])
+
+    @property
+    def font_size(self):
+        return self.spans.sizes[self.start]
+
+    @property
+    def color(self):
+        return self.spans.color(self.start)
+
+    @property
+    def flags(self):
+        return self.spans.flags[self.start]
+
+
+def groups_to_dict(spans, groups):
+    """
+    Bir sayfanın span'lerini ve gruplarını JSON'a yazılabilir sözlüğe çevirir
+    """
+    return {"spans": spans.to_dict(), "ranges": [[group.start, group.end] for group in groups]}
+
+
+def groups_from_dict(data):
+    spans = PageSpans.from_dict(data["spans"])
+    return [TextGroup(spans, start, end) for start, end in data["ranges"]]
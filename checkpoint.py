@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan ayarlar (.env ile değiştirilebilir)
+DEFAULT_CHECKPOINT_DIR = os.path.join("cache", "jobs")
+DEFAULT_RETENTION = 7 * 24 * 60 * 60  # tamamlanmamış iş dizinlerinin saklanma süresi (saniye)
+
+
+class JobCheckpoint:
+    """
+    Bir çeviri işinin ara sonuçlarını iş dizininde saklar.
+
+    Her sayfa için çıkarılan bloklar, OCR stratejisi ve gruplar
+    pages/<sayfa>.json dosyasında tutulur; çeviriler sayfa dosyalarına
+    yazılmaz, batch sonuçları geldikçe translations.jsonl dosyasına eklenir
+    (ayrıca çeviri önbelleğine düşer). Aynı belge tekrar işlendiğinde
+    tamamlanmış adımlar atlanır, sadece eksik sayfalar ve çeviriler işlenir.
+    İş başarıyla bitince dizin silinir.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.pages_dir = os.path.join(directory, "pages")
+        self.translations_path = os.path.join(directory, "translations.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(self.pages_dir, exist_ok=True)
+
+    def _page_path(self, page_num):
+        return os.path.join(self.pages_dir, f"{page_num:05d}.json")
+
+    def load_page(self, page_num):
+        """
+        Sayfanın kayıtlı ara sonuçlarını döndürür, yoksa boş sözlük
+        """
+        path = self._page_path(page_num)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Kontrol noktası okunamadı (Sayfa {page_num+1}): {str(e)}")
+            return {}
+
+    def save_page(self, page_num, **fields):
+        """
+        Sayfanın ara sonuçlarını günceller (mevcut alanlarla birleştirir)
+        """
+        with self._lock:
+            data = self.load_page(page_num)
+            data.update(fields)
+            path = self._page_path(page_num)
+            temp_path = f"{path}.tmp"
+            # Yarım yazılmış dosya kalmaması için önce geçici dosyaya yaz
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+
+    def load_pages(self, page_count):
+        """
+        Kaydı bulunan sayfalar için {sayfa numarası: ara sonuçlar} döndürür
+        """
+        pages = {}
+        for page_num in range(page_count):
+            data = self.load_page(page_num)
+            if data:
+                pages[page_num] = data
+        return pages
+
+    def load_translations(self):
+        """
+        Kaydedilmiş {metin: çeviri} sözlüğünü döndürür
+        """
+        translations = {}
+        if not os.path.exists(self.translations_path):
+            return translations
+        with open(self.translations_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Kesintiye uğrayan son satır atlanır
+                    continue
+                translations[record["s"]] = record["t"]
+        return translations
+
+    def add_translations(self, translations):
+        """
+        Tamamlanan batch çevirilerini dosyaya ekler
+        """
+        if not translations:
+            return
+        with self._lock:
+            with open(self.translations_path, "a", encoding="utf-8") as f:
+                for text, translation in translations.items():
+                    f.write(json.dumps({"s": text, "t": translation}, ensure_ascii=False) + "\n")
+
+    def clear(self):
+        """
+        İş tamamlandığında ara sonuçları siler
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _prune(base_dir, retention):
+    """
+    Saklama süresi dolan (terk edilmiş) iş dizinlerini siler
+    """
+    cutoff = time.time() - retention
+    try:
+        names = os.listdir(base_dir)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(base_dir, name)
+        try:
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Süresi dolan kontrol noktası silindi: {name}")
+        except OSError:
+            pass
+
+
+def get_checkpoint(job_key):
+    """
+    .env ayarlarına göre iş anahtarı için kontrol noktası döndürür (devre dışıysa None)
+    """
+    if not job_key or os.getenv("CHECKPOINT_ENABLED", "true").lower() != "true":
+        return None
+
+    base_dir = os.getenv("CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR)
+    _prune(base_dir, int(os.getenv("CHECKPOINT_RETENTION", DEFAULT_RETENTION)))
+
+    directory = os.path.join(base_dir, job_key)
+    if os.path.isdir(directory):
+        os.utime(directory)
+        logger.info(f"Önceki denemeden kalan kontrol noktası bulundu, kaldığı yerden devam ediliyor: {job_key}")
+    return JobCheckpoint(directory)
@@ -0,0 +1,111 @@
+import numpy as np
+
+# Her kenardan alınan arka plan örneği sayısı
+EDGE_SAMPLES = 16
+# Benzer renkleri gruplamak için kanal başına niceleme adımı (16 -> 16x16x16 renk kutusu)
+QUANT_SHIFT = 4
+# Metin renginin arka plandan ayrılması için gereken en az fark (RGB toplam mutlak fark)
+TEXT_CONTRAST_THRESHOLD = 30
+
+
+def pixmap_array(pix):
+    """
+    Pixmap örneklerini kopyalamadan (yükseklik, genişlik, 3) uint8 dizisi olarak döndürür.
+    Dizi kullanıldığı sürece pixmap nesnesi canlı tutulmalıdır.
+    """
+    buffer = pix.samples_mv if hasattr(pix, "samples_mv") else pix.samples
+    arr = np.frombuffer(buffer, dtype=np.uint8)
+    arr = arr.reshape(pix.height, pix.stride)[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+    if pix.n < 3:
+        # Gri tonlamalı pixmap
+        return np.repeat(arr[:, :, :1], 3, axis=2)
+    return arr[:, :, :3]
+
+
+def _dominant_colors(samples):
+    """
+    Her satırdaki (blok) örneklerden en yaygın renk grubunun ortalamasını döndürür.
+    samples: (blok sayısı, örnek sayısı, 3) int dizisi
+    """
+    block_count, sample_count = samples.shape[:2]
+    quantized = samples >> QUANT_SHIFT
+    levels = 256 >> QUANT_SHIFT
+    codes = (quantized[..., 0] * levels + quantized[..., 1]) * levels + quantized[..., 2]
+    block_ids = np.repeat(np.arange(block_count), sample_count)
+    keys = block_ids * (levels ** 3) + codes.ravel()
+
+    unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    sums = np.zeros((len(unique_keys), 3), dtype=np.int64)
+    np.add.at(sums, inverse, samples.reshape(-1, 3))
+
+    # Her blok için en çok örneğe sahip renk grubunu seç
+    key_blocks = unique_keys // (levels ** 3)
+    order = np.lexsort((-counts, key_blocks))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = key_blocks[order][1:] != key_blocks[order][:-1]
+    winners = order[first]
+
+    return sums[winners] / counts[winners][:, None]
+
+
+def estimate_block_colors(arr, bboxes):
+    """
+    Bir sayfanın tüm blokları için arka plan ve metin rengini tek geçişte tahmin eder.
+
+    arr: pixmap_array() çıktısı, bboxes: sayfa koordinatlarında [x0, y0, x1, y1] listesi.
+    Her blok için ((r, g, b) arka plan, (r, g, b) metin) döndürür (0-1 aralığında).
+    """
+    if not len(bboxes):
+        return []
+
+    height, width = arr.shape[:2]
+    boxes = np.asarray(bboxes, dtype=float).reshape(-1, 4).astype(int)
+    x0 = np.clip(boxes[:, 0], 0, width - 1)
+    y0 = np.clip(boxes[:, 1], 0, height - 1)
+    x1 = np.clip(boxes[:, 2], 0, width - 1)
+    y1 = np.clip(boxes[:, 3], 0, height - 1)
+
+    # 1. Arka plan: metin alanının hemen dışındaki dört kenardan örnekler
+    steps = np.linspace(0, 1, EDGE_SAMPLES)
+    span_x0 = np.maximum(0, x0 - 5)
+    span_x1 = np.minimum(width - 1, x1 + 5)
+    span_y0 = np.maximum(0, y0 - 5)
+    span_y1 = np.minimum(height - 1, y1 + 5)
+    xs = span_x0[:, None] + np.rint((span_x1 - span_x0)[:, None] * steps).astype(int)
+    ys = span_y0[:, None] + np.rint((span_y1 - span_y0)[:, None] * steps).astype(int)
+
+    top = np.broadcast_to(np.maximum(0, y0 - 2)[:, None], xs.shape)
+    bottom = np.broadcast_to(np.minimum(height - 1, y1 + 2)[:, None], xs.shape)
+    left = np.broadcast_to(np.maximum(0, x0 - 2)[:, None], ys.shape)
+    right = np.broadcast_to(np.minimum(width - 1, x1 + 2)[:, None], ys.shape)
+
+    sample_x = np.concatenate([xs, xs, left, right], axis=1)
+    sample_y = np.concatenate([top, bottom, ys, ys], axis=1)
+    border_samples = arr[sample_y, sample_x].astype(np.int64)
+
+    bg_rgb = np.rint(_dominant_colors(border_samples)).astype(np.int64)
+
+    # 2. Metin: merkez ve çevresindeki beş noktadan arka plana en uzak olan
+    center_x = (x0 + x1) // 2
+    center_y = (y0 + y1) // 2
+    dx = (x1 - x0) // 4
+    dy = (y1 - y0) // 4
+    point_x = np.stack([center_x, center_x - dx, center_x + dx, center_x, center_x], axis=1)
+    point_y = np.stack([center_y, center_y, center_y, center_y - dy, center_y + dy], axis=1)
+    text_samples = arr[point_y, point_x].astype(np.int64)
+
+    diffs = np.abs(text_samples - bg_rgb[:, None, :]).sum(axis=2)
+    farthest = diffs.argmax(axis=1)
+    farthest_rgb = text_samples[np.arange(len(boxes)), farthest]
+    has_contrast = diffs.max(axis=1) > TEXT_CONTRAST_THRESHOLD
+
+    # Belirgin metin rengi yoksa arka plan parlaklığına göre siyah/beyaz seç
+    bg_colors = bg_rgb / 255
+    luminance = bg_colors @ np.array([0.299, 0.587, 0.114])
+    fallback = np.where((luminance > 0.5)[:, None], 0.0, 1.0) * np.ones((1, 3))
+    text_colors = np.where(has_contrast[:, None], farthest_rgb / 255, fallback)
+
+    return [
+        (tuple(float(c) for c in bg), tuple(float(c) for c in text))
+        for bg, text in zip(bg_colors, text_colors)
+    ]
@@ -0,0 +1,134 @@
+"""
+DeepL /v2/translate arayüzünü taklit eden yerel HTTP sunucusu.
+
+Ağ erişimi olmadan tüm çeviri hattının verimini ve gecikmesini ölçmek için
+kullanılır. DeepL istemcisini bu sunucuya yönlendirmek için:
+
+    python deepl_stub_server.py --port 8090 --latency 0.1 --error-rate 0.02
+    DEEPL_SERVER_URL=http://127.0.0.1:8090 DEEPL_API_KEY=stub python app.py
+"""
+import json
+import logging
+import argparse
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from translation_backends import StubBackend, ThrottledError, TransientBackendError
+
+logger = logging.getLogger(__name__)
+
+
+class DeepLStubHandler(BaseHTTPRequestHandler):
+    backend = None  # make_server tarafından atanır
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_params(self):
+        """
+        Hem form (eski istemciler) hem JSON (yeni istemciler) gövdesini okur
+        """
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            data = json.loads(raw or "{}")
+            texts = data.get("text", [])
+            if isinstance(texts, str):
+                texts = [texts]
+            return texts, data.get("source_lang"), data.get("target_lang")
+
+        data = parse_qs(raw)
+        return data.get("text", []), (data.get("source_lang") or [None])[0], (data.get("target_lang") or [None])[0]
+
+    def do_POST(self):
+        if self.path.rstrip("/") == "/v2/usage":
+            self._send_json(200, {"character_count": self.backend.characters, "character_limit": 10 ** 12})
+            return
+
+        if self.path.rstrip("/") != "/v2/translate":
+            self._send_json(404, {"message": "Not found"})
+            return
+
+        try:
+            texts, source_lang, target_lang = self._read_params()
+        except (ValueError, UnicodeDecodeError):
+            self._send_json(400, {"message": "Invalid request body"})
+            return
+
+        if not texts or not target_lang:
+            self._send_json(400, {"message": "Parameter 'text' and 'target_lang' are required"})
+            return
+
+        try:
+            translations = self.backend.translate_batch(texts, source_lang, target_lang)
+        except ThrottledError as e:
+            self._send_json(429, {"message": str(e)})
+            return
+        except TransientBackendError as e:
+            self._send_json(503, {"message": str(e)})
+            return
+
+        self._send_json(200, {"translations": [
+            {"detected_source_language": (source_lang or "TR").upper(), "text": text, "billed_characters": len(source)}
+            for source, text in zip(texts, translations)
+        ]})
+
+    do_GET = do_POST
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def make_server(host="127.0.0.1", port=8090, backend=None):
+    """
+    Verilen (veya varsayılan) StubBackend ile bir sunucu oluşturur. port=0
+    verilirse boş bir port seçilir (server.server_address ile okunabilir).
+    """
+    handler = type("BoundDeepLStubHandler", (DeepLStubHandler,), {"backend": backend or StubBackend()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_in_thread(host="127.0.0.1", port=0, backend=None):
+    """
+    Sunucuyu arka plan iş parçacığında başlatır ve (sunucu, url) döndürür
+    """
+    server = make_server(host, port, backend)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Yerel DeepL uyumlu çeviri sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.05, help="İstek başına gecikme (saniye)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Gecikmeye eklenen rastgele pay (saniye)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 yanıtı olasılığı (0-1)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Saniyedeki en fazla istek (aşılınca 429)")
+    parser.add_argument("--expansion", type=float, default=1.0, help="Çeviri/kaynak uzunluk oranı")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, StubBackend(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        expansion=args.expansion
+    ))
+    logger.info(f"DeepL uyumlu sunucu dinleniyor: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,188 @@
+import os
+import time
+import uuid
+import queue
+import threading
+import logging
+import traceback
+
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan kuyruk ayarları (.env ile değiştirilebilir)
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 20
+DEFAULT_RETENTION = 24 * 60 * 60  # tamamlanan işlerin bellekte tutulma süresi (saniye)
+
+
+class QueueFullError(Exception):
+    """
+    Kuyruk kapasitesi dolduğunda yeni iş kabul edilmez
+    """
+
+
+class Job:
+    """
+    Kuyruktaki tek bir çeviri işi
+    """
+
+    def __init__(self, target, params, dedup_key=None):
+        self.id = uuid.uuid4().hex
+        self.target = target
+        self.params = params
+        self.dedup_key = dedup_key
+        self.attached = 0  # bu işe bağlanan aynı istek sayısı
+        self.status = "queued"  # queued -> running -> done / failed
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done_event = threading.Event()
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Sınırlı kapasiteli iş kuyruğu ve arka plan işçi havuzu.
+
+    submit() işi kuyruğa ekleyip hemen döner; işçi iş parçacıkları
+    target(**params) çağrısını çalıştırır ve dönüş değerini job.result'a yazar.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_QUEUE_SIZE, retention=DEFAULT_RETENTION):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.retention = retention
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._running = 0
+        self._threads = []
+        self._inflight = {}  # dedup_key -> bekleyen veya çalışan iş
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i+1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(f"İş kuyruğu başlatıldı: {self.workers} işçi, en fazla {max_queue} bekleyen iş")
+
+    def submit(self, target, dedup_key=None, **params):
+        """
+        İşi kuyruğa ekler. Kuyruk doluysa QueueFullError fırlatır.
+
+        dedup_key verilmişse ve aynı anahtarlı bir iş bekliyor veya çalışıyorsa
+        yeni iş oluşturulmaz, mevcut iş döndürülür.
+        """
+        with self._lock:
+            existing = self._inflight.get(dedup_key) if dedup_key else None
+            if existing is not None:
+                existing.attached += 1
+                metrics.JOBS_SUBMITTED.inc(result="attached")
+                logger.info(f"Aynı iş zaten kuyrukta, mevcut işe bağlanıldı: {existing.id}")
+                return existing
+
+            job = Job(target, params, dedup_key)
+            self._prune()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                metrics.JOBS_SUBMITTED.inc(result="rejected")
+                raise QueueFullError("İş kuyruğu dolu, lütfen daha sonra tekrar deneyin")
+            self._jobs[job.id] = job
+            if dedup_key:
+                self._inflight[dedup_key] = job
+        metrics.JOBS_SUBMITTED.inc(result="queued")
+
+        logger.info(f"İş kuyruğa eklendi: {job.id} (bekleyen: {self._queue.qsize()})")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "running": self._running,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+            }
+
+    def _prune(self):
+        """
+        Saklama süresi dolan tamamlanmış işleri bellekten siler
+        """
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._running += 1
+            job.status = "running"
+            job.started_at = time.time()
+            metrics.JOB_WAIT_SECONDS.observe(job.started_at - job.created_at)
+
+            # İşin tüm logları ve span'leri iş kimliğiyle ilişkilendirilir
+            with tracing.trace(job.id, "job", queue_wait=round(job.started_at - job.created_at, 3),
+                               attached=job.attached) as job_span:
+                logger.info(f"İş başlatıldı: {job.id}")
+                try:
+                    job.result = job.target(**job.params)
+                    job.status = "done"
+                    logger.info(f"İş tamamlandı: {job.id} ({time.time() - job.started_at:.1f} sn)")
+                except Exception as e:
+                    job.status = "failed"
+                    job.error = str(e)
+                    job_span.status = "error"
+                    job_span.error = str(e)
+                    logger.error(f"İş başarısız: {job.id}: {str(e)}")
+                    logger.error(f"Hata detayı: {traceback.format_exc()}")
+                finally:
+                    job.finished_at = time.time()
+                    metrics.JOBS_FINISHED.inc(status=job.status)
+                    metrics.JOB_SECONDS.observe(job.finished_at - job.started_at)
+                    with self._lock:
+                        self._running -= 1
+                        if job.dedup_key and self._inflight.get(job.dedup_key) is job:
+                            del self._inflight[job.dedup_key]
+                    job.done_event.set()
+                    self._queue.task_done()
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    .env ayarlarına göre paylaşılan iş kuyruğunu döndürür (ilk çağrıda başlatır)
+    """
+    global _default_queue
+
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue(
+                workers=int(os.getenv("JOB_WORKERS", DEFAULT_WORKERS)),
+                max_queue=int(os.getenv("JOB_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)),
+                retention=int(os.getenv("JOB_RETENTION", DEFAULT_RETENTION))
+            )
+        return _default_queue
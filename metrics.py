@@ -0,0 +1,231 @@
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+# Aşama süreleri için histogram sınırları (saniye)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Etiketli ölçüm değerlerinin ortak temeli (iş parçacığı güvenli)
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} için etiketler {self.labelnames} olmalı, verilen: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        """
+        (örnek adı, etiket metni, değer) üçlüleri
+        """
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in sorted(values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Sayaç azaltılamaz")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Gözlemleri sabit sınırlı kovalarda sayar; toplam ve sayı da tutulur
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Blok süresini gözlem olarak ekler
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            values = {key: (list(state[0]), state[1], state[2]) for key, state in self._values.items()}
+
+        samples = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, le), cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Süreçteki ölçümlerin kaydı; render() Prometheus metin biçimini üretir
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Ölçüm zaten kayıtlı: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Çeviri hattı
+STAGE_SECONDS = REGISTRY.histogram(
+    "pdf_stage_duration_seconds",
+    "Belge başına aşama süresi (extract, ocr, group, translate, layout, render, save; render yerleşimi içerir)",
+    ["stage"]
+)
+DOCUMENTS = REGISTRY.counter(
+    "pdf_documents_total", "İşlenen belgeler (success, no_text, failed: hata nedeniyle orijinal kopyalandı)", ["result"]
+)
+PAGES = REGISTRY.counter(
+    "pdf_pages_processed_total", "İşlenen sayfalar, çıkarma stratejisine göre (text, ocr, empty)", ["strategy"]
+)
+CHARACTERS = REGISTRY.counter(
+    "pdf_characters_processed_total", "Sayfalardan çıkarılan kaynak metin karakterleri"
+)
+
+# Çeviri API'si
+API_BATCHES = REGISTRY.counter(
+    "translation_api_batches_total", "Çeviri API'sine gönderilen batch'ler (success, failed)", ["result"]
+)
+API_ERRORS = REGISTRY.counter(
+    "translation_api_errors_total", "Çeviri API'si hataları, türüne göre (throttle, transient, fatal)", ["kind"]
+)
+API_CHARACTERS = REGISTRY.counter(
+    "translation_api_characters_total", "Çeviri API'si ile başarıyla çevrilen karakterler"
+)
+API_SECONDS = REGISTRY.histogram(
+    "translation_api_request_duration_seconds", "Tek bir çeviri API isteğinin süresi"
+)
+
+# Önbellekler
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cache_lookups_total", "Önbellek sorguları (cache: translation, ocr, result; result: hit, miss)", ["cache", "result"]
+)
+
+# İş kuyruğu
+JOBS_SUBMITTED = REGISTRY.counter(
+    "jobs_submitted_total", "Gönderilen işler (queued, attached: aynı işe bağlandı, rejected: kuyruk dolu)", ["result"]
+)
+JOBS_FINISHED = REGISTRY.counter(
+    "jobs_finished_total", "Biten işler (done, failed)", ["status"]
+)
+JOB_SECONDS = REGISTRY.histogram(
+    "job_duration_seconds", "İşin çalışma süresi (kuyrukta bekleme hariç)"
+)
+JOB_WAIT_SECONDS = REGISTRY.histogram(
+    "job_queue_wait_seconds", "İşin kuyrukta bekleme süresi"
+)
+QUEUE_DEPTH = REGISTRY.gauge("job_queue_depth", "Kuyrukta bekleyen iş sayısı")
+QUEUE_CAPACITY = REGISTRY.gauge("job_queue_capacity", "Kuyrukta bekleyebilecek en fazla iş")
+JOBS_IN_FLIGHT = REGISTRY.gauge("jobs_in_flight", "Çalışmakta olan iş sayısı")
+JOB_WORKERS = REGISTRY.gauge("job_workers", "İş kuyruğu işçi sayısı")
@@ -0,0 +1,161 @@
+import os
+import zlib
+import sqlite3
+import hashlib
+import threading
+import time
+import logging
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan önbellek ayarları (.env ile değiştirilebilir)
+DEFAULT_CACHE_PATH = os.path.join("cache", "ocr_cache.sqlite3")
+DEFAULT_MAX_MB = 500
+
+
+class OCRCache:
+    """
+    Diskte kalıcı, içerik adresli OCR sonuç önbelleği.
+
+    Anahtar, OCR'a verilen sayfa görüntüsünün baytlarının özetidir (DPI, dil
+    modeli ve Tesseract sürümü ile birlikte); aynı belge tekrar yüklendiğinde
+    sayfa Tesseract'a gönderilmeden sonuç bulunur. Tesseract çıktısı (TSV)
+    sıkıştırılarak SQLite veritabanında tutulur. Toplam boyut max_bytes
+    değerini aşınca en uzun süredir kullanılmayan kayıtlar silinir (LRU).
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results ("
+                " key TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_results_last_used ON ocr_results(last_used)")
+
+    def _connect(self):
+        """
+        Her iş parçacığı için ayrı bir SQLite bağlantısı döndürür
+        """
+        conn = getattr(self._local, "conn", None)
+        # fork sonrası üst sürecin bağlantısı kullanılmamalı
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(image_bytes, dpi, lang, engine=""):
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        raw = f"{engine}\x1f{dpi}\x1f{lang}\x1f{digest}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Kayıtlı OCR çıktısını döndürür, yoksa None
+        """
+        output = None
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT data FROM ocr_results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                output = zlib.decompress(row[0]).decode("utf-8")
+                with conn:
+                    conn.execute("UPDATE ocr_results SET last_used = ? WHERE key = ?", (time.time(), key))
+        except (sqlite3.Error, zlib.error) as e:
+            logger.error(f"OCR önbelleği okunurken hata: {str(e)}")
+            output = None
+
+        with self._lock:
+            if output is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.CACHE_LOOKUPS.inc(cache="ocr", result="miss" if output is None else "hit")
+        return output
+
+    def put(self, key, output):
+        """
+        OCR çıktısını önbelleğe yazar
+        """
+        data = zlib.compress(output.encode("utf-8"))
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr_results VALUES (?, ?, ?, ?)",
+                    (key, data, len(data), time.time())
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.error(f"OCR önbelleğine yazılırken hata: {str(e)}")
+
+    def _evict(self, conn):
+        """
+        Boyut sınırı aşıldıysa en eski kullanılan kayıtları siler
+        """
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+        overflow = total - self.max_bytes
+        if overflow <= 0:
+            return
+
+        expired = []
+        freed = 0
+        for key, size in conn.execute("SELECT key, size FROM ocr_results ORDER BY last_used ASC"):
+            expired.append((key,))
+            freed += size
+            if freed >= overflow:
+                break
+        conn.executemany("DELETE FROM ocr_results WHERE key = ?", expired)
+        logger.info(f"OCR önbelleğinden {len(expired)} eski kayıt silindi ({freed} bayt)")
+
+    def stats(self):
+        conn = self._connect()
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    """
+    .env ayarlarına göre paylaşılan OCR önbelleğini döndürür (devre dışıysa None)
+    """
+    global _default_cache
+
+    if os.getenv("OCR_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = OCRCache(
+                db_path=os.getenv("OCR_CACHE_PATH", DEFAULT_CACHE_PATH),
+                max_bytes=int(float(os.getenv("OCR_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+            )
+        return _default_cache
@@ -0,0 +1,268 @@
+import os
+import csv
+import logging
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz  # PyMuPDF
+import pytesseract
+
+from ocr_cache import get_ocr_cache
+from block_model import PageSpans
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan OCR ayarları (.env ile değiştirilebilir)
+DEFAULT_OCR_DPI = 200
+DEFAULT_OCR_TIMEOUT = 120  # sayfa başına saniye
+
+# Kaynak dil kodu (DeepL) -> Tesseract dil modeli
+TESSERACT_LANGS = {
+    "TR": "tur",
+    "DE": "deu",
+    "EN": "eng",
+    "EN-GB": "eng",
+    "EN-US": "eng",
+    "FR": "fra",
+    "ES": "spa",
+    "IT": "ita",
+    "NL": "nld",
+    "PL": "pol",
+    "PT": "por",
+    "PT-PT": "por",
+    "PT-BR": "por",
+    "RU": "rus",
+    "UK": "ukr",
+    "BG": "bul",
+    "CS": "ces",
+    "DA": "dan",
+    "EL": "ell",
+    "ET": "est",
+    "FI": "fin",
+    "HU": "hun",
+    "ID": "ind",
+    "JA": "jpn",
+    "KO": "kor",
+    "LT": "lit",
+    "LV": "lav",
+    "NB": "nor",
+    "RO": "ron",
+    "SK": "slk",
+    "SL": "slv",
+    "SV": "swe",
+    "ZH": "chi_sim",
+}
+
+_probe_lock = threading.Lock()
+_probe = None  # (kurulu mu, kurulu dil modelleri, sürüm)
+
+
+class OCRUnavailableError(Exception):
+    """
+    Tesseract kurulu değil veya çalıştırılamıyor
+    """
+
+
+def probe_tesseract():
+    """
+    Tesseract'ı süreç başına bir kez kontrol eder: (kurulu mu, dil modelleri kümesi, sürüm)
+    """
+    global _probe
+
+    with _probe_lock:
+        if _probe is None:
+            try:
+                version = pytesseract.get_tesseract_version()
+                try:
+                    languages = set(pytesseract.get_languages())
+                except Exception:
+                    languages = set()
+                _probe = (True, languages, str(version))
+                logger.info(f"Tesseract OCR bulundu: {version} ({len(languages)} dil modeli)")
+            except Exception as e:
+                _probe = (False, set(), "")
+                logger.error(f"Tesseract OCR kurulu değil: {str(e)}")
+        return _probe
+
+
+def tesseract_available():
+    return probe_tesseract()[0]
+
+
+def tesseract_lang(source_lang):
+    """
+    Kaynak dil için kullanılacak Tesseract modelini döndürür.
+    OCR_LANG ayarı (örn. "tur+eng") eşlemeyi geçersiz kılar.
+    """
+    override = os.getenv("OCR_LANG")
+    if override:
+        return override
+
+    lang = TESSERACT_LANGS.get((source_lang or "").upper())
+    if lang is None:
+        lang = TESSERACT_LANGS.get((source_lang or "").split("-")[0].upper(), "eng")
+
+    available, languages, _ = probe_tesseract()
+    if available and languages and lang not in languages:
+        logger.warning(f"Tesseract dil modeli kurulu değil: {lang}, 'eng' kullanılıyor")
+        return "eng"
+    return lang
+
+
+def ocr_workers():
+    workers = int(os.getenv("OCR_WORKERS", 0))
+    # 0: tüm çekirdekleri kullan
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def parse_tsv(output, scale=1.0, matrix=None):
+    """
+    Tesseract TSV çıktısını kelime span'lerine (PageSpans) dönüştürür.
+    Koordinatlar scale ile ölçeklenir ve varsa matrix ile sayfa koordinatlarına çevrilir.
+    """
+    spans = PageSpans()
+    reader = csv.DictReader(output.splitlines(), delimiter="\t", quoting=csv.QUOTE_NONE)
+    for row in reader:
+        text = row.get("text") or ""
+        if row.get("level") != "5" or not text.strip():
+            continue
+
+        left, top = int(row["left"]), int(row["top"])
+        width, height = int(row["width"]), int(row["height"])
+        rect = fitz.Rect(left, top, left + width, top + height) * scale
+        if matrix is not None:
+            rect = rect * matrix
+
+        # Varsayılan yazı tipi boyutu; renk bilinmiyor
+        spans.append(text, (rect.x0, rect.y0, rect.x1, rect.y1), 11)
+    return spans
+
+
+class OCREngine:
+    """
+    Sayfaları bellekte görüntüye çevirip Tesseract'a veren OCR motoru.
+
+    Görüntü sıkıştırılmamış PNM olarak tesseract'ın standart girdisine
+    yazılır, TSV çıktısı standart çıktıdan okunur; diske geçici dosya
+    yazılmaz. Çok sayfalı işlerde sayfalar iş parçacığı havuzunda eşzamanlı
+    işlenir (her Tesseract çağrısı ayrı bir süreçtir).
+    """
+
+    def __init__(self, source_lang="TR", dpi=None, workers=None, timeout=None, cache=None):
+        self.source_lang = source_lang
+        # Aynı sayfa görüntüsü için OCR sonucu diskteki önbellekten okunur
+        self.cache = cache if cache is not None else get_ocr_cache()
+        self.dpi = dpi or int(os.getenv("OCR_DPI", DEFAULT_OCR_DPI))
+        self.workers = workers or ocr_workers()
+        self.timeout = timeout or int(os.getenv("OCR_TIMEOUT", DEFAULT_OCR_TIMEOUT))
+        self._lang = None
+
+    @property
+    def lang(self):
+        if self._lang is None:
+            self._lang = tesseract_lang(self.source_lang)
+        return self._lang
+
+    def _render(self, page):
+        """
+        Sayfayı OCR çözünürlüğünde PNM baytlarına çevirir (ana iş parçacığında çağrılmalı)
+        """
+        pix = page.get_pixmap(dpi=self.dpi, alpha=False)
+        return pix.tobytes("pnm"), 72 / self.dpi, page.derotation_matrix
+
+    def _run_tesseract(self, image_bytes):
+        command = [
+            pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout",
+            "-l", self.lang, "--dpi", str(self.dpi), "tsv"
+        ]
+        env = os.environ
+        if self.workers > 1:
+            # Sayfalar zaten paralel işleniyor; Tesseract'ın kendi iş parçacıkları çekirdekleri aşırı yükler
+            env = dict(os.environ, OMP_THREAD_LIMIT="1")
+
+        result = subprocess.run(command, input=image_bytes, capture_output=True, timeout=self.timeout, env=env)
+        if result.returncode != 0:
+            raise RuntimeError(f"Tesseract hata kodu {result.returncode}: {result.stderr.decode(errors='replace').strip()}")
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def _recognize(self, rendered):
+        """
+        Görüntüyü OCR ile okur: (span'ler, önbellekten mi)
+        """
+        image_bytes, scale, matrix = rendered
+        output = None
+        if self.cache is not None:
+            key = self.cache.make_key(image_bytes, self.dpi, self.lang, probe_tesseract()[2])
+            output = self.cache.get(key)
+
+        cached = output is not None
+        if not cached:
+            output = self._run_tesseract(image_bytes)
+            if self.cache is not None:
+                self.cache.put(key, output)
+
+        return parse_tsv(output, scale, matrix), cached
+
+    def recognize_page(self, page):
+        """
+        Tek bir sayfayı OCR ile okur ve span'lerini döndürür
+        """
+        if not tesseract_available():
+            raise OCRUnavailableError("Tesseract OCR kurulu değil")
+        return self._recognize(self._render(page))[0]
+
+    def recognize_pages(self, doc, page_numbers):
+        """
+        Sayfaları eşzamanlı olarak OCR ile okur: {sayfa numarası: PageSpans}.
+        Başarısız sayfalar sonuçta yer almaz. Tesseract yoksa boş sözlük döner.
+
+        Görüntüler ana iş parçacığında sırayla oluşturulur (PyMuPDF iş parçacığı
+        güvenli değildir); bellekte en fazla 2 x işçi sayısı kadar görüntü bekler.
+        """
+        page_numbers = list(page_numbers)
+        if not page_numbers or not tesseract_available():
+            return {}
+
+        logger.info(f"OCR işlemi başlatılıyor: {len(page_numbers)} sayfa, {self.dpi} DPI, dil: {self.lang}, "
+                    f"{min(self.workers, len(page_numbers))} işçi")
+
+        results = {}
+        cached_pages = []
+        window = max(1, self.workers) * 2
+
+        def recognize(page_num, rendered):
+            with tracing.span("ocr_page", page=page_num + 1) as page_span:
+                blocks, cached = self._recognize(rendered)
+                page_span.set(cached=cached, spans=len(blocks))
+                return blocks, cached
+
+        def collect(page_num, future):
+            try:
+                results[page_num], cached = future.result()
+                if cached:
+                    cached_pages.append(page_num)
+            except Exception as e:
+                logger.error(f"OCR işlemi sırasında hata (Sayfa {page_num+1}): {str(e)}")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(page_numbers)))) as pool:
+            pending = deque()
+            for page_num in page_numbers:
+                if len(pending) >= window:
+                    collect(*pending.popleft())
+                try:
+                    rendered = self._render(doc[page_num])
+                except Exception as e:
+                    logger.error(f"OCR için sayfa görüntüsü oluşturulamadı (Sayfa {page_num+1}): {str(e)}")
+                    continue
+                # İş parçacığındaki span ve loglar geçerli iz ile ilişkilendirilir
+                pending.append((page_num, pool.submit(tracing.bind(recognize), page_num, rendered)))
+
+            while pending:
+                collect(*pending.popleft())
+
+        if self.cache is not None:
+            logger.info(f"OCR önbelleği: {len(cached_pages)}/{len(page_numbers)} sayfa önbellekten okundu")
+        return results
@@ -0,0 +1,92 @@
+import unicodedata
+
+import fitz  # PyMuPDF
+
+# OCR modları: auto (sayfa başına karar), always (her sayfada OCR), never (OCR yok)
+OCR_MODES = ("auto", "always", "never")
+
+# Sayfa sınıflandırma eşikleri
+MIN_TEXT_CHARS = 50          # bundan az karakter "metin katmanı zayıf" sayılır
+MIN_TEXT_COVERAGE = 0.02     # metin alanının sayfa alanına oranı
+SCAN_IMAGE_COVERAGE = 0.5    # görüntülerin kapladığı alan bunu aşarsa taranmış sayfa olabilir
+MIN_IMAGE_COVERAGE = 0.05    # metinsiz sayfada OCR'a değecek en az görüntü alanı
+MIN_VECTOR_PATHS = 50        # metinsiz sayfada çizimle oluşturulmuş yazı olabilecek en az yol sayısı
+MAX_BAD_GLYPH_RATIO = 0.3    # çözülemeyen karakter oranı (bozuk ToUnicode tablosu)
+
+
+def normalize_ocr_mode(value):
+    """
+    OCR ayarını moda çevirir. Eski True/False değerleri de kabul edilir:
+    True -> always, False -> auto (eski davranışta da metinsiz sayfalar OCR'a düşüyordu)
+    """
+    if isinstance(value, bool):
+        return "always" if value else "auto"
+    value = str(value or "auto").strip().lower()
+    if value in ("true", "1", "yes", "on"):
+        return "always"
+    if value in ("false", "0", "no", ""):
+        return "auto"
+    if value == "off":
+        return "never"
+    if value not in OCR_MODES:
+        raise ValueError(f"Geçersiz OCR modu: {value} (auto, always veya never olmalı)")
+    return value
+
+
+def _is_bad_glyph(char):
+    if char == "\ufffd":
+        return True
+    category = unicodedata.category(char)
+    return category == "Co" or (category == "Cc" and char not in "\t\n\r")
+
+
+def classify_page(page, text_dict=None):
+    """
+    Sayfanın metin katmanıyla mı yoksa OCR ile mi okunması gerektiğine karar verir.
+
+    Metin katmanı kapsaması, görüntü alanı ve karakter sağlığına bakılır; sayfa
+    raster edilmez. {"strategy": "text" | "ocr" | "empty", "reason": ..., ölçümler} döndürür.
+    """
+    if text_dict is None:
+        text_dict = page.get_text("dict")
+
+    page_area = abs(page.rect) or 1
+    chars = 0
+    bad_chars = 0
+    text_area = 0.0
+    for block in text_dict.get("blocks", []):
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                text = span.get("text", "").strip()
+                if not text:
+                    continue
+                chars += len(text)
+                bad_chars += sum(1 for char in text if _is_bad_glyph(char))
+                text_area += abs(fitz.Rect(span["bbox"]))
+
+    image_area = 0.0
+    for image in page.get_image_info():
+        image_area += abs(fitz.Rect(image["bbox"]) & page.rect)
+
+    result = {
+        "chars": chars,
+        "text_coverage": round(min(1.0, text_area / page_area), 4),
+        "image_coverage": round(min(1.0, image_area / page_area), 4),
+        "bad_glyph_ratio": round(bad_chars / chars, 4) if chars else 0.0,
+    }
+
+    if chars and result["bad_glyph_ratio"] > MAX_BAD_GLYPH_RATIO:
+        result.update(strategy="ocr", reason="metin katmanı çözülemeyen karakterler içeriyor")
+    elif result["image_coverage"] >= SCAN_IMAGE_COVERAGE and (
+            chars < MIN_TEXT_CHARS or result["text_coverage"] < MIN_TEXT_COVERAGE):
+        result.update(strategy="ocr", reason="sayfa büyük ölçüde görüntü, metin katmanı zayıf")
+    elif chars == 0 and result["image_coverage"] >= MIN_IMAGE_COVERAGE:
+        result.update(strategy="ocr", reason="metin katmanı yok, görüntü içeriyor")
+    elif chars == 0 and len(page.get_cdrawings()) >= MIN_VECTOR_PATHS:
+        result.update(strategy="ocr", reason="metin katmanı yok, çizimle oluşturulmuş yazı olabilir")
+    elif chars == 0:
+        result.update(strategy="empty", reason="sayfada metin veya görüntü yok")
+    else:
+        result.update(strategy="text", reason="metin katmanı kullanılabilir")
+
+    return result
@@ -0,0 +1,167 @@
+import os
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan ayarlar (.env ile değiştirilebilir). PAGE_WORKERS=1 paralel modu kapatır.
+DEFAULT_PAGE_WORKERS = 1
+DEFAULT_MIN_PAGES = 20
+
+_pool = None
+_pool_lock = threading.Lock()
+_worker_logging = False
+
+
+def page_workers():
+    workers = int(os.getenv("PAGE_WORKERS", DEFAULT_PAGE_WORKERS))
+    # 0: tüm çekirdekleri kullan
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def use_page_pool(page_count):
+    """
+    Belge, sayfaların işlem havuzuna dağıtılmasına değecek kadar büyük mü?
+    """
+    return page_workers() > 1 and page_count >= int(os.getenv("PAGE_PARALLEL_MIN_PAGES", DEFAULT_MIN_PAGES))
+
+
+def get_page_pool():
+    """
+    Süreç genelinde paylaşılan sayfa işleme havuzunu döndürür.
+
+    İşçiler "spawn" ile başlatılır; Flask iş parçacıkları çalışırken fork
+    kullanmak kilitlenmelere yol açabilir.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            workers = page_workers()
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown, wait=False)
+            logger.info(f"Sayfa işleme havuzu başlatıldı: {workers} işçi süreci")
+        return _pool
+
+
+def shard_pages(page_count, shards):
+    """
+    Sayfaları ardışık ve mümkün olduğunca eşit aralıklara böler: [(başlangıç, bitiş), ...]
+    """
+    shards = max(1, min(shards, page_count))
+    size, remainder = divmod(page_count, shards)
+    ranges = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < remainder else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _add_seconds(total, seconds):
+    for stage, value in seconds.items():
+        total[stage] = total.get(stage, 0.0) + value
+
+
+def _configure_worker_logging():
+    """
+    İşçi sürecinin loglarına da iz kimliği eklenir (süreç başına bir kez)
+    """
+    global _worker_logging
+
+    if not _worker_logging:
+        tracing.configure_logging()
+        _worker_logging = True
+
+
+def _extract_worker(pdf_path, source_lang, target_lang, page_numbers, ocr_mode, trace_context=None):
+    from pdf_translator import PDFTranslator
+
+    _configure_worker_logging()
+    translator = PDFTranslator(source_lang=source_lang, target_lang=target_lang)
+    doc = fitz.open(pdf_path)
+    try:
+        # Sayfa span'leri ana süreçteki aşama span'inin altına bağlanır
+        with tracing.attach(trace_context):
+            pages_content = translator._extract_pages(doc, page_numbers, ocr_mode)
+        return pages_content, translator.page_strategies, translator.stage_seconds
+    finally:
+        doc.close()
+
+
+def _render_worker(pdf_path, source_lang, target_lang, pages, trace_context=None):
+    from pdf_translator import PDFTranslator
+
+    _configure_worker_logging()
+    translator = PDFTranslator(source_lang=source_lang, target_lang=target_lang)
+    doc = fitz.open(pdf_path)
+    try:
+        with tracing.attach(trace_context):
+            partial_doc = translator._render_pages(doc, pages)
+        try:
+            # Ara belge sıkıştırılmadan aktarılır; son kayıt tüm belgeyi yeniden düzenler
+            return partial_doc.tobytes(), translator.stage_seconds
+        finally:
+            partial_doc.close()
+    finally:
+        doc.close()
+
+
+def extract_pages_parallel(pdf_path, source_lang, target_lang, page_numbers, ocr_mode="auto", trace_context=None):
+    """
+    Verilen sayfaları ardışık parçalar halinde işçilere dağıtarak metin çıkarır.
+    (sayfa sırasıyla bloklar, {sayfa numarası: strateji}, işçilerde ölçülen {aşama: süre}) döndürür.
+    trace_context: işçilerdeki span'lerin bağlanacağı üst span (tracing.current_context())
+    """
+    page_numbers = list(page_numbers)
+    pool = get_page_pool()
+    ranges = shard_pages(len(page_numbers), page_workers())
+    logger.info(f"Paralel metin çıkarma: {len(page_numbers)} sayfa, {len(ranges)} parça")
+
+    futures = [
+        pool.submit(_extract_worker, pdf_path, source_lang, target_lang, page_numbers[start:end], ocr_mode, trace_context)
+        for start, end in ranges
+    ]
+
+    pages_content = []
+    strategies = {}
+    stage_seconds = {}
+    for future in futures:
+        pages, page_strategies, worker_seconds = future.result()
+        pages_content.extend(pages)
+        strategies.update(page_strategies)
+        _add_seconds(stage_seconds, worker_seconds)
+    return pages_content, strategies, stage_seconds
+
+
+def render_pages_parallel(pdf_path, source_lang, target_lang, pages, trace_context=None):
+    """
+    (sayfa numarası, bloklar) çiftlerini işçilerde ara belgelere işler ve
+    sayfa sırasıyla tek bir belgede birleştirir: (belge, işçilerde ölçülen {aşama: süre})
+    """
+    pool = get_page_pool()
+    ranges = shard_pages(len(pages), page_workers())
+    logger.info(f"Paralel PDF oluşturma: {len(pages)} sayfa, {len(ranges)} parça")
+
+    futures = [
+        pool.submit(_render_worker, pdf_path, source_lang, target_lang, pages[start:end], trace_context)
+        for start, end in ranges
+    ]
+
+    new_doc = fitz.open()
+    stage_seconds = {}
+    for future in futures:
+        data, worker_seconds = future.result()
+        partial_doc = fitz.open("pdf", data)
+        new_doc.insert_pdf(partial_doc)
+        partial_doc.close()
+        _add_seconds(stage_seconds, worker_seconds)
+    return new_doc, stage_seconds
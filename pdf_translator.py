@@ -1,15 +1,31 @@
 import os
 import fitz  # PyMuPDF
-import deepl
 from dotenv import load_dotenv
 from pathlib import Path
 import time
 import logging
 import traceback
-from pdf2image import convert_from_path
-import pytesseract
-import tempfile
 import shutil  # PDF kopyalamak için
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from translation_cache import get_translation_memory
+from batch_planner import TranslationPlan, pack_batches, plan_windows, DEFAULT_MAX_CHARS, DEFAULT_MAX_SEGMENTS
+from translation_dispatcher import create_dispatcher, TranslationDispatchError
+from translation_backends import create_backend, backend_namespace
+from page_parallel import use_page_pool, extract_pages_parallel, render_pages_parallel
+from color_detection import pixmap_array, estimate_block_colors
+from text_layout import get_layout_engine
+from text_writer import PageTextEmitter
+from ocr_engine import OCREngine
+from page_classifier import classify_page, normalize_ocr_mode
+from result_store import document_key, get_result_store
+from checkpoint import get_checkpoint
+from text_grouping import group_blocks
+from block_model import PageSpans, TextGroup, groups_to_dict, groups_from_dict
+import metrics
+import tracing
+import profiling
 
 # Loglama ayarları
 logging.basicConfig(
@@ -18,175 +34,380 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# API anahtarını .env dosyasından yükle
+# Ayarları .env dosyasından yükle
 load_dotenv()
-DEEPL_API_KEY = os.getenv("DEEPL_API_KEY")
+
+# Çeviri isteklerinin boyut sınırları
+TRANSLATION_MAX_BATCH_CHARS = int(os.getenv("TRANSLATION_MAX_BATCH_CHARS", DEFAULT_MAX_CHARS))
+TRANSLATION_MAX_BATCH_SEGMENTS = int(os.getenv("TRANSLATION_MAX_BATCH_SEGMENTS", DEFAULT_MAX_SEGMENTS))
+
+# PDF oluştururken renk tespit yöntemi
+RENDER_COLOR_MODE = os.getenv("RENDER_COLOR_MODE", "vector").lower()
+# Bu sayıdan fazla belirsiz blok varsa bölgesel yerine tam sayfa raster edilir
+MAX_CLIPPED_RASTERS = 8
+
+# Çıktıyı etkileyen bir kod değişikliğinde artırılmalı (önceki çeviri sonuçları yeniden kullanılmaz);
+# çıktıyı etkileyen ayarlar output_settings() ile belge anahtarına ayrıca eklenir
+PIPELINE_VERSION = "2"
+
+# Metin gruplama: "spatial" (uzamsal dizin, sütun ve okuma sırası tespiti) veya "sequential" (eski, ardışık bloklar)
+GROUPING_MODE = os.getenv("GROUPING_MODE", "spatial").lower()
+
+# Metin yazma yöntemi: "line" (satır başına tek çalıştırma, sayfa başına tek commit) veya "word" (eski, kelime başına)
+TEXT_EMIT_MODE = os.getenv("TEXT_EMIT_MODE", "line").lower()
+
+# Sayfa oluşturma: "overlay" (orijinal sayfa form XObject olarak gömülür, blokların üstü boyanıp metin yazılır)
+# veya "redact" (belge bir kez kopyalanır, orijinal metin blok alanlarından redaksiyonla silinip çeviri yerine yazılır)
+RENDER_ENGINE = os.getenv("RENDER_ENGINE", "overlay").lower()
+
+# Çıktı PDF'in kaydetme profilleri: kaydetme süresi ile dosya boyutu arasındaki denge
+SAVE_PROFILES = {
+    # Etkileşimli kullanım: kullanılmayan nesneler atılır, sadece sıkıştırılmamış (yeni) akışlar sıkıştırılır
+    "fast": {"garbage": 1, "deflate": True},
+    # Önceki varsayılan: tekrarlanan nesneler birleştirilir ve içerik akışları temizlenerek yeniden yazılır
+    "standard": {"garbage": 4, "deflate": True, "clean": True},
+    # Arşiv: ayrıca görüntü ve font akışları sıkıştırılır, nesneler nesne akışlarında (object stream) toplanır
+    "compact": {"garbage": 4, "deflate": True, "deflate_images": True, "deflate_fonts": True, "clean": True, "use_objstms": 1},
+}
+SAVE_PROFILE = os.getenv("SAVE_PROFILE", "standard").lower()
+
+# İşlem hattı: "stream" (sayfalar pencereler halinde çıkarma -> gruplama -> çeviri -> oluşturma
+# adımlarından akar; bloklar ve gruplar için bellek sayfa sayısıyla büyümez, ancak son birleştirmede
+# çıktı belgesinin tamamı bellekte oluşturulur) veya "document" (eski, her aşama tüm belge için)
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "stream").lower()
+# Akış modunda bir penceredeki en fazla sayfa sayısı (çeviri batch'leri pencere içinde paketlenir)
+STREAM_WINDOW_PAGES = int(os.getenv("STREAM_WINDOW_PAGES", 16))
+
+def page_ranges(page_numbers):
+    """
+    Artan sayfa numaralarını ardışık (ilk, son) aralıklarına böler
+    """
+    ranges = []
+    for page_num in page_numbers:
+        if ranges and page_num == ranges[-1][1] + 1:
+            ranges[-1][1] = page_num
+        else:
+            ranges.append([page_num, page_num])
+    return [tuple(page_range) for page_range in ranges]
+
+class TranslationFailedError(Exception):
+    """
+    Belge çevrilemedi; orijinal PDF'in kopyası çeviri sonucu olarak verilmez
+    """
 
 class PDFTranslator:
-    def __init__(self, source_lang="TR", target_lang="DE"):
-        # DeepL API istemcisini başlat
-        if not DEEPL_API_KEY:
-            raise ValueError("DeepL API anahtarı bulunamadı. Lütfen .env dosyasında DEEPL_API_KEY ayarlayın.")
-        
-        self.translator = deepl.Translator(DEEPL_API_KEY)
+    def __init__(self, source_lang="TR", target_lang="DE", translation_memory=None, backend=None):
+        # Çeviri arka ucu ilk kullanımda oluşturulur (varsayılan: TRANSLATION_BACKEND ayarı, yoksa DeepL);
+        # böylece sadece sayfa işleyen işçi süreçleri API istemcisi açmaz
+        self._backend = backend
         self.source_lang = source_lang
         self.target_lang = target_lang
         
-    def extract_text_with_positions(self, pdf_path, use_ocr=False):
+        # Kalıcı çeviri belleği (tekrarlanan metinler API'ye gönderilmez)
+        self.translation_memory = translation_memory if translation_memory is not None else get_translation_memory()
+        
+        self.max_batch_chars = TRANSLATION_MAX_BATCH_CHARS
+        self.max_batch_segments = TRANSLATION_MAX_BATCH_SEGMENTS
+        
+        # Eşzamanlı, hız sınırlı ve yeniden denemeli batch gönderimi
+        self.dispatcher = create_dispatcher(self._translate_batch)
+        
+        # Renk tespiti: "vector" (span/dolgu bilgisi, gerekirse bölgesel raster) veya "raster" (tüm sayfa)
+        self.color_mode = RENDER_COLOR_MODE
+        
+        # Önbellekli glif ölçüleri ile metin yerleşimi
+        self.layout_engine = get_layout_engine("helvetica")
+        
+        # Metin bloklarını paragraflara gruplama yöntemi
+        self.grouping_mode = GROUPING_MODE
+        
+        # Sayfaya metin yazma yöntemi ve sayfa başına yazım istatistikleri
+        self.emit_mode = TEXT_EMIT_MODE
+        self.render_stats = []
+        
+        # Çıktı PDF'in kaydetme profili (fast, standard veya compact)
+        self.save_profile = SAVE_PROFILE
+        
+        # Sayfa oluşturma motoru (overlay veya redact)
+        self.render_engine = RENDER_ENGINE
+        
+        # İşlem hattı (stream veya document) ve akış penceresi boyutu
+        self.pipeline_mode = PIPELINE_MODE
+        self.stream_window_pages = max(1, STREAM_WINDOW_PAGES)
+        
+        # Bellek içi, paralel OCR (Tesseract süreç başına bir kez kontrol edilir)
+        self.ocr_engine = OCREngine(source_lang)
+        
+        # Son çeviri hata nedeniyle orijinal PDF'in kopyalanmasıyla mı sonlandı (ve hatanın kendisi)
+        self.fallback_used = False
+        self.last_error = None
+        
+        # Sayfa başına kullanılan çıkarma stratejisi (text / ocr / empty) ve karar ölçümleri
+        self.page_strategies = {}
+        
+        # Ara sonuçların kaydedildiği iş kontrol noktası (translate_pdf sırasında) ve ondan yüklenen sayfalar
+        self.checkpoint = None
+        self._resumed_pages = {}
+        
+        # Son belgede aşama başına geçen süre (saniye); işlem sonunda /metrics histogramlarına yazılır
+        self.stage_seconds = {}
+        
+        # Profil istenen belgede aşama başına bellek ölçümlerini toplayan profilci (translate_pdf sırasında)
+        self.profiler = None
+    
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+    
+    @contextmanager
+    def _stage(self, stage, traced=True):
+        """
+        Blok süresini aşamanın toplam süresine ekler ve bloğu bir span olarak izler.
+        traced=False: sık çağrılan kısa bloklar (blok başına yerleşim) için sadece süre toplanır
+        """
+        profiler = self.profiler if traced else None
+        if profiler is not None:
+            profiler.begin_stage(stage)
+        start = time.perf_counter()
+        try:
+            if traced:
+                with tracing.span(stage, kind="stage"):
+                    yield
+            else:
+                yield
+        finally:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + time.perf_counter() - start
+            if profiler is not None:
+                profiler.end_stage(stage)
+    
+    def _merge_stage_seconds(self, stage_seconds):
         """
-        PDF'den metin ve konum bilgilerini çıkarır
+        İşçi süreçlerinde ölçülen aşama sürelerini ekler
+        """
+        for stage, seconds in stage_seconds.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+    
+    def _record_metrics(self, result, page_chars=None):
+        """
+        Belgenin aşama sürelerini, sayfa ve karakter sayılarını ölçümlere yazar.
+        page_chars: sayfa başına çıkarılan karakter sayısı (sayfa sırasıyla)
+        """
+        metrics.DOCUMENTS.inc(result=result)
+        tracing.annotate(result=result)
+        for stage, seconds in self.stage_seconds.items():
+            metrics.STAGE_SECONDS.observe(seconds, stage=stage)
+        if page_chars is not None:
+            tracing.annotate(pages=len(page_chars))
+            for page_num, characters in enumerate(page_chars):
+                strategy = self.page_strategies.get(page_num, {}).get("strategy", "text")
+                metrics.PAGES.inc(strategy=strategy)
+                metrics.CHARACTERS.inc(characters)
+        
+    def extract_text_with_positions(self, pdf_path, ocr_mode="auto"):
+        """
+        PDF'den metin ve konum bilgilerini çıkarır.
+        ocr_mode: "auto" (sayfa başına karar), "always" veya "never"
+        """
+        ocr_mode = normalize_ocr_mode(ocr_mode)
+        doc = self._open_document(pdf_path)
+        try:
+            return self._extract_document(doc, pdf_path, ocr_mode), doc
+        except Exception:
+            doc.close()
+            raise
+    
+    def _open_document(self, pdf_path):
+        """
+        PDF'i açar; dosya yoksa veya sayfası yoksa hata fırlatır
         """
         logger.info(f"PDF metin çıkarma işlemi başlatılıyor: {pdf_path}")
         
         # PDF'nin varlığını ve erişilebilirliğini kontrol et
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF dosyası bulunamadı: {pdf_path}")
-            
+        
         try:
             doc = fitz.open(pdf_path)
+        except Exception as e:
+            logger.error(f"PDF açılırken hata: {str(e)}")
+            raise
+        
+        # PDF'nin sayfa sayısını kontrol et
+        if len(doc) == 0:
+            doc.close()
+            raise ValueError("PDF dosyası boş veya açılamıyor")
+        return doc
+    
+    def _resume_pages(self, saved_pages):
+        """
+        Kontrol noktasındaki sayfa kayıtlarından çıkarılmış span'leri yükler: {sayfa numarası: PageSpans}.
+        Eski biçimdeki (blok sözlüğü listesi) kayıtlar yok sayılır, sayfa yeniden çıkarılır.
+        """
+        extracted = {
+            page_num: PageSpans.from_dict(data["blocks"])
+            for page_num, data in saved_pages.items() if isinstance(data.get("blocks"), dict)
+        }
+        for page_num in extracted:
+            if saved_pages[page_num].get("strategy"):
+                self.page_strategies[page_num] = saved_pages[page_num]["strategy"]
+        return extracted
+    
+    def _extract_document(self, doc, pdf_path, ocr_mode):
+        """
+        Açık belgenin tüm sayfalarının span'lerini sayfa sırasıyla döndürür
+        """
+        try:
+            # Önceki denemede çıkarılmış sayfalar kontrol noktasından yüklenir
+            self._resumed_pages = self.checkpoint.load_pages(len(doc)) if self.checkpoint is not None else {}
+            extracted = self._resume_pages(self._resumed_pages)
+            if extracted:
+                logger.info(f"Kontrol noktasından {len(extracted)}/{len(doc)} sayfa yüklendi")
             
-            # PDF'nin sayfa sayısını kontrol et
-            if len(doc) == 0:
-                raise ValueError("PDF dosyası boş veya açılamıyor")
+            missing = [page_num for page_num in range(len(doc)) if page_num not in extracted]
+            if missing:
+                if use_page_pool(len(missing)):
+                    # Sayfaları işlem havuzunda paralel işle (her işçi PDF'i kendisi açar)
+                    new_pages, strategies, stage_seconds = extract_pages_parallel(
+                        pdf_path, self.source_lang, self.target_lang, missing, ocr_mode, tracing.current_context()
+                    )
+                    self.page_strategies.update(strategies)
+                    self._merge_stage_seconds(stage_seconds)
+                else:
+                    new_pages = self._extract_pages(doc, missing, ocr_mode)
                 
-            pages_content = []
+                for page_num, page_blocks in zip(missing, new_pages):
+                    extracted[page_num] = page_blocks
+                    if self.checkpoint is not None:
+                        self.checkpoint.save_page(page_num, blocks=page_blocks.to_dict(), strategy=self.page_strategies.get(page_num))
             
-            for page_num in range(len(doc)):
+            return [extracted[page_num] for page_num in range(len(doc))]
+            
+        except Exception as e:
+            logger.error(f"PDF metin çıkarılırken hata: {str(e)}")
+            logger.error(f"Hata detayı: {traceback.format_exc()}")
+            raise
+    
+    def _extract_pages(self, doc, page_numbers, ocr_mode="auto"):
+        """
+        Verilen sayfalardan span'leri çıkarır (sayfa sırasıyla PageSpans listesi döner).
+        
+        "auto" modunda her sayfa ucuz ölçümlerle sınıflandırılır ve sadece gereken
+        sayfalar OCR'a gönderilir; OCR sayfaları OCR motorunda toplu ve eşzamanlı işlenir.
+        Kullanılan strateji sayfa başına self.page_strategies içine kaydedilir.
+        """
+        page_numbers = list(page_numbers)
+        text_dicts = {}
+        
+        if ocr_mode == "always":
+            strategies = {page_num: {"strategy": "ocr", "reason": "OCR her sayfa için istendi"} for page_num in page_numbers}
+        elif ocr_mode == "auto":
+            strategies = {}
+            for page_num in page_numbers:
                 page = doc[page_num]
-                text_blocks = []
+                try:
+                    text_dicts[page_num] = page.get_text("dict")
+                    strategies[page_num] = classify_page(page, text_dicts[page_num])
+                except Exception as e:
+                    logger.error(f"Sayfa sınıflandırma hatası (Sayfa {page_num+1}): {str(e)}")
+                    strategies[page_num] = {"strategy": "text", "reason": "sınıflandırma başarısız"}
+        else:
+            strategies = {page_num: {"strategy": "text", "reason": "OCR kapalı"} for page_num in page_numbers}
+        
+        ocr_pages = [page_num for page_num in page_numbers if strategies[page_num]["strategy"] == "ocr"]
+        ocr_results = {}
+        if ocr_pages:
+            with self._stage("ocr"):
+                ocr_results = self.ocr_engine.recognize_pages(doc, ocr_pages)
+        
+        pages_content = []
+        for page_num in page_numbers:
+            strategy = strategies[page_num]
+            if strategy["strategy"] == "ocr" and page_num not in ocr_results:
+                strategy["fallback"] = "text"
+            logger.info(f"Sayfa {page_num+1} stratejisi: {strategy['strategy']} ({strategy['reason']})")
+            
+            if strategy["strategy"] == "empty":
+                pages_content.append(PageSpans())
+                continue
+            with tracing.span("page", page=page_num + 1, strategy=strategy["strategy"]) as page_span:
+                page_blocks = self._extract_page(
+                    doc[page_num], page_num, strategy["strategy"] == "ocr",
+                    ocr_results.get(page_num), text_dicts.get(page_num)
+                )
+                page_span.set(spans=len(page_blocks))
+            pages_content.append(page_blocks)
+        
+        self.page_strategies.update(strategies)
+        if ocr_mode == "auto":
+            logger.info(f"OCR kararı: {len(ocr_pages)}/{len(page_numbers)} sayfa OCR ile okunacak")
+        
+        return pages_content
+    
+    def _extract_page(self, page, page_num, use_ocr=False, ocr_blocks=None, text_dict=None):
+        """
+        Tek bir sayfadan span'leri (PageSpans) çıkarır.
+        ocr_blocks: OCR modunda bu sayfanın OCR sonucu (None ise OCR başarısız olmuştur)
+        text_dict: daha önce okunmuşsa sayfanın "dict" metin çıktısı
+        """
+        text_blocks = PageSpans()
+        
+        if use_ocr and ocr_blocks is not None:
+            # OCR kullanarak metin çıkarma (taranmış belgeler için)
+            text_blocks = ocr_blocks
+        elif use_ocr:
+            logger.error(f"OCR sonucu alınamadı (Sayfa {page_num+1})")
+            # OCR hatası durumunda normal metin çıkarmayı dene
+            logger.info("Normal metin çıkarma yöntemine geçiliyor")
+            
+            try:
+                # PyMuPDF metin çıkarma
+                if text_dict is None:
+                    text_dict = page.get_text("dict")
+                self._process_text_dict(text_dict, text_blocks)
+                self._attach_fill_colors(page, text_blocks)
+            except Exception as e:
+                logger.error(f"Metin çıkarma hatası (Sayfa {page_num+1}): {str(e)}")
+        else:
+            # Normal metin çıkarma
+            try:
+                logger.info(f"Normal metin çıkarma: Sayfa {page_num+1}")
                 
-                if use_ocr:
-                    # OCR kullanarak metin çıkarma (taranmış belgeler için)
-                    try:
-                        # Tesseract'ın kurulu olduğunu kontrol et
-                        try:
-                            pytesseract.get_tesseract_version()
-                        except Exception as te:
-                            logger.error(f"Tesseract OCR kurulu değil: {str(te)}")
-                            logger.warning("Tesseract OCR kullanılamıyor. Alternatif metin çıkarma yöntemi deneniyor...")
-                            raise Exception("Tesseract OCR kurulu değil")
-                            
-                        pix = page.get_pixmap()
-                        img_path = tempfile.mktemp(suffix=".png")
-                        pix.save(img_path)
-                        
-                        logger.info(f"OCR işlemi başlatılıyor: Sayfa {page_num+1}")
-                        ocr_text = pytesseract.image_to_data(img_path, output_type=pytesseract.Output.DICT, lang="tur")
-                        
-                        # OCR sonuçlarını işle
-                        for i in range(len(ocr_text["text"])):
-                            if ocr_text["text"][i].strip():
-                                text_blocks.append({
-                                    "text": ocr_text["text"][i],
-                                    "bbox": [
-                                        ocr_text["left"][i], 
-                                        ocr_text["top"][i], 
-                                        ocr_text["left"][i] + ocr_text["width"][i], 
-                                        ocr_text["top"][i] + ocr_text["height"][i]
-                                    ],
-                                    "font_size": 11,  # Varsayılan yazı tipi boyutu
-                                    "font_name": "Helvetica"  # Varsayılan yazı tipi
-                                })
-                        
-                        # Geçici dosyayı sil
-                        os.remove(img_path)
-                        
-                    except Exception as e:
-                        logger.error(f"OCR işlemi sırasında hata: {str(e)}")
-                        # OCR hatası durumunda normal metin çıkarmayı dene
-                        logger.info("Normal metin çıkarma yöntemine geçiliyor")
-                        
-                        # PyMuPDF metin çıkarma
-                        text_dict = page.get_text("dict")
-                        self._process_text_dict(text_dict, text_blocks)
-                else:
-                    # Normal metin çıkarma
-                    try:
-                        logger.info(f"Normal metin çıkarma: Sayfa {page_num+1}")
-                        
-                        # PyMuPDF text_dict kullanımı
-                        text_dict = page.get_text("dict")
-                        self._process_text_dict(text_dict, text_blocks)
-                        
-                        # Direkt text olarak da deneyelim
-                        if len(text_blocks) == 0:
-                            text = page.get_text("text")
-                            if text.strip():
-                                logger.info(f"Direkt metin çıkarma kullanılıyor: {len(text)} karakter")
-                                text_blocks.append({
-                                    "text": text,
-                                    "bbox": [0, 0, page.rect.width, page.rect.height],
-                                    "font_size": 11,
-                                    "font_name": "Helvetica"
-                                })
-                        
-                    except Exception as e:
-                        logger.error(f"Metin çıkarma hatası (Sayfa {page_num+1}): {str(e)}")
+                # PyMuPDF text_dict kullanımı
+                if text_dict is None:
+                    text_dict = page.get_text("dict")
+                self._process_text_dict(text_dict, text_blocks)
+                self._attach_fill_colors(page, text_blocks)
                 
+                # Direkt text olarak da deneyelim
                 if len(text_blocks) == 0:
-                    logger.warning(f"Sayfa {page_num+1} için metin bulunamadı. Alternatif metot deneniyor...")
-                    
-                    # Direkt metin çıkarma dene
-                    try:
-                        text = page.get_text("text")
-                        if text.strip():
-                            logger.info(f"Alternatif metin çıkarma başarılı: {len(text)} karakter")
-                            text_blocks.append({
-                                "text": text,
-                                "bbox": [0, 0, page.rect.width, page.rect.height],
-                                "font_size": 11,
-                                "font_name": "Helvetica"
-                            })
-                    except Exception as e:
-                        logger.error(f"Alternatif metin çıkarma hatası: {str(e)}")
-                    
-                    # Metin bulunamadıysa otomatik OCR'a geçiş yap
-                    if len(text_blocks) == 0 and not use_ocr:
-                        logger.info(f"Sayfa {page_num+1} için OCR deneniyor")
-                        try:
-                            # Tesseract'ın kurulu olduğunu kontrol et
-                            try:
-                                pytesseract.get_tesseract_version()
-                            except Exception:
-                                logger.error("Tesseract OCR kurulu değil, OCR yapılamıyor")
-                                continue
-                                
-                            pix = page.get_pixmap()
-                            img_path = tempfile.mktemp(suffix=".png")
-                            pix.save(img_path)
-                            
-                            ocr_text = pytesseract.image_to_data(img_path, output_type=pytesseract.Output.DICT, lang="tur")
-                            
-                            for i in range(len(ocr_text["text"])):
-                                if ocr_text["text"][i].strip():
-                                    text_blocks.append({
-                                        "text": ocr_text["text"][i],
-                                        "bbox": [
-                                            ocr_text["left"][i], 
-                                            ocr_text["top"][i], 
-                                            ocr_text["left"][i] + ocr_text["width"][i], 
-                                            ocr_text["top"][i] + ocr_text["height"][i]
-                                        ],
-                                        "font_size": 11,
-                                        "font_name": "Helvetica"
-                                    })
-                            
-                            os.remove(img_path)
-                        except Exception as e:
-                            logger.error(f"Otomatik OCR denemesi sırasında hata: {str(e)}")
+                    text = page.get_text("text")
+                    if text.strip():
+                        logger.info(f"Direkt metin çıkarma kullanılıyor: {len(text)} karakter")
+                        text_blocks.append(text, (0, 0, page.rect.width, page.rect.height), 11)
                 
-                pages_content.append(text_blocks)
-            
-            return pages_content, doc
+            except Exception as e:
+                logger.error(f"Metin çıkarma hatası (Sayfa {page_num+1}): {str(e)}")
+        
+        if len(text_blocks) == 0:
+            logger.warning(f"Sayfa {page_num+1} için metin bulunamadı. Alternatif metot deneniyor...")
             
-        except Exception as e:
-            logger.error(f"PDF açılırken veya metin çıkarılırken hata: {str(e)}")
-            logger.error(f"Hata detayı: {traceback.format_exc()}")
-            raise
+            # Direkt metin çıkarma dene
+            try:
+                text = page.get_text("text")
+                if text.strip():
+                    logger.info(f"Alternatif metin çıkarma başarılı: {len(text)} karakter")
+                    text_blocks.append(text, (0, 0, page.rect.width, page.rect.height), 11)
+            except Exception as e:
+                logger.error(f"Alternatif metin çıkarma hatası: {str(e)}")
+        
+        return text_blocks
     
     def _process_text_dict(self, text_dict, text_blocks):
         """
-        PyMuPDF'in text_dict yapısını işler ve metin bloklarını çıkarır
+        PyMuPDF'in text_dict yapısını işler ve span'leri text_blocks (PageSpans) içine ekler.
+        Tüm fontlar çizimde Helvetica olarak standartlaştırıldığı için font adı saklanmaz.
         """
         try:
             # "blocks" anahtarı yoksa, boş dön
@@ -220,89 +441,116 @@ class PDFTranslator:
                                         else:
                                             bbox = [0, 0, 100, 20]  # Varsayılan
                                         
-                                        text_blocks.append({
-                                            "text": span["text"],
-                                            "bbox": bbox,
-                                            "font_size": span.get("size", 11),
-                                            "font_name": "Helvetica"  # Tüm fontları Helvetica olarak standartlaştır
-                                        })
+                                        text_blocks.append(
+                                            span["text"],
+                                            bbox,
+                                            span.get("size", 11),
+                                            span.get("color"),  # paketli sRGB
+                                            span.get("flags", 0)
+                                        )
                                     except KeyError as ke:
                                         logger.debug(f"KeyError in span: {ke} - Span: {span}")
                                         # Eksik anahtar durumunda, mevcut verilerle blok oluştur
-                                        text_blocks.append({
-                                            "text": span["text"],
-                                            "bbox": [0, 0, 100, 20],  # Varsayılan bbox
-                                            "font_size": 11,
-                                            "font_name": "Helvetica"
-                                        })
+                                        text_blocks.append(span["text"], (0, 0, 100, 20), 11)  # Varsayılan bbox
         except Exception as e:
             logger.error(f"Text dict işlenirken hata: {str(e)}")
     
+    def _attach_fill_colors(self, page, text_blocks):
+        """
+        Her span'in arkasındaki dolgu rengini sayfa çizimlerinden bulur.
+        
+        fill_color: metnin arkasındaki en üstteki dolu dikdörtgenin rengi (yoksa None, yani sayfa zemini)
+        bg_ambiguous: arka plan vektör bilgisinden kesin olarak belirlenemiyor (resim,
+        yarı saydam veya dikdörtgen olmayan dolgu, kısmi örtüşme); çizimde raster örneklemeye düşülür
+        """
+        if not len(text_blocks):
+            return
+        
+        try:
+            fills = []
+            for drawing in page.get_drawings():
+                if drawing.get("fill") is None:
+                    continue
+                # Saydamlık bilgisi olmayan (None) dolgu opak sayılır; 0.0 gibi değerler korunur
+                opacity = drawing.get("fill_opacity", 1)
+                exact = (all(item[0] in ("re", "qu") for item in drawing["items"]) and
+                         (opacity is None or opacity >= 1))
+                fills.append((fitz.Rect(drawing["rect"]), tuple(drawing["fill"]), exact))
+            
+            image_rects = [fitz.Rect(info["bbox"]) for info in page.get_image_info()]
+        except Exception as e:
+            logger.warning(f"Sayfa çizimleri okunamadı, arka plan raster ile tespit edilecek: {str(e)}")
+            # Yeni span'lerin arka planı zaten belirsiz olarak işaretlidir
+            return
+        
+        for i, bbox in enumerate(text_blocks.boxes()):
+            rect = fitz.Rect(bbox)
+            center = (rect.tl + rect.br) / 2
+            fill_color = None
+            ambiguous = any(rect.intersects(image_rect) for image_rect in image_rects)
+            
+            # Çizim sırasına göre: sonra çizilen dolgu üsttedir
+            for fill_rect, color, exact in fills:
+                if fill_rect.contains(center):
+                    fill_color = color
+                    ambiguous = ambiguous or not exact
+                elif rect.intersects(fill_rect):
+                    overlap = rect & fill_rect
+                    if rect.get_area() and overlap.get_area() / rect.get_area() > 0.25:
+                        ambiguous = True
+            
+            text_blocks.set_background(i, fill_color, ambiguous)
+    
     def group_text_blocks(self, text_blocks, max_distance=5):
         """
-        Yakın metin bloklarını gruplama (paragraflar, cümleler oluşturmak için)
+        Yakın span'leri gruplama (paragraflar, cümleler oluşturmak için).
+        text_blocks: sayfanın PageSpans nesnesi. Gruplar (TextGroup) span kopyası
+        tutmaz, span'lerin grup sırasına dizildiği yeni PageSpans'teki aralıkları gösterir.
         """
-        if not text_blocks:
+        if not len(text_blocks):
             return []
-            
+        
+        if self.grouping_mode == "sequential":
+            return self._group_sequential(text_blocks, max_distance)
+        
+        try:
+            # Satırlar ve paragraflar uzamsal dizinle bulunur, gruplar okuma sırasına dizilir
+            return self._make_groups(text_blocks, group_blocks(text_blocks))
+        except Exception as e:
+            logger.error(f"Metin blokları gruplandırılırken hata: {str(e)}")
+            logger.error(f"Hata detayı: {traceback.format_exc()}")
+            return []
+    
+    def _group_sequential(self, text_blocks, max_distance=5):
+        """
+        Eski gruplama: her span'i sadece kendinden önceki span ile karşılaştırır
+        """
         try:
+            boxes = text_blocks.boxes()
             grouped_blocks = []
-            current_group = [text_blocks[0]]
+            group_start = 0
             
-            for i in range(1, len(text_blocks)):
-                prev_block = text_blocks[i-1]
-                curr_block = text_blocks[i]
+            for i in range(1, len(boxes)):
+                prev_bbox = boxes[i-1]
+                curr_bbox = boxes[i]
                 
                 # Yatay mesafe kontrolü (aynı satırda mı)
-                if (abs(curr_block["bbox"][1] - prev_block["bbox"][1]) < max_distance and
-                    abs(curr_block["bbox"][0] - prev_block["bbox"][2]) < 50):
+                if (abs(curr_bbox[1] - prev_bbox[1]) < max_distance and
+                    abs(curr_bbox[0] - prev_bbox[2]) < 50):
                     # Aynı satırda, birbirine yakın
-                    current_group.append(curr_block)
+                    continue
                 # Dikey mesafe kontrolü (alt satırda mı)
-                elif (abs(curr_block["bbox"][1] - prev_block["bbox"][3]) < 2 * max_distance and
-                      abs(curr_block["bbox"][0] - prev_block["bbox"][0]) < 20):
+                elif (abs(curr_bbox[1] - prev_bbox[3]) < 2 * max_distance and
+                      abs(curr_bbox[0] - prev_bbox[0]) < 20):
                     # Alt satırda ve aynı hizada
-                    current_group.append(curr_block)
+                    continue
                 else:
                     # Yeni bir grup başlat
-                    grouped_text = " ".join([block["text"] for block in current_group])
-                    grouped_bbox = [
-                        min(block["bbox"][0] for block in current_group),
-                        min(block["bbox"][1] for block in current_group),
-                        max(block["bbox"][2] for block in current_group),
-                        max(block["bbox"][3] for block in current_group)
-                    ]
-                    
-                    group_info = {
-                        "text": grouped_text,
-                        "bbox": grouped_bbox,
-                        "font_size": current_group[0]["font_size"],
-                        "font_name": "Helvetica",  # Tüm fontları Helvetica olarak standartlaştır
-                        "original_blocks": current_group
-                    }
-                    
-                    grouped_blocks.append(group_info)
-                    current_group = [curr_block]
+                    grouped_blocks.append(TextGroup(text_blocks, group_start, i))
+                    group_start = i
             
             # Son grubu ekle
-            if current_group:
-                grouped_text = " ".join([block["text"] for block in current_group])
-                grouped_bbox = [
-                    min(block["bbox"][0] for block in current_group),
-                    min(block["bbox"][1] for block in current_group),
-                    max(block["bbox"][2] for block in current_group),
-                    max(block["bbox"][3] for block in current_group)
-                ]
-                
-                group_info = {
-                    "text": grouped_text,
-                    "bbox": grouped_bbox,
-                    "font_size": current_group[0]["font_size"],
-                    "font_name": "Helvetica",  # Tüm fontları Helvetica olarak standartlaştır
-                    "original_blocks": current_group
-                }
-                
-                grouped_blocks.append(group_info)
+            grouped_blocks.append(TextGroup(text_blocks, group_start, len(boxes)))
             
             return grouped_blocks
             
@@ -311,432 +559,415 @@ class PDFTranslator:
             logger.error(f"Hata detayı: {traceback.format_exc()}")
             return []
     
-    def translate_text_blocks(self, text_blocks, batch_size=10):
+    def _group_page(self, page_num, page_blocks, saved):
+        """
+        Sayfanın gruplarını döndürür; kontrol noktasında (saved) varsa tekrar gruplamaz
+        """
+        if isinstance(saved.get("groups"), dict):
+            return groups_from_dict(saved["groups"])
+        
+        grouped_blocks = self.group_text_blocks(page_blocks)
+        if self.checkpoint is not None:
+            # Gruplar span'lerin grup sırasına dizilmiş kopyasını gösterir, o da saklanır
+            ordered = grouped_blocks[0].spans if grouped_blocks else page_blocks
+            self.checkpoint.save_page(page_num, groups=groups_to_dict(ordered, grouped_blocks))
+        return grouped_blocks
+    
+    def _make_groups(self, text_blocks, groups):
+        """
+        Span indeksi listelerinden grupları oluşturur: span'ler grup sırasına
+        dizilir, böylece her grup ardışık bir aralık olur
+        """
+        order = [i for members in groups for i in members]
+        ordered = text_blocks.take(order)
+        
+        grouped_blocks = []
+        start = 0
+        for members in groups:
+            grouped_blocks.append(TextGroup(ordered, start, start + len(members)))
+            start += len(members)
+        return grouped_blocks
+    
+    def translate_text_blocks(self, text_blocks):
         """
-        Metin bloklarını DeepL API ile çevirir
+        Tek bir sayfanın metin bloklarını çevirir
+        """
+        return self.translate_document([text_blocks])[0]
+    
+    def translate_document(self, pages_blocks, known=None):
+        """
+        Belgenin tüm sayfalarındaki metin bloklarını tek seferde çevirir.
+        Tekrarlanan metinler bir kez gönderilir, istekler karakter ve metin
+        sayısı sınırlarına göre paketlenir.
+        known: belgenin önceki pencerelerinde çevrilmiş {metin: çeviri}; bunlar
+        tekrar gönderilmez ve yeni çeviriler sözlüğe eklenir
         """
         logger.info(f"Metin çevirisi başlatılıyor: {self.source_lang} -> {self.target_lang}")
-        translated_blocks = []
         
         try:
-            # Çevrilecek anlamlı metinleri topla
-            texts_to_translate = []
-            blocks_to_translate = []
-            
-            for block in text_blocks:
-                # Çeviri için uygun metin mi kontrol et
-                if len(block["text"]) > 1 and not block["text"].isdigit():
-                    logger.debug(f"Çeviri için metin ekleniyor: {block['text'][:30]}...")
-                    texts_to_translate.append(block["text"])
-                    blocks_to_translate.append(block)
-                else:
-                    # Çevirme, aynen koru
-                    block_copy = block.copy()
-                    block_copy["translated_text"] = block["text"]
-                    translated_blocks.append(block_copy)
+            plan = TranslationPlan(pages_blocks)
             
             # Çevrilecek metin yoksa erken dön
-            if not texts_to_translate:
+            if not plan.segments:
                 logger.info("Çevrilecek anlamlı metin bulunamadı")
-                return translated_blocks
-            
-            logger.info(f"Toplam {len(texts_to_translate)} metin çevrilecek")
-                
-            # Batch işleme için metinleri grupla
-            batches = [texts_to_translate[i:i+batch_size] for i in range(0, len(texts_to_translate), batch_size)]
-            
-            all_translated_texts = []
+                return plan.apply(pages_blocks, {})
             
-            # Her batch için çeviri yap
-            for batch_index, batch in enumerate(batches):
-                try:
-                    logger.info(f"Batch çevirisi {batch_index+1}/{len(batches)}: {len(batch)} metin")
-                    result = self.translator.translate_text(
-                        batch, 
-                        source_lang=self.source_lang, 
-                        target_lang=self.target_lang
-                    )
-                    
-                    # Tek metin veya liste olabilir
-                    if isinstance(result, list):
-                        translations = [item.text for item in result]
-                    else:
-                        translations = [result.text]
-                    
-                    all_translated_texts.extend(translations)
-                    
-                    # API limit aşımını önlemek için kısa bekleme
-                    time.sleep(0.5)
-                    
-                except Exception as e:
-                    logger.error(f"Çeviri API hatası (Batch {batch_index+1}): {str(e)}")
-                    logger.error(f"Hatalı batch: {batch}")
-                    # Hata durumunda orijinal metni kullan
-                    all_translated_texts.extend(batch)
-            
-            logger.info(f"Çeviri tamamlandı: {len(all_translated_texts)} metin")
-            
-            # Çevirileri orijinal bloklara eşle
-            for i, block in enumerate(blocks_to_translate):
-                if i < len(all_translated_texts):
-                    block_copy = block.copy()
-                    block_copy["translated_text"] = all_translated_texts[i]
-                    block_copy["font_name"] = "Helvetica"  # Çeviri sonrası standart font
-                    translated_blocks.append(block_copy)
-                else:
-                    # İndeks hatası durumunda orijinal metni kullan
-                    block_copy = block.copy()
-                    block_copy["translated_text"] = block["text"]
-                    block_copy["font_name"] = "Helvetica"  # Çeviri sonrası standart font
-                    translated_blocks.append(block_copy)
+            logger.info(f"Toplam {plan.total_references} metin bloğu, {len(plan.segments)} benzersiz metin çevrilecek")
             
-            return translated_blocks
+            translations = self._translate_segments(plan.segments, known)
+            return plan.apply(pages_blocks, translations)
             
+        except TranslationDispatchError:
+            # Yarı çevrilmiş belge üretmek yerine hatayı yukarı ilet
+            raise
         except Exception as e:
             logger.error(f"Çeviri işlemi sırasında hata: {str(e)}")
             logger.error(f"Hata detayı: {traceback.format_exc()}")
-            # Hata durumunda orijinal metinleri çevirilmemiş olarak döndür
-            return [{"text": block["text"], "translated_text": block["text"], "bbox": block["bbox"], 
-                    "font_size": block["font_size"], "font_name": "Helvetica"} 
-                    for block in text_blocks]
+            # Çevrilmemiş metinle devam edilmez (örn. kontrol noktası yazılamadı); iş başarısız
+            # olur ve tamamlanan batch'ler kontrol noktasından yeniden kullanılarak tekrar denenebilir
+            raise
     
-    def create_translated_pdf(self, original_doc, translated_blocks, output_path):
+    def _translate_segments(self, segments, known=None):
         """
-        Çevrilmiş metinler ile yeni bir PDF oluşturur.
-        Bu sürüm, orijinal PDF'in tasarımını (renk, konum, yazı tipi özellikleri) tam olarak korur.
+        Benzersiz metinleri çevirir ve {metin: çeviri} sözlüğü döndürür.
+        known verilmişse (akış modu) içindeki metinler yeniden çevrilmez ve
+        kontrol noktası çevirileri zaten bu sözlüğe yüklenmiş kabul edilir.
         """
-        logger.info(f"Çevrilmiş PDF oluşturuluyor: {output_path}")
+        # Belgenin önceki pencerelerinde çevrilmiş metinler
+        translations = {}
+        if known:
+            translations = {text: known[text] for text in segments if text in known}
+        
+        # Sonra çeviri belleğine bak, sadece bulunamayanları API'ye gönder
+        if self.translation_memory is not None:
+            lookup = [text for text in segments if text not in translations]
+            found = self.translation_memory.get_many(
+                self.source_lang, self.target_lang, lookup, namespace=self.backend.cache_namespace
+            ) if lookup else {}
+            logger.info(f"Çeviri belleğinden {len(found)} metin bulundu")
+            translations.update(found)
+        
+        # Önceki denemede tamamlanan batch'ler tekrar gönderilmez
+        on_result = None
+        if self.checkpoint is not None:
+            if known is None:
+                saved = self.checkpoint.load_translations()
+                resumed = {text: saved[text] for text in segments if text not in translations and text in saved}
+                if resumed:
+                    logger.info(f"Kontrol noktasından {len(resumed)} çeviri yüklendi")
+                translations.update(resumed)
+            on_result = self.checkpoint.add_translations
+        
+        missing_texts = [text for text in segments if text not in translations]
+        
+        # Metinleri karakter ve metin sayısı sınırlarına göre paketle
+        batches = pack_batches(missing_texts, self.max_batch_chars, self.max_batch_segments)
+        tracing.annotate(segments=len(segments), reused=len(translations), batches=len(batches))
         
+        # Batch'leri eşzamanlı olarak, hız sınırı ve yeniden deneme ile gönder
+        failure = None
         try:
-            # Tamamen yeni bir PDF oluştur
-            new_doc = fitz.open()
+            new_translations = self.dispatcher.run(batches, on_result=on_result)
+        except TranslationDispatchError as e:
+            # Başarılı batch'ler yine de belleğe yazılır, böylece tekrar denemede sadece eksikler gönderilir
+            new_translations = getattr(e, "partial", {})
+            failure = e
+        
+        # Başarılı çevirileri belleğe yaz
+        if self.translation_memory is not None and new_translations:
+            self.translation_memory.put_many(
+                self.source_lang, self.target_lang, new_translations, namespace=self.backend.cache_namespace
+            )
+        
+        if failure is not None:
+            raise failure
+        
+        logger.info(f"Çeviri tamamlandı: {len(new_translations)} metin API ile ({len(batches)} istek), {len(translations)} metin bellekten")
+        translations.update(new_translations)
+        if known is not None:
+            known.update(translations)
+        return translations
+    
+    def _translate_batch(self, batch):
+        """
+        Tek bir batch'i çeviri arka ucu ile çevirir
+        """
+        return self.backend.translate_batch(batch, self.source_lang, self.target_lang)
+    
+    def _render_page(self, new_doc, original_doc, page_num, page_blocks, new_page=None):
+        """
+        Orijinal sayfayı yeni belgeye kopyalar ve çevrilmiş metinleri yerleştirir.
+        new_page verilmişse (redact motoru) sayfa zaten kopyalanmıştır; orijinal
+        metin blok alanlarından silinir ve çeviri aynı yere yazılır.
+        """
+        if page_num >= len(original_doc):
+            logger.warning(f"Sayfa {page_num+1} orijinal belge sayfa sayısını aşıyor, atlıyorum")
+            return None
             
-            # Her sayfa için
-            for page_num, page_blocks in enumerate(translated_blocks):
-                if page_num >= len(original_doc):
-                    logger.warning(f"Sayfa {page_num+1} orijinal belge sayfa sayısını aşıyor, atlıyorum")
-                    continue
-                    
-                # Orijinal sayfayı al
-                original_page = original_doc[page_num]
-                
-                # Orijinal sayfanın dikdörtgeni
-                mediabox = original_page.mediabox
-                
-                # Yeni sayfa oluştur (tam olarak aynı boyutlarda ve döndürmede)
-                new_page = new_doc.new_page(
-                    width=mediabox.width,
-                    height=mediabox.height
-                )
-                
-                # Sayfa döndürme özelliklerini de kopyala (eğer varsa)
-                if hasattr(original_page, "rotation") and original_page.rotation != 0:
-                    new_page.set_rotation(original_page.rotation)
-                
-                # Önce orijinal sayfanın içeriğini olduğu gibi kopyala
-                new_page.show_pdf_page(
-                    new_page.rect,
-                    original_doc,
-                    page_num,
-                    keep_proportion=True
-                )
-                
-                # Eğer blok yoksa, bu sayfada işlem yapma
-                if not page_blocks:
-                    logger.warning(f"Sayfa {page_num+1} için çevrilmiş metin bloğu bulunamadı, sayfa aynen bırakılıyor")
-                    continue
+        # Orijinal sayfayı al
+        original_page = original_doc[page_num]
+        redact = new_page is not None
+        
+        if not redact:
+            # Orijinal sayfanın dikdörtgeni
+            mediabox = original_page.mediabox
+            
+            # Yeni sayfa oluştur (tam olarak aynı boyutlarda ve döndürmede)
+            new_page = new_doc.new_page(
+                width=mediabox.width,
+                height=mediabox.height
+            )
+            
+            # Sayfa döndürme özelliklerini de kopyala (eğer varsa)
+            if hasattr(original_page, "rotation") and original_page.rotation != 0:
+                new_page.set_rotation(original_page.rotation)
+            
+            # Önce orijinal sayfanın içeriğini olduğu gibi kopyala
+            new_page.show_pdf_page(
+                new_page.rect,
+                original_doc,
+                page_num,
+                keep_proportion=True
+            )
+        
+        # Eğer blok yoksa, bu sayfada işlem yapma
+        if not page_blocks:
+            logger.warning(f"Sayfa {page_num+1} için çevrilmiş metin bloğu bulunamadı, sayfa aynen bırakılıyor")
+            return new_page
+        
+        # Çizilecek bloklar
+        blocks_to_draw = [block for block in page_blocks if block.translated_text]
+        
+        # Arka plan ve metin renklerini belirle (vektör bilgisi veya raster örnekleme)
+        block_colors = self._resolve_block_colors(original_page, blocks_to_draw)
+        
+        if redact:
+            # Metin katmanından gelen blokların glifleri silinir; görüntüler ve vektör çizimler korunur
+            self._redact_blocks(new_page, blocks_to_draw)
+        
+        page_width_px = int(original_page.rect.width)
+        page_height_px = int(original_page.rect.height)
+        
+        # Arka planlar ve metinler biriktirilip sayfaya tek seferde yazılır
+        emitter = PageTextEmitter(new_page, mode=self.emit_mode, fontname="helvetica")
+        
+        # Her metin bloğunu işle
+        for block, (bg_color, text_color) in zip(blocks_to_draw, block_colors):
+            # 1. Orijinal metnin özelliklerini al
+            bbox = fitz.Rect(block.bbox)
+            translated_text = block.translated_text
+            
+            # Orijinal font boyutu
+            font_size = block.font_size
+            
+            # Orijinal bloğun özelliklerini analiz et
+            x0, y0, x1, y1 = int(bbox.x0), int(bbox.y0), int(bbox.x1), int(bbox.y1)
+            
+            # Sınır kontrolü
+            x0 = max(0, min(x0, page_width_px - 1))
+            y0 = max(0, min(y0, page_height_px - 1))
+            x1 = max(0, min(x1, page_width_px - 1))
+            y1 = max(0, min(y1, page_height_px - 1))
+            
+            # 2-3. Arka plan ve metin renkleri yukarıda toplu olarak belirlendi
+            
+            # 4. Yerleştirme için hizalama tespiti
+            # Orijinal metinin yatay ve dikey konumunu belirle
+            page_width = original_page.rect.width
+            
+            alignment = "left"  # Varsayılan
+            if x0 > page_width * 0.6:
+                alignment = "right"
+            elif x0 > page_width * 0.3 and x1 < page_width * 0.7:
+                alignment = "center"
+            
+            # 5. Metin alanını arka plan rengiyle temizle (redaksiyonla silinemeyen OCR metni için hâlâ gerekli)
+            if not redact or block.color is None:
+                emitter.add_background(bbox, bg_color)
+            
+            # 6. Metin yerleştirme
+            # İlk olarak, orijinal metnin kapladığı alanın genişliği ve yüksekliği
+            rect_width = bbox.width
+            rect_height = bbox.height
+            
+            # Uygun font boyutu ve satır düzeni
+            max_width = rect_width * 0.98  # Kenar boşluğu için %2 azalt
+            with self._stage("layout", traced=False):
+                lines, adjusted_font = self.layout_engine.layout(translated_text, max_width, rect_height, font_size)
+            
+            if lines:
+                line_height = adjusted_font * 1.2
+                total_height = len(lines) * line_height
                 
-                # Sayfanın tam görüntüsünü al (arka plan rengi tespiti için)
-                pix = original_page.get_pixmap(alpha=False)
+                # Başlangıç Y pozisyonu
+                if total_height < rect_height:
+                    # Dikey ortalama yap
+                    y_start = bbox.y0 + (rect_height - total_height) / 2 + adjusted_font
+                else:
+                    # Üstten başla
+                    y_start = bbox.y0 + adjusted_font
                 
-                # Her metin bloğunu işle
-                for block in page_blocks:
-                    if "translated_text" not in block or not block["translated_text"]:
-                        continue
-                        
-                    # 1. Orijinal metnin özelliklerini al
-                    bbox = fitz.Rect(block["bbox"])
-                    orig_text = block.get("text", "")
-                    translated_text = block["translated_text"]
-                    
-                    # Orijinal font boyutu
-                    font_size = block.get("font_size", 11)
-                    
-                    # Orijinal bloğun özelliklerini analiz et
-                    x0, y0, x1, y1 = int(bbox.x0), int(bbox.y0), int(bbox.x1), int(bbox.y1)
-                    
-                    # Sınır kontrolü
-                    x0 = max(0, min(x0, pix.width - 1))
-                    y0 = max(0, min(y0, pix.height - 1))
-                    x1 = max(0, min(x1, pix.width - 1))
-                    y1 = max(0, min(y1, pix.height - 1))
-                    
-                    # 2. Arka plan rengini tespit et - daha geniş bir örnekleme ile
-                    bg_samples = []
-                    
-                    # Metin alanının dışından örnekler al (daha güvenilir arka plan rengi için)
-                    # Üst kenardan örnekler
-                    sample_y = max(0, y0 - 2)
-                    for x in range(max(0, x0-5), min(pix.width, x1+5), max(1, (x1-x0)//15)):
-                        if 0 <= x < pix.width and 0 <= sample_y < pix.height:
-                            bg_samples.append(pix.pixel(x, sample_y)[:3])
-                    
-                    # Alt kenardan örnekler
-                    sample_y = min(pix.height-1, y1 + 2)
-                    for x in range(max(0, x0-5), min(pix.width, x1+5), max(1, (x1-x0)//15)):
-                        if 0 <= x < pix.width and 0 <= sample_y < pix.height:
-                            bg_samples.append(pix.pixel(x, sample_y)[:3])
-                    
-                    # Sol kenardan örnekler
-                    sample_x = max(0, x0 - 2)
-                    for y in range(max(0, y0-5), min(pix.height, y1+5), max(1, (y1-y0)//15)):
-                        if 0 <= sample_x < pix.width and 0 <= y < pix.height:
-                            bg_samples.append(pix.pixel(sample_x, y)[:3])
-                    
-                    # Sağ kenardan örnekler
-                    sample_x = min(pix.width-1, x1 + 2)
-                    for y in range(max(0, y0-5), min(pix.height, y1+5), max(1, (y1-y0)//15)):
-                        if 0 <= sample_x < pix.width and 0 <= y < pix.height:
-                            bg_samples.append(pix.pixel(sample_x, y)[:3])
-                    
-                    # Arka plan rengini belirle
-                    bg_color = (1, 1, 1)  # Varsayılan beyaz
-                    if bg_samples:
-                        # RGB renklerini sık görülen gruplara ayır
-                        color_groups = {}
-                        for color in bg_samples:
-                            # Benzer renkleri grupla (30 birim tolerans)
-                            found_group = False
-                            for group_key in list(color_groups.keys()):
-                                if sum(abs(color[i] - group_key[i]) for i in range(3)) < 30:
-                                    color_groups[group_key] += 1
-                                    found_group = True
-                                    break
-                            if not found_group:
-                                color_groups[color] = 1
-                        
-                        # En yaygın renk grubunu bul
-                        if color_groups:
-                            most_common = max(color_groups.items(), key=lambda item: item[1])[0]
-                            bg_color = tuple(c/255 for c in most_common)
-                    
-                    # 3. Metin rengini tespit et
-                    # Orijinal metinden bazı örnekler al (mümkünse merkeze yakın yerlerden)
-                    text_samples = []
-                    center_x = (x0 + x1) // 2
-                    center_y = (y0 + y1) // 2
-                    
-                    # Merkez çevresinden örnek noktalar
-                    sample_points = [
-                        (center_x, center_y),  # Merkez
-                        (center_x - (x1-x0)//4, center_y),  # Merkez sol
-                        (center_x + (x1-x0)//4, center_y),  # Merkez sağ
-                        (center_x, center_y - (y1-y0)//4),  # Merkez üst
-                        (center_x, center_y + (y1-y0)//4)   # Merkez alt
-                    ]
-                    
-                    for sx, sy in sample_points:
-                        if 0 <= sx < pix.width and 0 <= sy < pix.height:
-                            text_samples.append(pix.pixel(sx, sy)[:3])
-                    
-                    # Metin rengini belirle
-                    text_color = (0, 0, 0)  # Varsayılan siyah
-                    if text_samples:
-                        # Arka plan renginden en uzak örneği bul (bu muhtemelen metin rengidir)
-                        bg_rgb = tuple(int(c*255) for c in bg_color)
-                        max_diff = 0
-                        farthest_color = None
-                        
-                        for sample in text_samples:
-                            diff = sum(abs(sample[i] - bg_rgb[i]) for i in range(3))
-                            if diff > max_diff:
-                                max_diff = diff
-                                farthest_color = sample
-                        
-                        if farthest_color and max_diff > 30:  # Belirli bir eşik değerinden büyükse
-                            text_color = tuple(c/255 for c in farthest_color)
-                        else:
-                            # Arka plan kontrastına göre otomatik seç
-                            luminance = 0.299 * bg_color[0] + 0.587 * bg_color[1] + 0.114 * bg_color[2]
-                            text_color = (0, 0, 0) if luminance > 0.5 else (1, 1, 1)
-                    
-                    # 4. Yerleştirme için hizalama tespiti
-                    # Orijinal metinin yatay ve dikey konumunu belirle
-                    page_width = original_page.rect.width
-                    
-                    alignment = "left"  # Varsayılan
-                    if x0 > page_width * 0.6:
-                        alignment = "right"
-                    elif x0 > page_width * 0.3 and x1 < page_width * 0.7:
-                        alignment = "center"
-                    
-                    # 5. Metin alanını arka plan rengiyle temizle
-                    new_page.draw_rect(bbox, color=bg_color, fill=bg_color, width=0)
-                    
-                    # 6. Metni satırlara ve kelimelere bölme optimizasyonu
-                    def optimize_text_layout(text, max_width, max_height, font_size, min_font_factor=0.6, recursion_depth=0):
-                        """Metni satırlara böl ve gerekirse font boyutunu ayarla"""
-                        # Rekürsyon limiti kontrolü
-                        if recursion_depth > 10:  # Maksimum 10 seviye derinliğe izin ver
-                            logger.warning(f"Maksimum rekürsyon derinliğine ulaşıldı - min_font_size kullanılıyor")
-                            min_font_size = max(6, font_size * 0.5)  # Son çare olarak küçük font
-                            words = text.split()
-                            if not words:
-                                return [], min_font_size
-                                
-                            # Son bir deneme yap
-                            try:
-                                word_widths = [fitz.get_text_length(word, fontname="helvetica", fontsize=min_font_size) for word in words]
-                                space_width = fitz.get_text_length(" ", fontname="helvetica", fontsize=min_font_size)
-                                
-                                # En basit yerleştirme - tek satırda maksimum kelime sığdır
-                                lines = []
-                                current_line = []
-                                current_width = 0
-                                
-                                for i, word in enumerate(words):
-                                    word_width = word_widths[i]
-                                    
-                                    if current_width + word_width > max_width and current_line:
-                                        lines.append((current_line.copy(), current_width))
-                                        current_line = []
-                                        current_width = 0
-                                    
-                                    current_line.append((word, word_width))
-                                    if current_width == 0:
-                                        current_width = word_width
-                                    else:
-                                        current_width += space_width + word_width
-                                
-                                if current_line:
-                                    lines.append((current_line, current_width))
-                                    
-                                return lines, min_font_size
-                            except Exception as e:
-                                logger.error(f"Son metni işleme hatası: {str(e)}")
-                                # Basit metin bölme
-                                if len(text) < 50:
-                                    return [([("TEXT_ERROR", 50)], 50)], min_font_size
-                                else:
-                                    half = len(text) // 2
-                                    return [([("TEXT_ERROR_1", 50)], 50), ([("TEXT_ERROR_2", 50)], 50)], min_font_size
-                        
-                        words = text.split()
-                        if not words:
-                            return [], font_size
-                        
-                        # En küçük kabul edilebilir font boyutu
-                        min_font_size = max(6, font_size * min_font_factor)
-                        current_font_size = font_size
-                        
-                        while current_font_size >= min_font_size:
-                            try:
-                                # Kelime genişliklerini hesapla
-                                word_widths = [fitz.get_text_length(word, fontname="helvetica", fontsize=current_font_size) for word in words]
-                                space_width = fitz.get_text_length(" ", fontname="helvetica", fontsize=current_font_size)
-                                
-                                # Satırları oluştur
-                                lines = []
-                                current_line = []
-                                current_width = 0
-                                
-                                for i, word in enumerate(words):
-                                    word_width = word_widths[i]
-                                    
-                                    # Eğer kelime tek başına satıra sığmıyorsa ve kelime uzunsa
-                                    if word_width > max_width and len(word) > 10 and current_line == []:
-                                        # Kelimeyi bölebiliriz, ama şimdilik bu işlemi atla
-                                        # (Kompleks kelime bölme algoritması gerekiyor)
-                                        pass
-                                    
-                                    # Yeni kelime satıra sığmıyorsa, yeni satıra geç
-                                    if current_width + word_width > max_width and current_line:
-                                        lines.append((current_line.copy(), current_width))
-                                        current_line = []
-                                        current_width = 0
-                                    
-                                    # Kelimeyi ekle
-                                    current_line.append((word, word_width))
-                                    if current_width == 0:
-                                        current_width = word_width
-                                    else:
-                                        current_width += space_width + word_width
-                                
-                                # Son satırı ekle
-                                if current_line:
-                                    lines.append((current_line, current_width))
-                                
-                                # Toplam yükseklik kontrolü
-                                line_height = current_font_size * 1.2
-                                total_height = len(lines) * line_height
-                                
-                                if total_height <= max_height:
-                                    return lines, current_font_size
-                                
-                                # Sığmıyorsa font boyutunu azalt
-                                current_font_size *= 0.9
-                            except Exception as e:
-                                logger.warning(f"Font boyutu hesaplama hatası ({current_font_size}): {str(e)}")
-                                current_font_size *= 0.8  # Hatada daha fazla azalt
-                        
-                        # Rekürsyon limitine yaklaşıyorsak, bölünme veya rekürsyon derinliğini arttır
-                        if min_font_size < 6 or recursion_depth > 8:
-                            # Son deneme - basit yaklaşım
-                            return optimize_text_layout(text, max_width, max_height, min_font_size, 1.0, recursion_depth + 1)
-                        else:
-                            # Son çare - en küçük font ile yeniden dene
-                            return optimize_text_layout(text, max_width, max_height, min_font_size, 0.8, recursion_depth + 1)
-                    
-                    # 7. Metin yerleştirme
-                    # İlk olarak, orijinal metnin kapladığı alanın genişliği ve yüksekliği
-                    rect_width = bbox.width
-                    rect_height = bbox.height
-                    
-                    # Uygun font boyutu ve satır düzeni
-                    max_width = rect_width * 0.98  # Kenar boşluğu için %2 azalt
-                    lines, adjusted_font = optimize_text_layout(translated_text, max_width, rect_height, font_size)
+                # Her satırı çiz
+                for i, (line_words, line_width) in enumerate(lines):
+                    # Yatay hizalama
+                    if alignment == "right":
+                        x_start = bbox.x1 - line_width
+                    elif alignment == "center":
+                        x_start = bbox.x0 + (rect_width - line_width) / 2
+                    else:  # left
+                        x_start = bbox.x0
                     
-                    if lines:
-                        line_height = adjusted_font * 1.2
-                        total_height = len(lines) * line_height
-                        
-                        # Başlangıç Y pozisyonu
-                        if total_height < rect_height:
-                            # Dikey ortalama yap
-                            y_start = bbox.y0 + (rect_height - total_height) / 2 + adjusted_font
-                        else:
-                            # Üstten başla
-                            y_start = bbox.y0 + adjusted_font
-                        
-                        # Her satırı çiz
-                        for i, (line_words, line_width) in enumerate(lines):
-                            # Yatay hizalama
-                            if alignment == "right":
-                                x_start = bbox.x1 - line_width
-                            elif alignment == "center":
-                                x_start = bbox.x0 + (rect_width - line_width) / 2
-                            else:  # left
-                                x_start = bbox.x0
-                            
-                            # Satırdaki her kelimeyi çiz
-                            current_x = x_start
-                            space_width = fitz.get_text_length(" ", fontname="helvetica", fontsize=adjusted_font)
-                            
-                            for word, word_width in line_words:
-                                new_page.insert_text(
-                                    (current_x, y_start + i * line_height),
-                                    word,
-                                    fontname="helvetica",
-                                    fontsize=adjusted_font,
-                                    color=text_color
-                                )
-                                current_x += word_width + space_width
-            
-            # Sayfada yapılan değişiklikleri uygula
+                    # Satırı tek metin çalıştırması olarak ekle
+                    emitter.add_line(
+                        x_start,
+                        y_start + i * line_height,
+                        line_words,
+                        self.layout_engine.space_width(adjusted_font),
+                        adjusted_font,
+                        text_color
+                    )
+        
+        self.render_stats.append(emitter.commit(page_num))
+        
+        return new_page
+    
+    def _redact_blocks(self, page, blocks):
+        """
+        Metin katmanından çıkarılmış blokların orijinal gliflerini sayfadan siler.
+        
+        Redaksiyon alanları sayfa başına toplu uygulanır. Bir glif, alana az
+        da olsa taşıyorsa silindiği için alan bloğun iç kısmına daraltılır;
+        böylece komşu satır ve sütunlardaki metin etkilenmez. Rengi bilinmeyen
+        (OCR) blokların metni görüntüdedir, bu bloklar silinmez, üstü boyanır.
+        """
+        count = 0
+        for block in blocks:
+            if block.color is None:
+                continue
+            x0, y0, x1, y1 = block.bbox
+            inset_x = min(block.font_size * 0.1, (x1 - x0) / 4)
+            inset_y = min(block.font_size * 0.25, (y1 - y0) / 4)
+            page.add_redact_annot(fitz.Rect(x0 + inset_x, y0 + inset_y, x1 - inset_x, y1 - inset_y), fill=False)
+            count += 1
+        
+        if count:
+            page.apply_redactions(
+                images=fitz.PDF_REDACT_IMAGE_NONE,
+                graphics=fitz.PDF_REDACT_LINE_ART_NONE,
+                text=fitz.PDF_REDACT_TEXT_REMOVE
+            )
+        return count
+    
+    def _resolve_block_colors(self, page, blocks):
+        """
+        Her blok için (arka plan, metin) rengini döndürür.
+        
+        "vector" modunda çıkarma sırasında kaydedilen span rengi ve dolgu rengi
+        kullanılır; sadece belirsiz bloklar için ilgili bölge raster edilir.
+        "raster" modunda tüm sayfa raster edilip örneklenir.
+        """
+        if not blocks:
+            return []
+        
+        if self.color_mode == "raster":
+            pix = page.get_pixmap(alpha=False)
+            return estimate_block_colors(pixmap_array(pix), [block.bbox for block in blocks])
+        
+        colors = [None] * len(blocks)
+        ambiguous = []
+        for i, block in enumerate(blocks):
+            color = block.color
+            if color is not None and not block.bg_ambiguous:
+                # Dolgu yoksa metin sayfa zemini (beyaz) üzerindedir
+                bg_color = block.fill_color or (1, 1, 1)
+                colors[i] = (bg_color, color)
+            else:
+                ambiguous.append(i)
+        
+        if ambiguous:
+            bboxes = [blocks[i].bbox for i in ambiguous]
+            if len(ambiguous) > MAX_CLIPPED_RASTERS:
+                # Çok sayıda belirsiz blok varsa (örn. OCR sayfası) tek tam sayfa görüntüsü daha ucuzdur
+                pix = page.get_pixmap(alpha=False)
+                estimated = estimate_block_colors(pixmap_array(pix), bboxes)
+            else:
+                estimated = [self._estimate_clipped_colors(page, bbox) for bbox in bboxes]
+            
+            for i, block_color in zip(ambiguous, estimated):
+                colors[i] = block_color
+            logger.debug(f"{len(ambiguous)}/{len(blocks)} blok için renk raster örnekleme ile belirlendi")
+        
+        return colors
+    
+    def _estimate_clipped_colors(self, page, bbox):
+        """
+        Sadece bloğun çevresini raster ederek renkleri tahmin eder
+        """
+        # Kenar örnekleri blok dışından alındığı için biraz pay bırak
+        clip = (fitz.Rect(bbox) + (-8, -8, 8, 8)) & page.rect
+        pix = page.get_pixmap(clip=clip, alpha=False)
+        shifted = [bbox[0] - pix.x, bbox[1] - pix.y, bbox[2] - pix.x, bbox[3] - pix.y]
+        return estimate_block_colors(pixmap_array(pix), [shifted])[0]
+    
+    def _save_options(self):
+        """
+        Kaydetme profilinin PyMuPDF save() ayarları (bilinmeyen profil için standard)
+        """
+        return SAVE_PROFILES.get(self.save_profile, SAVE_PROFILES["standard"])
+    
+    def _render_pages(self, original_doc, pages):
+        """
+        (sayfa numarası, bloklar) çiftlerini yeni bir belgeye işler
+        """
+        new_doc = fitz.open()
+        new_page = None
+        
+        copied = {}
+        if self.render_engine == "redact":
+            # Sayfalar bir kez kopyalanır (görüntüler, çizimler, bağlantılar aynen kalır) ve yerinde yeniden yazılır
+            page_numbers = [page_num for page_num, _ in pages if page_num < len(original_doc)]
+            for start, end in page_ranges(page_numbers):
+                new_doc.insert_pdf(original_doc, from_page=start, to_page=end)
+            copied = {page_num: index for index, page_num in enumerate(page_numbers)}
+        
+        for page_num, page_blocks in pages:
+            with tracing.span("page", page=page_num + 1, blocks=len(page_blocks)) as page_span:
+                layout_seconds = self.stage_seconds.get("layout", 0.0)
+                target_page = new_doc[copied[page_num]] if page_num in copied else None
+                new_page = self._render_page(new_doc, original_doc, page_num, page_blocks, target_page) or new_page
+                page_span.set(layout_ms=round((self.stage_seconds.get("layout", 0.0) - layout_seconds) * 1000, 3))
+        
+        # Sayfada yapılan değişiklikleri uygula (içerik akışlarını temizlemeyen profillerde atlanır)
+        if new_page is not None and self._save_options().get("clean"):
             new_page.clean_contents()
         
-            # PDF'i kaydet ve kapat
-            new_doc.save(output_path, garbage=4, deflate=True, clean=True)
+        return new_doc
+    
+    def create_translated_pdf(self, original_doc, translated_blocks, output_path):
+        """
+        Çevrilmiş metinler ile yeni bir PDF oluşturur.
+        Bu sürüm, orijinal PDF'in tasarımını (renk, konum, yazı tipi özellikleri) tam olarak korur.
+        """
+        logger.info(f"Çevrilmiş PDF oluşturuluyor: {output_path}")
+        
+        try:
+            # Her sayfa için (sayfa numarası, bloklar)
+            pages = list(enumerate(translated_blocks))
+            
+            # Tamamen yeni bir PDF oluştur
+            with self._stage("render"):
+                if use_page_pool(len(pages)) and original_doc.name:
+                    # Sayfaları işlem havuzunda paralel işle ve sırayla birleştir
+                    new_doc, stage_seconds = render_pages_parallel(
+                        original_doc.name, self.source_lang, self.target_lang, pages, tracing.current_context()
+                    )
+                    self._merge_stage_seconds(stage_seconds)
+                else:
+                    new_doc = self._render_pages(original_doc, pages)
+            
+            # PDF'i kaydetme profiline göre kaydet ve kapat
+            with self._stage("save"):
+                new_doc.save(output_path, **self._save_options())
             new_doc.close()
             
             return output_path
@@ -754,22 +985,190 @@ class PDFTranslator:
                 
             raise
     
-    def translate_pdf(self, pdf_path, output_path, use_ocr=False):
+    def translate_pdf(self, pdf_path, output_path, ocr_mode="auto", checkpoint=None, profile=None):
+        """
+        PDF'i çevirme işleminin ana fonksiyonu.
+        checkpoint verilmişse sayfa sonuçları ve çeviriler kaydedilir; hata
+        sonrası aynı kontrol noktasıyla tekrar çağrıldığında kalınan yerden devam edilir.
+        İşlem "document" span'i altında izlenir (aşamalar, sayfalar ve çeviri batch'leri alt span'lerdir).
+        profile: CPU ve bellek profili alınsın mı (None: PROFILE_ENABLED ayarı)
+        """
+        with tracing.span("document", file=os.path.basename(pdf_path), ocr_mode=ocr_mode,
+                          source_lang=self.source_lang, target_lang=self.target_lang) as document_span:
+            with profiling.profile(os.path.basename(pdf_path), profile) as profiler:
+                self.profiler = profiler
+                try:
+                    output = self._translate_pdf(pdf_path, output_path, ocr_mode, checkpoint)
+                finally:
+                    self.profiler = None
+            if profiler is not None:
+                document_span.set(profile=os.path.basename(profiler.directory))
+            document_span.set(fallback=self.fallback_used)
+            if self.fallback_used:
+                # Hata yakalanıp orijinal kopyalandı; span yine de başarısız işaretlenir
+                document_span.status = "error"
+            return output
+    
+    def _stream_pages(self, doc, ocr_mode):
+        """
+        Sayfaları sırayla çıkarıp gruplar ve (sayfa numarası, karakter sayısı, gruplar) üretir.
+        Sayfalar pencere boyunda parçalar halinde çıkarılır; parçadaki OCR sayfaları yine
+        eşzamanlı okunur. Kontrol noktasındaki sayfalar tekrar çıkarılmaz ve gruplanmaz.
+        """
+        for start in range(0, len(doc), self.stream_window_pages):
+            page_numbers = list(range(start, min(start + self.stream_window_pages, len(doc))))
+            saved = {
+                page_num: self.checkpoint.load_page(page_num) if self.checkpoint is not None else {}
+                for page_num in page_numbers
+            }
+            extracted = self._resume_pages(saved)
+            
+            missing = [page_num for page_num in page_numbers if page_num not in extracted]
+            if missing:
+                with self._stage("extract"):
+                    tracing.annotate(pages=f"{missing[0] + 1}-{missing[-1] + 1}")
+                    for page_num, page_blocks in zip(missing, self._extract_pages(doc, missing, ocr_mode)):
+                        extracted[page_num] = page_blocks
+                        if self.checkpoint is not None:
+                            self.checkpoint.save_page(page_num, blocks=page_blocks.to_dict(), strategy=self.page_strategies.get(page_num))
+            
+            # Aşama span'i üretece bağlı kalmasın diye parça önce tamamen gruplanır
+            with self._stage("group"):
+                tracing.annotate(pages=f"{page_numbers[0] + 1}-{page_numbers[-1] + 1}")
+                pages = [
+                    (page_num, sum(len(text) for text in extracted[page_num].texts),
+                     self._group_page(page_num, extracted[page_num], saved[page_num]))
+                    for page_num in page_numbers
+                ]
+            
+            for page in pages:
+                yield page
+    
+    def _translate_window(self, index, window, known):
+        """
+        Bir penceredeki sayfaların gruplarını çevirir (çeviri iş parçacığında çalışır)
+        """
+        with tracing.span("translate", kind="stage", window=index, pages=len(window)):
+            with self._stage("translate", traced=False):
+                return self.translate_document([groups for _, _, groups in window], known)
+    
+    def _flush_window(self, original_doc, index, window, translation, spool_dir):
         """
-        PDF'i çevirme işleminin ana fonksiyonu
+        Penceresinin çevirisini bekler, sayfaları oluşturur ve ara dosyaya yazar
         """
+        translated_pages = translation.result()
+        pages = [(page_num, page_blocks) for (page_num, _, _), page_blocks in zip(window, translated_pages)]
+        
+        with self._stage("render"):
+            tracing.annotate(window=index, pages=len(pages))
+            part = self._render_pages(original_doc, pages)
+            try:
+                # Ara dosya sıkıştırılmadan yazılır; son kayıt tüm belgeyi yeniden düzenler
+                path = os.path.join(spool_dir, f"{index:05d}.pdf")
+                part.save(path)
+            finally:
+                part.close()
+        logger.info(f"Pencere {index + 1} tamamlandı: sayfa {pages[0][0] + 1}-{pages[-1][0] + 1}")
+        return path
+    
+    def _stream_document(self, doc, output_path, ocr_mode, page_chars):
+        """
+        Belgeyi sayfa pencereleri halinde işler: sayfalar çıkarılıp gruplanır,
+        pencere dolunca çevirisi arka planda başlar ve bu sırada bir önceki
+        pencere oluşturulup ara dosyaya yazılır, sonraki pencerenin sayfaları
+        okunur. Bellekte en fazla üç pencerenin blokları ve grupları bulunur; ilk
+        sayfalar son sayfalar okunmadan biter. Pencereler en sonda birleştirilip
+        kaydetme profiline göre kaydedilir; bu adımda çıktı belgesinin tamamı
+        bellekte oluşturulur. Çıkarılan metin bloğu sayısını döndürür (0 ise çıktı yazılmaz).
+        """
+        # Belge içinde tekrarlanan metinler (üst/alt bilgi vb.) pencereler arasında bir kez çevrilir
+        known = self.checkpoint.load_translations() if self.checkpoint is not None else {}
+        if known:
+            logger.info(f"Kontrol noktasından {len(known)} çeviri yüklendi")
+        
+        total_blocks = 0
+        parts = []
+        char_limit = self.max_batch_chars * self.dispatcher.max_in_flight
+        
+        with tempfile.TemporaryDirectory(prefix="pdf-stream-") as spool_dir:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-translate") as translator:
+                pending = None
+                windows = plan_windows(self._stream_pages(doc, ocr_mode), lambda page: page[1],
+                                       self.stream_window_pages, char_limit)
+                for index, window in enumerate(windows):
+                    for page_num, characters, groups in window:
+                        page_chars.append(characters)
+                        total_blocks += sum(len(group) for group in groups)
+                    
+                    translation = translator.submit(tracing.bind(self._translate_window), index, window, known)
+                    if pending is not None:
+                        parts.append(self._flush_window(doc, *pending, spool_dir))
+                    pending = (index, window, translation)
+                
+                if pending is not None:
+                    parts.append(self._flush_window(doc, *pending, spool_dir))
+            
+            logger.info(f"Toplam {total_blocks} metin bloğu çıkarıldı ({len(parts)} pencere)")
+            if total_blocks == 0:
+                return total_blocks
+            
+            # Pencereleri sırayla birleştir, kaydetme profiline göre kaydet
+            with self._stage("save"):
+                new_doc = fitz.open()
+                try:
+                    for path in parts:
+                        with fitz.open(path) as part:
+                            new_doc.insert_pdf(part)
+                    new_doc.save(output_path, **self._save_options())
+                finally:
+                    new_doc.close()
+        
+        return total_blocks
+    
+    def _translate_pdf(self, pdf_path, output_path, ocr_mode="auto", checkpoint=None):
         doc = None  # İşlem sonunda kapatmak için referansı saklayalım
+        page_chars = None
+        self.fallback_used = False
+        self.last_error = None
+        self.checkpoint = checkpoint
+        self.stage_seconds = {}
         
         try:
             logger.info(f"PDF çevirisi başlatılıyor: {pdf_path} -> {output_path}")
-            logger.info(f"Kaynak dil: {self.source_lang}, Hedef dil: {self.target_lang}, OCR: {use_ocr}")
-            
-            # 1. PDF'den metin çıkar
-            pages_content, doc = self.extract_text_with_positions(pdf_path, use_ocr)
+            logger.info(f"Kaynak dil: {self.source_lang}, Hedef dil: {self.target_lang}, OCR: {ocr_mode}")
+            ocr_mode = normalize_ocr_mode(ocr_mode)
+            doc = self._open_document(pdf_path)
             
-            # Çıkarılan metin sayısını logla
-            total_blocks = sum(len(page) for page in pages_content)
-            logger.info(f"Toplam {total_blocks} metin bloğu çıkarıldı")
+            # Profil alınan işte çeviri aşaması ana iş parçacığında ölçülebilsin diye belge modu kullanılır
+            # (profilci aşamaları sadece ana iş parçacığında izler, akış modunda çeviri arka planda çalışır)
+            if self.pipeline_mode == "stream" and self.profiler is None and not use_page_pool(len(doc)):
+                # 1-4. Sayfalar pencereler halinde çıkarılır, gruplanır, çevrilir ve oluşturulur
+                page_chars = []
+                total_blocks = self._stream_document(doc, output_path, ocr_mode, page_chars)
+            else:
+                # 1. PDF'den metin çıkar (sayfa havuzu kullanılıyorsa tüm belge tek seferde işlenir)
+                with self._stage("extract"):
+                    pages_content = self._extract_document(doc, pdf_path, ocr_mode)
+                page_chars = [sum(len(text) for text in page_blocks.texts) for page_blocks in pages_content]
+                
+                # Çıkarılan metin sayısını logla
+                total_blocks = sum(len(page) for page in pages_content)
+                logger.info(f"Toplam {total_blocks} metin bloğu çıkarıldı")
+                
+                if total_blocks > 0:
+                    # 2. Metin bloklarını grupla (kontrol noktasında varsa tekrar gruplama)
+                    with self._stage("group"):
+                        grouped_pages = [
+                            self._group_page(page_num, page_blocks, self._resumed_pages.get(page_num, {}))
+                            for page_num, page_blocks in enumerate(pages_content)
+                        ]
+                    
+                    # 3. Tüm belgenin gruplarını tek planla çevir
+                    with self._stage("translate"):
+                        translated_pages = self.translate_document(grouped_pages)
+                    
+                    # 4. Çevirili PDF oluştur
+                    self.create_translated_pdf(doc, translated_pages, output_path)
             
             # PDF'de metin bulunamadıysa
             if total_blocks == 0:
@@ -780,28 +1179,20 @@ class PDFTranslator:
                 logger.info(f"Metin bulunamadı, orijinal PDF kopyalandı: {output_path}")
                 if doc:
                     doc.close()
+                if self.checkpoint is not None:
+                    self.checkpoint.clear()
+                self._record_metrics("no_text", page_chars)
                 return output_path
             
-            # 2. Metin bloklarını grupla
-            grouped_pages = []
-            for page_blocks in pages_content:
-                grouped_blocks = self.group_text_blocks(page_blocks)
-                grouped_pages.append(grouped_blocks)
-            
-            # 3. Grupları çevir
-            translated_pages = []
-            for page_groups in grouped_pages:
-                translated_groups = self.translate_text_blocks(page_groups)
-                translated_pages.append(translated_groups)
-            
-            # 4. Çevirili PDF oluştur
-            output_file = self.create_translated_pdf(doc, translated_pages, output_path)
-            
             # 5. Çıktı dosyasını kontrol et
             if os.path.exists(output_path) and os.path.getsize(output_path) > 1000:
                 logger.info(f"PDF çevirisi başarıyla tamamlandı: {output_path} ({os.path.getsize(output_path)} bytes)")
                 if doc:
                     doc.close()
+                # Ara sonuçlara artık gerek yok
+                if self.checkpoint is not None:
+                    self.checkpoint.clear()
+                self._record_metrics("success", page_chars)
                 return output_path
             else:
                 raise ValueError("Oluşturulan PDF dosyası geçersiz veya çok küçük")
@@ -809,6 +1200,10 @@ class PDFTranslator:
         except Exception as e:
             logger.error(f"PDF çevirisi sırasında hata: {str(e)}")
             logger.error(f"Hata detayı: {traceback.format_exc()}")
+            self.last_error = str(e) or type(e).__name__
+            if self.checkpoint is not None:
+                logger.info(f"Ara sonuçlar saklandı, tekrar denemede kaldığı yerden devam edilecek: {self.checkpoint.directory}")
+            self._record_metrics("failed", page_chars)
             
             # Belgeyi temiz bir şekilde kapatmaya çalış
             if doc:
@@ -825,16 +1220,48 @@ class PDFTranslator:
                 
                 # Orijinal dosyayı kopyala
                 shutil.copy(pdf_path, output_path)
+                self.fallback_used = True
                 logger.warning(f"Hata nedeniyle orijinal PDF kopyalandı: {output_path}")
                 return output_path
             except Exception as copy_err:
                 logger.error(f"Orijinal dosya kopyalama hatası: {str(copy_err)}")
                 raise
 
-def translate_pdf(input_path, source_lang="TR", target_lang="DE", output_dir="downloads", use_ocr=False):
+def output_settings():
+    """
+    Çıktıyı etkileyen ayarları tek metinde birleştirir; bunlardan biri
+    değişince belge anahtarı da değişir ve önceki çıktı yeniden kullanılmaz
+    """
+    return "|".join([
+        PIPELINE_VERSION, GROUPING_MODE, TEXT_EMIT_MODE, RENDER_COLOR_MODE, RENDER_ENGINE, SAVE_PROFILE,
+        os.getenv("OCR_LANG", ""), os.getenv("OCR_DPI", "")
+    ])
+
+def job_key(input_path, source_lang, target_lang, ocr_mode, namespace=None):
+    """
+    Çıktıyı belirleyen tüm ayarlardan belge anahtarı üretir (sonuç deposu,
+    kontrol noktası ve kuyruktaki iş birleştirme için aynı anahtar kullanılır).
+    namespace: çeviri arka ucunun önbellek ad alanı (None: .env ayarlarındaki arka uç, istemci oluşturulmaz)
+    """
+    if namespace is None:
+        namespace = backend_namespace()
+    return document_key(input_path, source_lang, target_lang, normalize_ocr_mode(ocr_mode),
+                        output_settings(), namespace)
+
+def translate_pdf(input_path, source_lang="TR", target_lang="DE", output_dir="downloads", ocr_mode="auto", profile=None,
+                  use_ocr=None):
     """
-    Dışa açılan ana fonksiyon
+    Dışa açılan ana fonksiyon. Çeviri başarısız olursa TranslationFailedError fırlatır.
+    profile: işin profilini al (None: PROFILE_ENABLED ayarı); profil istenirse önceki çıktı yeniden kullanılmaz
+    use_ocr: kullanımdan kaldırıldı, ocr_mode kullanın (verilirse ocr_mode yerine geçer: True -> always, False -> auto)
     """
+    if use_ocr is not None:
+        logger.warning("translate_pdf: use_ocr parametresi kullanımdan kaldırıldı, ocr_mode kullanın")
+        ocr_mode = normalize_ocr_mode(use_ocr)
+    
+    if profile is None:
+        profile = profiling.profiling_enabled()
+    
     output_dir = Path(output_dir)
     output_dir.mkdir(exist_ok=True)
     
@@ -845,16 +1272,45 @@ def translate_pdf(input_path, source_lang="TR", target_lang="DE", output_dir="do
     # PDF çeviriciyi başlat
     translator = PDFTranslator(source_lang=source_lang, target_lang=target_lang)
     
-    # OCR kullanılacak mı kontrol et (form parametresi)
-    if isinstance(use_ocr, str):
-        use_ocr = use_ocr.lower() == 'true'
+    # Arka ucu hemen oluştur (eksik API anahtarı gibi ayar hataları işlem başlamadan görülsün)
+    translator.backend
+    
+    # OCR modu (form parametresi; eski "true"/"false" değerleri de kabul edilir)
+    ocr_mode = normalize_ocr_mode(ocr_mode)
+    
+    # Belge anahtarı: önceki çıktıyı ve yarım kalan işin kontrol noktasını bulmak için
+    key = job_key(input_path, source_lang, target_lang, ocr_mode, translator.backend.cache_namespace)
+    
+    # Aynı belge aynı ayarlarla daha önce çevrildiyse mevcut çıktıyı kullan
+    result_store = get_result_store()
+    if result_store is not None and not profile:
+        existing_path = result_store.get(key)
+        if existing_path:
+            logger.info(f"Aynı belge daha önce çevrilmiş, mevcut çıktı kullanılıyor: {existing_path}")
+            if os.path.dirname(existing_path) != str(output_dir.resolve()):
+                shutil.copy(existing_path, output_path)
+                return str(output_path)
+            return existing_path
     
     # Çeviriyi gerçekleştir
-    return translator.translate_pdf(input_path, str(output_path), use_ocr)
+    result_path = translator.translate_pdf(input_path, str(output_path), ocr_mode, checkpoint=get_checkpoint(key),
+                                           profile=profile)
+    
+    # Hata nedeniyle kopyalanan orijinal dosya sonuç olarak verilmez; iş başarısız
+    # işaretlenir ve kontrol noktasından devam edecek şekilde yeniden denenebilir
+    if translator.fallback_used:
+        try:
+            os.remove(result_path)
+        except OSError:
+            pass
+        raise TranslationFailedError(translator.last_error or "Çeviri başarısız")
+    
+    if result_store is not None:
+        result_store.put(key, result_path)
+    
+    return result_path
 
 if __name__ == "__main__":
-    # Test etmek için
-    import sys
-    if len(sys.argv) > 1:
-        pdf_path = sys.argv[1]
-        translate_pdf(pdf_path) 
\ No newline at end of file
+    # Komut satırı kullanımı toplu çeviri aracına yönlendirilir (python pdf_translator.py --help)
+    from batch_translate import main
+    main() 
\ No newline at end of file
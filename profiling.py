@@ -0,0 +1,261 @@
+"""
+Tek bir çeviri işi için isteğe bağlı profil çıkarma.
+
+Etkinleştirildiğinde (PROFILE_ENABLED=true veya istek başına profile
+bayrağı) belge çevirisi boyunca cProfile ile CPU profili alınır; her
+aşamanın (extract, ocr, group, translate, render, save) başında ve sonunda
+tracemalloc ile bellek durumu ölçülür ve aşama sonu görüntüsü kaydedilir.
+Çıktılar PROFILE_DIR altında profil başına bir dizine yazılır:
+
+    cpu.prof                    pstats dosyası (python -m pstats, snakeviz)
+    memory-<n>-<aşama>.snapshot tracemalloc görüntüleri (tracemalloc.Snapshot.load)
+    summary.txt / summary.json  aşama süreleri, bellek ve en sıcak fonksiyonlar
+
+CPU profili sadece belgeyi işleyen iş parçacığını kapsar; çeviri
+istekleri ve OCR iş parçacıklarında geçen süre bekleme olarak görünür.
+tracemalloc süreç geneli olduğundan aynı anda tek profil alınır.
+"""
+import io
+import os
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_TOP_FUNCTIONS = 30
+DEFAULT_TOP_ALLOCATIONS = 10
+
+# tracemalloc ve profil dosyaları süreç geneli; aynı anda tek profil
+_active_lock = threading.Lock()
+
+
+def profiling_enabled():
+    return os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+
+
+def profile_dir():
+    return os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR)
+
+
+class JobProfiler:
+    """
+    Bir belgenin CPU profilini ve aşama başına bellek ölçümlerini toplar
+    """
+
+    def __init__(self, directory, document, memory=True, top=DEFAULT_TOP_FUNCTIONS):
+        self.directory = directory
+        self.document = document
+        self.memory = memory
+        self.top = top
+        self.stages = []
+        self._stack = []
+        self._profile = cProfile.Profile()
+        self._started_tracemalloc = False
+        self._start = None
+        self.seconds = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._start = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        self.seconds = time.perf_counter() - self._start
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def begin_stage(self, stage):
+        entry = {"stage": stage}
+        if self.memory:
+            # Bellek görüntüsü almak CPU profiline yansımasın
+            self._profile.disable()
+            current, peak = tracemalloc.get_traced_memory()
+            # Tepe değeri iç aşama için sıfırlanır; dıştaki aşamalar o ana kadarki tepeyi korur
+            for outer in self._stack:
+                outer["peak"] = max(outer["peak"], peak)
+            tracemalloc.reset_peak()
+            entry.update(current=current, peak=current, snapshot=tracemalloc.take_snapshot())
+            self._profile.enable()
+        entry["start"] = time.perf_counter()
+        self._stack.append(entry)
+
+    def end_stage(self, stage):
+        entry = self._stack.pop()
+        result = {
+            "stage": stage,
+            "depth": len(self._stack),
+            "seconds": round(time.perf_counter() - entry["start"], 6),
+        }
+        if self.memory:
+            self._profile.disable()
+            current, peak = tracemalloc.get_traced_memory()
+            entry["peak"] = max(entry["peak"], peak)
+            for outer in self._stack:
+                outer["peak"] = max(outer["peak"], entry["peak"])
+
+            snapshot = tracemalloc.take_snapshot()
+            snapshot_name = f"memory-{len(self.stages) + 1:02d}-{stage}.snapshot"
+            snapshot.dump(os.path.join(self.directory, snapshot_name))
+            # tracemalloc'un görüntü için kendi ayırdığı bellek sonuçlardan çıkarılır
+            growth = [
+                stat for stat in snapshot.compare_to(entry["snapshot"], "lineno")
+                if stat.size_diff > 0 and stat.traceback[0].filename != tracemalloc.__file__
+            ]
+            result.update(
+                memory_delta=current - entry["current"],
+                memory_peak=entry["peak"],
+                snapshot=snapshot_name,
+                top_allocations=[
+                    {"location": str(stat.traceback[0]), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                    for stat in growth[:DEFAULT_TOP_ALLOCATIONS]
+                ],
+            )
+            self._profile.enable()
+        self.stages.append(result)
+
+    def _top_functions(self, stats, sort_key):
+        rows = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                "function": f"{os.path.basename(filename)}:{line}({function})",
+                "calls": calls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6),
+            })
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+        return rows[:self.top]
+
+    def save(self):
+        """
+        Profil dosyalarını ve özetleri yazar
+        """
+        self._profile.dump_stats(os.path.join(self.directory, "cpu.prof"))
+        stats = pstats.Stats(self._profile)
+
+        summary = {
+            "id": os.path.basename(self.directory),
+            "document": self.document,
+            "trace_id": getattr(tracing.current_span(), "trace_id", None),
+            "created_at": time.time(),
+            "seconds": round(self.seconds, 6),
+            "memory": self.memory,
+            "stages": self.stages,
+            "top_cumulative": self._top_functions(stats, "cumtime"),
+            "top_tottime": self._top_functions(stats, "tottime"),
+        }
+        with open(os.path.join(self.directory, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        with open(os.path.join(self.directory, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write(self._format_summary(summary))
+
+    def _format_summary(self, summary):
+        lines = [
+            f"Profil: {summary['id']}",
+            f"Belge: {summary['document']}",
+            f"Toplam süre: {summary['seconds']:.3f} sn",
+            "",
+            "Aşamalar:",
+        ]
+        for stage in self.stages:
+            line = f"  {'  ' * stage['depth']}{stage['stage']:<12} {stage['seconds']:>9.3f} sn"
+            if self.memory:
+                line += (f"  bellek değişimi {stage['memory_delta'] / 1024:>10.1f} KB"
+                         f"  tepe {stage['memory_peak'] / 1024:>10.1f} KB")
+            lines.append(line)
+
+        if self.memory:
+            lines += ["", "Aşama başına en çok bellek ayıran satırlar:"]
+            for stage in self.stages:
+                lines.append(f"  {stage['stage']}:")
+                for allocation in stage["top_allocations"][:5]:
+                    lines.append(f"    {allocation['size_diff'] / 1024:>10.1f} KB  {allocation['location']}")
+
+        # En sıcak fonksiyonlar: kümülatif ve kendi süresine göre
+        for sort_key, title in (("cumulative", "kümülatif süre"), ("tottime", "kendi süresi")):
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats(sort_key).print_stats(self.top)
+            lines += ["", f"En çok zaman harcayan fonksiyonlar ({title}):", stream.getvalue().strip()]
+
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profile(document, enabled=None):
+    """
+    Blok boyunca profil alır ve JobProfiler'ı döndürür; profil kapalıysa
+    veya başka bir profil sürüyorsa None döner. Profil hataları çeviriyi durdurmaz.
+    """
+    if enabled is None:
+        enabled = profiling_enabled()
+    if not enabled:
+        yield None
+        return
+    if not _active_lock.acquire(blocking=False):
+        logger.warning(f"Başka bir profil sürüyor, belge profilsiz işlenecek: {document}")
+        yield None
+        return
+
+    try:
+        trace_id = getattr(tracing.current_span(), "trace_id", None) or os.urandom(8).hex()
+        directory = os.path.join(profile_dir(), f"{time.strftime('%Y%m%d-%H%M%S')}-{trace_id}")
+        profiler = JobProfiler(
+            directory, document,
+            memory=os.getenv("PROFILE_MEMORY", "true").lower() == "true",
+            top=int(os.getenv("PROFILE_TOP", DEFAULT_TOP_FUNCTIONS))
+        )
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            try:
+                profiler.save()
+                logger.info(f"Profil kaydedildi: {directory}")
+            except Exception as e:
+                logger.error(f"Profil kaydedilemedi: {str(e)}")
+    finally:
+        _active_lock.release()
+
+
+def list_profiles():
+    """
+    Profil dizinlerini en yeniden eskiye listeler (özet bilgisi ve dosyalarıyla)
+    """
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not os.path.isdir(path):
+            continue
+        entry = {"id": name, "document": None, "seconds": None, "created_at": os.path.getmtime(path)}
+        try:
+            with open(os.path.join(path, "summary.json"), encoding="utf-8") as f:
+                summary = json.load(f)
+            entry.update(document=summary.get("document"), seconds=summary.get("seconds"),
+                         created_at=summary.get("created_at", entry["created_at"]))
+        except (OSError, ValueError):
+            pass
+        entry["files"] = [
+            {"name": filename, "size": os.path.getsize(os.path.join(path, filename))}
+            for filename in sorted(os.listdir(path))
+        ]
+        profiles.append(entry)
+
+    profiles.sort(key=lambda entry: entry["created_at"], reverse=True)
+    return profiles
@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+import logging
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan ayarlar (.env ile değiştirilebilir)
+DEFAULT_STORE_PATH = os.path.join("cache", "result_index.sqlite3")
+
+
+def document_key(pdf_path, source_lang, target_lang, ocr_mode, pipeline_version, namespace=""):
+    """
+    Belge içeriği ve çeviri ayarlarından belge anahtarı üretir.
+    Aynı dosya aynı ayarlarla tekrar yüklendiğinde aynı anahtar elde edilir.
+    """
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    raw = "\x1f".join([
+        digest.hexdigest(), (source_lang or "auto").upper(), target_lang.upper(),
+        ocr_mode, str(pipeline_version), namespace
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """
+    Tamamlanmış çevirilerin belge anahtarı -> çıktı dosyası dizini.
+
+    Kayıtlar SQLite veritabanında tutulur; çıktı dosyası silinmişse kayıt
+    geçersiz sayılır ve kaldırılır.
+    """
+
+    def __init__(self, db_path=DEFAULT_STORE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " output_path TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        """
+        Her iş parçacığı için ayrı bir SQLite bağlantısı döndürür
+        """
+        conn = getattr(self._local, "conn", None)
+        # fork sonrası üst sürecin bağlantısı kullanılmamalı
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        """
+        Anahtar için mevcut çıktı dosyasının yolunu döndürür, yoksa None
+        """
+        output_path = self._lookup(key)
+        metrics.CACHE_LOOKUPS.inc(cache="result", result="miss" if output_path is None else "hit")
+        return output_path
+
+    def _lookup(self, key):
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT output_path FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            output_path = row[0]
+            with conn:
+                if not os.path.isfile(output_path) or os.path.getsize(output_path) == 0:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            return output_path
+        except sqlite3.Error as e:
+            logger.error(f"Sonuç dizini okunurken hata: {str(e)}")
+            return None
+
+    def put(self, key, output_path):
+        """
+        Tamamlanmış çevirinin çıktı dosyasını kaydeder
+        """
+        now = time.time()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                    (key, os.path.abspath(output_path), now, now)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Sonuç dizinine yazılırken hata: {str(e)}")
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """
+    .env ayarlarına göre paylaşılan sonuç dizinini döndürür (devre dışıysa None)
+    """
+    global _default_store
+
+    if os.getenv("RESULT_DEDUP_ENABLED", "true").lower() != "true":
+        return None
+
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ResultStore(os.getenv("RESULT_STORE_PATH", DEFAULT_STORE_PATH))
+        return _default_store
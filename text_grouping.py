@@ -0,0 +1,261 @@
+from collections import defaultdict
+
+from block_model import NO_COLOR
+
+# Aynı satır: dikey örtüşme (küçük yüksekliğe oranla) ve en fazla yatay boşluk (satır yüksekliğine oranla)
+LINE_MIN_OVERLAP = 0.5
+LINE_MAX_GAP = 1.0
+# Aynı paragraf: satırlar arası en fazla dikey boşluk ve sol kenar toleransı (satır yüksekliğine oranla)
+PARAGRAPH_MAX_GAP = 0.6
+PARAGRAPH_MIN_GAP = -0.3
+PARAGRAPH_INDENT = 2.0
+# Aynı paragraftaki satırların font boyutu en fazla bu oranda farklı olabilir
+PARAGRAPH_SIZE_TOLERANCE = 0.15
+# Okuma sırasında sütun arası sayılacak en küçük boşluk (punto)
+MIN_COLUMN_GAP = 4
+BOLD_FLAG = 16
+
+
+class GridIndex:
+    """
+    Kutuları sabit boyutlu hücrelere yerleştiren basit uzamsal dizin.
+    Sorgu sadece kutuyla kesişen hücrelerdeki adayları döndürür.
+    """
+
+    def __init__(self, cell_width, cell_height):
+        self.cell_width = max(cell_width, 1.0)
+        self.cell_height = max(cell_height, 1.0)
+        self._cells = defaultdict(list)
+
+    @classmethod
+    def for_boxes(cls, boxes):
+        """
+        Hücre boyutu kutuların ortanca genişlik ve yüksekliğine göre seçilir
+        """
+        widths = sorted(box[2] - box[0] for box in boxes)
+        heights = sorted(box[3] - box[1] for box in boxes)
+        index = cls(widths[len(widths) // 2], heights[len(heights) // 2] * 2)
+        for i, box in enumerate(boxes):
+            index.insert(i, box)
+        return index
+
+    def _cell_range(self, bbox):
+        return (
+            range(int(bbox[0] // self.cell_width), int(bbox[2] // self.cell_width) + 1),
+            range(int(bbox[1] // self.cell_height), int(bbox[3] // self.cell_height) + 1),
+        )
+
+    def insert(self, item, bbox):
+        xs, ys = self._cell_range(bbox)
+        for cx in xs:
+            for cy in ys:
+                self._cells[(cx, cy)].append(item)
+
+    def query(self, bbox):
+        xs, ys = self._cell_range(bbox)
+        found = set()
+        for cx in xs:
+            for cy in ys:
+                found.update(self._cells.get((cx, cy), ()))
+        return found
+
+
+class _UnionFind:
+    def __init__(self, count):
+        self.parent = list(range(count))
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def groups(self):
+        members = defaultdict(list)
+        for item in range(len(self.parent)):
+            members[self.find(item)].append(item)
+        return list(members.values())
+
+
+def _height(bbox):
+    return max(bbox[3] - bbox[1], 1.0)
+
+
+def _union_bbox(boxes):
+    return [
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    ]
+
+
+def _same_line(a, b):
+    height = min(_height(a), _height(b))
+    overlap = min(a[3], b[3]) - max(a[1], b[1])
+    if overlap < LINE_MIN_OVERLAP * height:
+        return False
+    gap = max(b[0] - a[2], a[0] - b[2])
+    return gap <= LINE_MAX_GAP * max(_height(a), _height(b))
+
+
+def build_lines(boxes):
+    """
+    Aynı satırdaki yakın kutuları birleştirir.
+    Her satır için soldan sağa sıralı kutu indekslerinin listesini döndürür.
+    """
+    index = GridIndex.for_boxes(boxes)
+    links = _UnionFind(len(boxes))
+    for i, box in enumerate(boxes):
+        reach = LINE_MAX_GAP * _height(box)
+        for j in index.query([box[0] - reach, box[1], box[2] + reach, box[3]]):
+            if j > i and _same_line(box, boxes[j]):
+                links.union(i, j)
+
+    return [sorted(members, key=lambda i: boxes[i][0]) for members in links.groups()]
+
+
+def _compatible(a, b):
+    """
+    İki satırın aynı paragrafa ait olabilmesi için yazı stili kontrolü
+    """
+    size_a, size_b = a["font_size"] or 1, b["font_size"] or 1
+    if abs(size_a - size_b) > PARAGRAPH_SIZE_TOLERANCE * max(size_a, size_b):
+        return False
+    if a["color"] != NO_COLOR and b["color"] != NO_COLOR and a["color"] != b["color"]:
+        return False
+    return (a["flags"] & BOLD_FLAG) == (b["flags"] & BOLD_FLAG)
+
+
+def _paragraph_gap(upper, lower):
+    """
+    lower satırı upper satırının altında aynı paragrafın devamı olabiliyorsa dikey boşluğu, değilse None döndürür
+    """
+    a, b = upper["bbox"], lower["bbox"]
+    height = max(_height(a), _height(b))
+    gap = b[1] - a[3]
+    if gap < PARAGRAPH_MIN_GAP * height or gap > PARAGRAPH_MAX_GAP * height:
+        return None
+    if b[1] <= a[1] + 0.5 * _height(a):
+        return None
+
+    overlap = min(a[2], b[2]) - max(a[0], b[0])
+    narrower = min(a[2] - a[0], b[2] - b[0])
+    if overlap <= 0:
+        return None
+    if abs(a[0] - b[0]) > PARAGRAPH_INDENT * height and overlap < 0.5 * narrower:
+        return None
+    if not _compatible(upper, lower):
+        return None
+    return gap
+
+
+def build_paragraphs(lines):
+    """
+    Alt alta gelen uyumlu satırları paragraflarda birleştirir.
+
+    Her satır en yakın uygun alt satırına, o satır da en yakın uygun üst
+    satırına işaret ediyorsa bağlanır; böylece yan yana iki sütun alttaki
+    tam genişlikte bir satır üzerinden birleşmez.
+    """
+    if not lines:
+        return []
+
+    index = GridIndex.for_boxes([line["bbox"] for line in lines])
+    best_below = {}
+    best_above = {}
+    for i, line in enumerate(lines):
+        box = line["bbox"]
+        reach = PARAGRAPH_MAX_GAP * _height(box) * 2
+        for j in index.query([box[0], box[1], box[2], box[3] + reach]):
+            if j == i:
+                continue
+            gap = _paragraph_gap(line, lines[j])
+            if gap is None:
+                continue
+            if i not in best_below or gap < best_below[i][0]:
+                best_below[i] = (gap, j)
+            if j not in best_above or gap < best_above[j][0]:
+                best_above[j] = (gap, i)
+
+    links = _UnionFind(len(lines))
+    for i, (_, j) in best_below.items():
+        if best_above.get(j, (None, None))[1] == i:
+            links.union(i, j)
+
+    return [sorted(members, key=lambda i: (lines[i]["bbox"][1], lines[i]["bbox"][0])) for members in links.groups()]
+
+
+def _find_cuts(items, boxes, axis, min_gap):
+    """
+    Kutuları verilen eksende (0: x, 1: y) boşluklardan bölerek parçalara ayırır
+    """
+    ordered = sorted(items, key=lambda i: boxes[i][axis])
+    parts = [[ordered[0]]]
+    reach = boxes[ordered[0]][axis + 2]
+    for i in ordered[1:]:
+        if boxes[i][axis] - reach > min_gap:
+            parts.append([i])
+        else:
+            parts[-1].append(i)
+        reach = max(reach, boxes[i][axis + 2])
+    return parts
+
+
+def reading_order(boxes):
+    """
+    Kutuların okuma sırasını XY-cut ile belirler.
+
+    Önce sütun boşlukları (dikey kesim) aranır, bulunamazsa satır bantları
+    (yatay kesim); her parça aynı şekilde özyinelemeli olarak bölünür. Böylece
+    tam genişlikteki başlıklar sütunların üstünde, sütunlar soldan sağa okunur.
+    """
+    def cut(items):
+        if len(items) <= 1:
+            return items
+        columns = _find_cuts(items, boxes, 0, MIN_COLUMN_GAP)
+        if len(columns) > 1:
+            return [i for part in columns for i in cut(part)]
+        bands = _find_cuts(items, boxes, 1, 0)
+        if len(bands) > 1:
+            return [i for part in bands for i in cut(part)]
+        return sorted(items, key=lambda i: (boxes[i][1], boxes[i][0]))
+
+    return cut(list(range(len(boxes))))
+
+
+def group_blocks(spans):
+    """
+    Sayfanın span'lerini (PageSpans) paragraflara gruplar ve okuma sırasına dizer.
+
+    Her grup için okuma sırasındaki span indekslerinin listesini döndürür
+    (satır satır, satır içinde soldan sağa).
+    """
+    if not len(spans):
+        return []
+
+    boxes = spans.boxes()
+    lines = []
+    for members in build_lines(boxes):
+        first = members[0]
+        lines.append({
+            "members": members,
+            "bbox": _union_bbox([boxes[i] for i in members]),
+            "font_size": spans.sizes[first],
+            "color": spans.colors[first],
+            "flags": spans.flags[first],
+        })
+
+    paragraphs = [
+        [i for line_index in paragraph for i in lines[line_index]["members"]]
+        for paragraph in build_paragraphs(lines)
+    ]
+    paragraph_boxes = [_union_bbox([boxes[i] for i in members]) for members in paragraphs]
+    return [paragraphs[i] for i in reading_order(paragraph_boxes)]
@@ -0,0 +1,153 @@
+import threading
+from collections import namedtuple
+
+import fitz  # PyMuPDF
+
+# Satır yüksekliği = font boyutu * LINE_SPACING
+LINE_SPACING = 1.2
+# Hiçbir durumda bunun altına inilmez (okunabilirlik sınırı)
+MIN_FONT_SIZE = 6
+# İkili aramanın durduğu font boyutu hassasiyeti (punto)
+SIZE_PRECISION = 0.1
+MAX_SEARCH_STEPS = 12
+# Kelime genişliği önbelleğinin en fazla boyutu (aşılınca temizlenir)
+WORD_CACHE_LIMIT = 200000
+
+# lines: [([(kelime, genişlik), ...], satır genişliği), ...], font_size: seçilen boyut
+LayoutResult = namedtuple("LayoutResult", ["lines", "font_size"])
+
+
+class TextLayoutEngine:
+    """
+    Metni verilen kutuya sığacak şekilde satırlara bölen yerleşim motoru.
+
+    Karakter genişlikleri 1 punto için bir kez hesaplanıp tabloda tutulur,
+    kelime genişlikleri de önbelleğe alınır; diğer boyutlardaki genişlik
+    doğrusal ölçekleme ile bulunur. Font boyutu, sığan en büyük değer için
+    sınırlı ikili arama ile seçilir.
+    """
+
+    def __init__(self, fontname="helvetica"):
+        self.fontname = fontname
+        self._char_widths = {}
+        self._word_widths = {}
+        self._lock = threading.Lock()
+        self._space = self.char_width(" ")
+
+    def char_width(self, char):
+        """
+        Karakterin 1 punto genişliği
+        """
+        width = self._char_widths.get(char)
+        if width is None:
+            width = fitz.get_text_length(char, fontname=self.fontname, fontsize=1)
+            self._char_widths[char] = width
+        return width
+
+    def word_width(self, word):
+        """
+        Kelimenin 1 punto genişliği (önbellekli)
+        """
+        width = self._word_widths.get(word)
+        if width is None:
+            width = sum(self.char_width(char) for char in word)
+            with self._lock:
+                if len(self._word_widths) >= WORD_CACHE_LIMIT:
+                    self._word_widths.clear()
+                self._word_widths[word] = width
+        return width
+
+    def space_width(self, font_size):
+        return self._space * font_size
+
+    def _wrap(self, words, unit_widths, max_width, font_size):
+        """
+        Kelimeleri verilen boyutta satırlara böler (açgözlü yerleştirme)
+        """
+        space_width = self._space * font_size
+        lines = []
+        current_line = []
+        current_width = 0
+
+        for word, unit_width in zip(words, unit_widths):
+            word_width = unit_width * font_size
+
+            # Yeni kelime satıra sığmıyorsa, yeni satıra geç
+            if current_line and current_width + space_width + word_width > max_width:
+                lines.append((current_line, current_width))
+                current_line = []
+                current_width = 0
+
+            current_line.append((word, word_width))
+            if len(current_line) == 1:
+                current_width = word_width
+            else:
+                current_width += space_width + word_width
+
+        if current_line:
+            lines.append((current_line, current_width))
+
+        return lines
+
+    def _fits(self, lines, font_size, max_height):
+        return len(lines) * font_size * LINE_SPACING <= max_height
+
+    def layout(self, text, max_width, max_height, font_size, min_font_factor=0.6):
+        """
+        Metni max_width x max_height kutusuna yerleştirir ve LayoutResult döndürür.
+
+        Önce font_size denenir; sığmazsa [font_size * min_font_factor, font_size]
+        aralığında, orada da sığmazsa MIN_FONT_SIZE değerine kadar ikili arama
+        yapılır. Hiçbir boyutta sığmıyorsa en küçük boyuttaki yerleşim döndürülür.
+        """
+        words = text.split()
+        if not words:
+            return LayoutResult([], font_size)
+
+        unit_widths = [self.word_width(word) for word in words]
+
+        lines = self._wrap(words, unit_widths, max_width, font_size)
+        if self._fits(lines, font_size, max_height):
+            return LayoutResult(lines, font_size)
+
+        floor = min(font_size, MIN_FONT_SIZE)
+        preferred_floor = max(floor, font_size * min_font_factor)
+
+        for low in (preferred_floor, floor):
+            low_lines = self._wrap(words, unit_widths, max_width, low)
+            if self._fits(low_lines, low, max_height):
+                break
+        else:
+            # Hiçbir boyutta sığmıyor - en küçük boyutla taşarak yerleştir
+            return LayoutResult(low_lines, low)
+
+        # low sığıyor, font_size sığmıyor: sığan en büyük boyutu ara
+        best_lines, best_size = low_lines, low
+        high = font_size
+        for _ in range(MAX_SEARCH_STEPS):
+            if high - best_size <= SIZE_PRECISION:
+                break
+            middle = (best_size + high) / 2
+            middle_lines = self._wrap(words, unit_widths, max_width, middle)
+            if self._fits(middle_lines, middle, max_height):
+                best_lines, best_size = middle_lines, middle
+            else:
+                high = middle
+
+        return LayoutResult(best_lines, best_size)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_layout_engine(fontname="helvetica"):
+    """
+    Font başına paylaşılan yerleşim motorunu döndürür
+    """
+    with _engines_lock:
+        engine = _engines.get(fontname)
+        if engine is None:
+            engine = TextLayoutEngine(fontname)
+            _engines[fontname] = engine
+        return engine
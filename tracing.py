@@ -0,0 +1,313 @@
+"""
+İş başına izleme (tracing): iç içe zaman aralıkları (span) ve ilişkilendirme kimliği.
+
+Her iş bir iz (trace) açar; iz kimliği iş kimliğidir. Belge, aşama, sayfa ve
+çeviri batch'leri bu izin altında iç içe span'ler olarak ölçülür. Geçerli span
+contextvars ile taşınır; iş parçacığı havuzlarına bind(), sayfa işçi
+süreçlerine current_context() / attach() ile aktarılır.
+
+Biten span'ler JSON sözlüğü olarak dışa aktarıcıya (exporter) verilir:
+TRACE_EXPORTER=none (varsayılan), log veya file. set_exporter() ile export(span)
+metodu olan herhangi bir nesne takılabilir. Log kayıtlarına da geçerli iz ve
+span kimliği eklenir (configure_logging, LOG_FORMAT=text veya json).
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_FILE = os.path.join("logs", "traces.jsonl")
+
+TEXT_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s'
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id():
+    return uuid.uuid4().hex[:16]
+
+
+class Span:
+    """
+    Bir izdeki tek zaman aralığı
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "status", "error",
+                 "start_time", "_start", "duration")
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _RemoteParent:
+    """
+    Başka bir süreçte açılmış üst span (sadece kimlikleri bilinir)
+    """
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id, span_id):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def set(self, **attributes):
+        pass
+
+
+class NullExporter:
+    def export(self, span):
+        pass
+
+
+class LogExporter:
+    """
+    Span'leri "tracing" loglayıcısına tek satır JSON olarak yazar
+    """
+
+    def __init__(self, level=logging.INFO):
+        self.level = level
+        self.logger = logging.getLogger("tracing.spans")
+
+    def export(self, span):
+        self.logger.log(self.level, json.dumps(span, ensure_ascii=False, default=str))
+
+
+class JsonFileExporter:
+    """
+    Span'leri dosyaya satır başına bir JSON (JSON Lines) olarak ekler.
+    Her satır tek yazmayla eklendiği için sayfa işçi süreçleri aynı dosyayı kullanabilir.
+    """
+
+    def __init__(self, path=DEFAULT_TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, span):
+        line = json.dumps(span, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def create_exporter():
+    """
+    .env ayarına göre dışa aktarıcı oluşturur
+    """
+    kind = os.getenv("TRACE_EXPORTER", "none").lower()
+    if kind == "log":
+        return LogExporter()
+    if kind == "file":
+        return JsonFileExporter(os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE))
+    if kind != "none":
+        logger.warning(f"Bilinmeyen TRACE_EXPORTER değeri: {kind}, izler dışa aktarılmayacak")
+    return NullExporter()
+
+
+def get_exporter():
+    global _exporter
+
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = create_exporter()
+        return _exporter
+
+
+def set_exporter(exporter):
+    """
+    Dışa aktarıcıyı değiştirir (export(span_sözlüğü) metodu olan herhangi bir nesne); None: .env ayarına dön
+    """
+    global _exporter
+
+    with _exporter_lock:
+        _exporter = exporter
+
+
+def _export(span):
+    try:
+        get_exporter().export(span.to_dict())
+    except Exception as e:
+        logger.error(f"Span dışa aktarılamadı: {str(e)}")
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Geçerli span'in altında yeni bir span açar; açık span yoksa yeni bir iz başlar.
+    Blokta hata oluşursa span "error" durumuyla kapanır ve hata yukarı iletilir.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        current = Span(name, _new_id(), attributes=attributes)
+    else:
+        current = Span(name, parent.trace_id, parent.span_id, attributes)
+
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = str(e) or type(e).__name__
+        raise
+    finally:
+        current.finish()
+        _current_span.reset(token)
+        _export(current)
+
+
+@contextmanager
+def trace(trace_id, name="job", **attributes):
+    """
+    Verilen kimlikle (örn. iş kimliği) yeni bir iz ve kök span açar
+    """
+    token = _current_span.set(None)
+    try:
+        current = Span(name, trace_id, attributes=attributes)
+        inner = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.status = "error"
+            current.error = str(e) or type(e).__name__
+            raise
+        finally:
+            current.finish()
+            _current_span.reset(inner)
+            _export(current)
+    finally:
+        _current_span.reset(token)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def annotate(**attributes):
+    """
+    Geçerli span'e öznitelik ekler (açık span yoksa bir şey yapmaz)
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def current_context():
+    """
+    Başka bir sürece aktarılabilecek (iz kimliği, span kimliği) veya None
+    """
+    current = _current_span.get()
+    if current is None:
+        return None
+    return current.trace_id, current.span_id
+
+
+@contextmanager
+def attach(context):
+    """
+    current_context() ile alınan üst span'i bu süreçte geçerli yapar
+    """
+    if context is None:
+        yield
+        return
+    token = _current_span.set(_RemoteParent(*context))
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+def bind(fn):
+    """
+    fn'i şu anki bağlamla (geçerli span dahil) çalışacak şekilde sarar; iş parçacığı havuzuna verilirken kullanılır.
+    Her çağrı için ayrı bind() yapılmalıdır.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+
+    return run
+
+
+class TraceContextFilter(logging.Filter):
+    """
+    Log kayıtlarına geçerli iz ve span kimliğini ekler ("-": iz dışında)
+    """
+
+    def filter(self, record):
+        current = _current_span.get()
+        record.trace_id = current.trace_id if current is not None else "-"
+        record.span_id = current.span_id if current is not None else "-"
+        return True
+
+
+class JsonLogFormatter(logging.Formatter):
+    """
+    Log kayıtlarını iz kimlikleriyle birlikte tek satır JSON olarak biçimlendirir
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "trace_id", "-"),
+            "span_id": getattr(record, "span_id", "-"),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Kök loglayıcıyı iz kimlikli biçimle yeniden ayarlar (LOG_FORMAT=text veya json)
+    """
+    handler = logging.StreamHandler()
+    handler.addFilter(TraceContextFilter())
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonLogFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_LOG_FORMAT))
+    logging.basicConfig(level=level, handlers=[handler], force=True)
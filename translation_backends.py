@@ -0,0 +1,199 @@
+import os
+import time
+import random
+import threading
+import logging
+
+import deepl
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(Exception):
+    """
+    Çeviri arka ucu hatalarının temel sınıfı (yeniden denenmez)
+    """
+
+
+class TransientBackendError(BackendError):
+    """
+    Geçici hata (bağlantı sorunu, 5xx yanıtı) - yeniden denenebilir
+    """
+
+
+class ThrottledError(TransientBackendError):
+    """
+    Hız sınırı veya kota aşımı (429/456 yanıtı)
+    """
+
+
+class TranslationBackend:
+    """
+    Çeviri arka uçları için ortak arayüz.
+
+    translate_batch(texts, source_lang, target_lang) metinlerle aynı sırada
+    bir çeviri listesi döndürmeli, hataları yukarıdaki BackendError
+    sınıflarıyla bildirmelidir.
+    """
+
+    name = "base"
+    # Çeviri belleğinde bu arka ucun sonuçlarının tutulacağı ad alanı
+    cache_namespace = ""
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        raise NotImplementedError
+
+
+class DeepLBackend(TranslationBackend):
+    """
+    Resmi DeepL istemcisi ile çeviri. server_url verilirse istekler o sunucuya
+    gönderilir (örneğin yerel DeepL uyumlu sunucu).
+    """
+
+    name = "deepl"
+
+    def __init__(self, auth_key, server_url=None):
+        if not auth_key:
+            raise ValueError("DeepL API anahtarı bulunamadı. Lütfen .env dosyasında DEEPL_API_KEY ayarlayın.")
+
+        # Yeniden deneme ve bekleme translation_dispatcher tarafından yapılır
+        deepl.http_client.max_network_retries = 0
+
+        self.translator = deepl.Translator(auth_key, server_url=server_url)
+        self.cache_namespace = deepl_namespace(server_url)
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        try:
+            result = self.translator.translate_text(
+                texts,
+                source_lang=source_lang,
+                target_lang=target_lang
+            )
+        except (deepl.TooManyRequestsException, deepl.QuotaExceededException) as e:
+            raise ThrottledError(str(e)) from e
+        except deepl.ConnectionException as e:
+            raise TransientBackendError(str(e)) from e
+        except deepl.DeepLException as e:
+            status = getattr(e, "http_status_code", None)
+            if status is not None and status >= 500:
+                raise TransientBackendError(str(e)) from e
+            raise BackendError(str(e)) from e
+
+        # Tek metin veya liste olabilir
+        if isinstance(result, list):
+            return [item.text for item in result]
+        return [result.text]
+
+
+class StubBackend(TranslationBackend):
+    """
+    Ağ gerektirmeyen yerel çeviri arka ucu (yük testi ve profil çıkarma için).
+
+    latency: istek başına gecikme (saniye), jitter: gecikmeye eklenen rastgele pay
+    error_rate: geçici hata olasılığı, rate_limit: saniyedeki en fazla istek
+    (aşılınca ThrottledError), expansion: çeviri/kaynak uzunluk oranı
+    """
+
+    name = "stub"
+    cache_namespace = "stub"
+
+    def __init__(self, latency=0.05, jitter=0.0, error_rate=0.0, rate_limit=0.0, expansion=1.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.expansion = expansion
+        self.requests = 0
+        self.characters = 0
+        self._random = random.Random(seed)
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+    def _check_rate_limit(self):
+        if self.rate_limit <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count > self.rate_limit:
+                raise ThrottledError("Too many requests (stub)")
+
+    def pseudo_translate(self, text, target_lang):
+        """
+        Her kelimeyi ters çevirerek tahmin edilebilir bir "çeviri" üretir
+        """
+        words = text.split()
+        translated = [word[::-1] for word in words]
+        target_length = int(len(text) * self.expansion)
+        i = 0
+        while words and len(" ".join(translated)) < target_length:
+            translated.append(translated[i % len(words)])
+            i += 1
+        return " ".join(translated)
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        self._check_rate_limit()
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self.requests += 1
+            self.characters += sum(len(text) for text in texts)
+            failed = self._random.random() < self.error_rate
+
+        if failed:
+            raise TransientBackendError("Service unavailable (stub)")
+
+        return [self.pseudo_translate(text, target_lang) for text in texts]
+
+
+def deepl_namespace(server_url=None):
+    """
+    DeepL çevirilerinin önbellek ad alanı: resmi API için boş, başka bir
+    sunucuya yönlendirilmişse sunucu adresini içerir
+    """
+    return f"deepl@{server_url}" if server_url else ""
+
+
+def backend_namespace(name=None):
+    """
+    create_backend ile oluşturulacak arka ucun önbellek ad alanını istemci
+    oluşturmadan döndürür (API anahtarı kontrol edilmez, genel ayar değişmez)
+    """
+    name = (name or os.getenv("TRANSLATION_BACKEND", "deepl")).lower()
+
+    if name == "deepl":
+        return deepl_namespace(os.getenv("DEEPL_SERVER_URL") or None)
+    if name == "stub":
+        return StubBackend.cache_namespace
+    # Bilinmeyen arka uç hatası iş çalışırken create_backend tarafından bildirilir
+    return name
+
+
+def create_backend(name=None):
+    """
+    .env ayarlarına göre çeviri arka ucunu oluşturur.
+
+    TRANSLATION_BACKEND=deepl (varsayılan) veya stub. DeepL istemcisini yerel
+    sunucuya yönlendirmek için DEEPL_SERVER_URL kullanılır.
+    """
+    name = (name or os.getenv("TRANSLATION_BACKEND", "deepl")).lower()
+
+    if name == "deepl":
+        return DeepLBackend(os.getenv("DEEPL_API_KEY"), server_url=os.getenv("DEEPL_SERVER_URL") or None)
+    if name == "stub":
+        return StubBackend(
+            latency=float(os.getenv("STUB_LATENCY", 0.05)),
+            jitter=float(os.getenv("STUB_JITTER", 0.0)),
+            error_rate=float(os.getenv("STUB_ERROR_RATE", 0.0)),
+            rate_limit=float(os.getenv("STUB_RATE_LIMIT", 0.0)),
+            expansion=float(os.getenv("STUB_EXPANSION", 1.0))
+        )
+
+    raise ValueError(f"Bilinmeyen çeviri arka ucu: {name}")
@@ -0,0 +1,201 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+import logging
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan önbellek ayarları (.env ile değiştirilebilir)
+DEFAULT_CACHE_PATH = os.path.join("cache", "translation_memory.sqlite3")
+DEFAULT_MAX_ENTRIES = 200000
+
+
+def normalize_segment(text):
+    """
+    Önbellek anahtarı için metni normalleştirir (boşlukları sadeleştirir)
+    """
+    return " ".join(text.split())
+
+
+class TranslationMemory:
+    """
+    Diskte kalıcı çeviri belleği.
+
+    Kayıtlar (kaynak dil, hedef dil, normalleştirilmiş metin) anahtarıyla SQLite
+    veritabanında tutulur. WAL modu sayesinde birden fazla işçi süreci aynı
+    dosyayı güvenle okuyup yazabilir. Kayıt sayısı max_entries değerini aşınca
+    en uzun süredir kullanılmayan kayıtlar silinir (LRU).
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY,"
+                " source_lang TEXT NOT NULL,"
+                " target_lang TEXT NOT NULL,"
+                " translation TEXT NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations(last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0)")
+
+    def _connect(self):
+        """
+        Her iş parçacığı için ayrı bir SQLite bağlantısı döndürür
+        """
+        conn = getattr(self._local, "conn", None)
+        # fork sonrası üst sürecin bağlantısı kullanılmamalı
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(source_lang, target_lang, text, namespace=""):
+        raw = f"{(source_lang or 'auto').upper()}\x1f{target_lang.upper()}\x1f{normalize_segment(text)}"
+        # Ad alanı, farklı arka uçların (örn. yerel test sunucusu) sonuçlarını ayırır
+        if namespace:
+            raw = f"{namespace}\x1f{raw}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, source_lang, target_lang, texts, namespace=""):
+        """
+        Önbellekte bulunan çevirileri {metin: çeviri} sözlüğü olarak döndürür
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        if not unique_texts:
+            return {}
+
+        keys = {self.make_key(source_lang, target_lang, text, namespace): text for text in unique_texts}
+        found = {}
+
+        try:
+            conn = self._connect()
+            key_list = list(keys)
+            # SQLite parametre sınırına takılmamak için parçalar halinde sorgula
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i+500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, translation in rows:
+                    found[keys[key]] = translation
+
+            hit_count = len(found)
+            miss_count = len(unique_texts) - hit_count
+            now = time.time()
+            with conn:
+                if found:
+                    conn.executemany(
+                        "UPDATE translations SET last_used = ? WHERE key = ?",
+                        [(now, self.make_key(source_lang, target_lang, text, namespace)) for text in found]
+                    )
+                conn.execute("UPDATE counters SET value = value + ? WHERE name = 'hits'", (hit_count,))
+                conn.execute("UPDATE counters SET value = value + ? WHERE name = 'misses'", (miss_count,))
+        except sqlite3.Error as e:
+            logger.error(f"Çeviri belleği okunurken hata: {str(e)}")
+            found = {}
+            hit_count, miss_count = 0, len(unique_texts)
+
+        with self._lock:
+            self.hits += hit_count
+            self.misses += miss_count
+        metrics.CACHE_LOOKUPS.inc(hit_count, cache="translation", result="hit")
+        metrics.CACHE_LOOKUPS.inc(miss_count, cache="translation", result="miss")
+
+        return found
+
+    def put_many(self, source_lang, target_lang, translations, namespace=""):
+        """
+        {metin: çeviri} sözlüğündeki çevirileri belleğe yazar
+        """
+        if not translations:
+            return
+
+        now = time.time()
+        rows = [
+            (self.make_key(source_lang, target_lang, text, namespace), (source_lang or "auto").upper(),
+             target_lang.upper(), translation, now)
+            for text, translation in translations.items()
+        ]
+
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)", rows)
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.error(f"Çeviri belleğine yazılırken hata: {str(e)}")
+
+    def _evict(self, conn):
+        """
+        Kayıt sınırı aşıldıysa en eski kullanılan kayıtları siler
+        """
+        count = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+            logger.info(f"Çeviri belleğinden {overflow} eski kayıt silindi")
+
+    def stats(self):
+        """
+        Süreç içi ve kalıcı (tüm süreçler) isabet/ıskalama sayaçlarını döndürür
+        """
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": counters.get("hits", 0),
+            "total_misses": counters.get("misses", 0),
+            "entries": entries,
+        }
+
+
+_default_memory = None
+_default_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """
+    .env ayarlarına göre paylaşılan çeviri belleğini döndürür (devre dışıysa None)
+    """
+    global _default_memory
+
+    if os.getenv("TRANSLATION_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    with _default_memory_lock:
+        if _default_memory is None:
+            _default_memory = TranslationMemory(
+                db_path=os.getenv("TRANSLATION_CACHE_PATH", DEFAULT_CACHE_PATH),
+                max_entries=int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+            )
+        return _default_memory
@@ -0,0 +1,268 @@
+import os
+import time
+import random
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from translation_backends import ThrottledError, TransientBackendError
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan eşzamanlılık ve hız sınırı ayarları (.env ile değiştirilebilir)
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_RATE_LIMIT = 5.0  # saniyedeki istek
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET = 30.0  # saniye
+
+
+class TranslationDispatchError(Exception):
+    """
+    Bir veya daha fazla batch tüm denemelere rağmen çevrilemediğinde fırlatılır
+    """
+
+
+class CircuitOpenError(TranslationDispatchError):
+    """
+    Devre kesici açıkken yeni istek gönderilmez
+    """
+
+
+def classify_error(error):
+    """
+    API hatasını sınıflandırır: "throttle", "transient" veya "fatal"
+    """
+    if isinstance(error, ThrottledError):
+        return "throttle"
+    if isinstance(error, (TransientBackendError, TimeoutError, ConnectionError)):
+        return "transient"
+    return "fatal"
+
+
+class TokenBucket:
+    """
+    Uyarlanabilir token bucket hız sınırlayıcı.
+
+    429/kota yanıtlarında hız yarıya düşürülür, başarılı isteklerde yavaşça
+    (toplamsal olarak) başlangıç hızına geri yükseltilir (AIMD).
+    """
+
+    def __init__(self, rate=DEFAULT_RATE_LIMIT, capacity=None, min_rate=0.2):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Bir token alınana kadar bekler
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            logger.warning(f"API hız sınırına takıldı, istek hızı {self.rate:.2f}/sn değerine düşürüldü")
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+
+
+class CircuitBreaker:
+    """
+    Art arda çok sayıda hata alındığında API'ye istek göndermeyi bir süre durdurur
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_BREAKER_THRESHOLD, reset_timeout=DEFAULT_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self):
+        if self.state == "open":
+            raise CircuitOpenError("Çeviri API'si geçici olarak devre dışı (devre kesici açık)")
+
+    def on_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def on_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.error(f"Devre kesici açıldı: art arda {self.failures} API hatası")
+                self.opened_at = time.monotonic()
+
+
+class TranslationDispatcher:
+    """
+    Batch'leri sınırlı sayıda eşzamanlı istekle çeviriye gönderir.
+
+    translate_fn(batch) -> çeviri listesi. Geçici hatalarda üstel bekleme
+    (jitter ile) uygulanarak yeniden denenir.
+    """
+
+    def __init__(self, translate_fn, max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_retries=DEFAULT_MAX_RETRIES,
+                 rate_limiter=None, circuit_breaker=None, base_delay=0.5, max_delay=30.0):
+        self.translate_fn = translate_fn
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _backoff(self, attempt):
+        # Full jitter: [0, min(max_delay, base * 2^attempt)]
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _run_batch(self, batch_index, batch):
+        with tracing.span("translation_batch", batch=batch_index + 1, segments=len(batch),
+                          characters=sum(len(text) for text in batch)) as batch_span:
+            return self._send_batch(batch_index, batch, batch_span)
+
+    def _send_batch(self, batch_index, batch, batch_span):
+        attempt = 0
+        while True:
+            batch_span.set(attempts=attempt + 1)
+            self.circuit_breaker.before_call()
+            self.rate_limiter.acquire()
+            try:
+                with metrics.API_SECONDS.time():
+                    translations = self.translate_fn(batch)
+                if len(translations) != len(batch):
+                    raise TranslationDispatchError(
+                        f"Beklenmeyen çeviri sayısı: {len(translations)} (beklenen {len(batch)})"
+                    )
+                self.rate_limiter.on_success()
+                self.circuit_breaker.on_success()
+                metrics.API_BATCHES.inc(result="success")
+                metrics.API_CHARACTERS.inc(sum(len(text) for text in batch))
+                return translations
+            except TranslationDispatchError:
+                metrics.API_BATCHES.inc(result="failed")
+                raise
+            except Exception as e:
+                kind = classify_error(e)
+                metrics.API_ERRORS.inc(kind=kind)
+                if kind == "throttle":
+                    self.rate_limiter.on_throttle()
+                else:
+                    self.circuit_breaker.on_failure()
+
+                if kind == "fatal" or attempt >= self.max_retries:
+                    metrics.API_BATCHES.inc(result="failed")
+                    raise TranslationDispatchError(
+                        f"Batch {batch_index+1} çevrilemedi ({attempt+1} deneme): {str(e)}"
+                    ) from e
+
+                delay = self._backoff(attempt)
+                logger.warning(f"Çeviri API hatası (Batch {batch_index+1}, deneme {attempt+1}): {str(e)} - "
+                               f"{delay:.2f} sn sonra tekrar denenecek")
+                time.sleep(delay)
+                attempt += 1
+
+    def run(self, batches, on_result=None):
+        """
+        Tüm batch'leri çevirir ve {metin: çeviri} sözlüğü döndürür.
+        on_result verilmişse her tamamlanan batch'in {metin: çeviri} sonucu ile çağrılır.
+
+        Kalıcı olarak başarısız olan batch varsa, diğer batch'ler tamamlandıktan
+        sonra TranslationDispatchError fırlatılır; başarılı sonuçlar hatanın
+        "partial" özelliğinde bulunur.
+        """
+        results = {}
+        errors = []
+
+        if not batches:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(batches))) as executor:
+            futures = {
+                executor.submit(tracing.bind(self._run_batch), index, batch): (index, batch)
+                for index, batch in enumerate(batches)
+            }
+            for future in as_completed(futures):
+                index, batch = futures[future]
+                try:
+                    batch_results = dict(zip(batch, future.result()))
+                    results.update(batch_results)
+                    if on_result is not None:
+                        on_result(batch_results)
+                    logger.info(f"Batch çevirisi tamamlandı {index+1}/{len(batches)}: {len(batch)} metin")
+                except TranslationDispatchError as e:
+                    logger.error(str(e))
+                    errors.append(e)
+
+        if errors:
+            error = TranslationDispatchError(f"{len(errors)}/{len(batches)} batch çevrilemedi: {str(errors[0])}")
+            error.partial = results
+            raise error
+
+        return results
+
+
+_shared_limiter = None
+_shared_breaker = None
+_shared_lock = threading.Lock()
+
+
+def create_dispatcher(translate_fn):
+    """
+    .env ayarlarıyla, süreç genelinde paylaşılan hız sınırlayıcı ve devre
+    kesiciyi kullanan bir dispatcher oluşturur
+    """
+    global _shared_limiter, _shared_breaker
+
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucket(rate=float(os.getenv("TRANSLATION_RATE_LIMIT", DEFAULT_RATE_LIMIT)))
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker(
+                failure_threshold=int(os.getenv("TRANSLATION_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD)),
+                reset_timeout=float(os.getenv("TRANSLATION_BREAKER_RESET", DEFAULT_BREAKER_RESET))
+            )
+
+    return TranslationDispatcher(
+        translate_fn,
+        max_in_flight=int(os.getenv("TRANSLATION_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)),
+        max_retries=int(os.getenv("TRANSLATION_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        rate_limiter=_shared_limiter,
+        circuit_breaker=_shared_breaker
+    )